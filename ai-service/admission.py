@@ -0,0 +1,208 @@
+"""
+Request-level admission control for the heavy endpoints.
+
+Each lane has a concurrency limit and a cost budget. A request states its
+estimated cost (items plus text volume, see `estimate_cost`) and is admitted
+while both the lane's slot count and its budget allow it. Requests that do not
+fit wait in a short FIFO queue; when the queue is full or the wait runs out
+they are rejected with a Retry-After hint. A request that costs more than the
+whole budget (a roster cannot be split without changing its ranking) is
+charged the whole budget instead, so it runs alone once the lane drains.
+
+`PayloadLimitMiddleware` caps request bodies per path while they stream in, so
+an oversized upload is refused before it is buffered and parsed.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def estimate_cost(items: int, chars: int, chars_per_unit: int) -> float:
+    """One unit per item plus one per `chars_per_unit` characters of text."""
+    return items + chars / chars_per_unit
+
+
+class Lane:
+    def __init__(self, name: str, max_concurrent: int, budget: float, max_queue: int, max_wait_s: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.budget = budget
+        self.max_queue = max_queue
+        self.max_wait = max_wait_s
+        self.active = 0
+        self.cost = 0.0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+        # Smoothed time a request holds its slot, for Retry-After
+        self._hold_seconds = 1.0
+        self.admitted = 0
+        self.deferred = 0
+        self.rejected = 0
+        self.oversized = 0
+
+    def _fits(self, cost: float) -> bool:
+        return self.active < self.max_concurrent and self.cost + cost <= self.budget
+
+    def _take(self, cost: float):
+        self.active += 1
+        self.cost += cost
+        self.admitted += 1
+
+    def _wake(self):
+        # Strict FIFO: a large request at the head is not overtaken by smaller ones.
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost, future = self._waiters.popleft()
+            if not future.done():
+                self._take(cost)
+                future.set_result(None)
+
+    def retry_after(self) -> int:
+        waves = (len(self._waiters) + self.active) / self.max_concurrent
+        return max(1, math.ceil(self._hold_seconds * waves))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(429, f"{self.name} is busy ({reason}); retry later", self.retry_after())
+
+    async def acquire(self, cost: float) -> float:
+        """Wait for a slot; returns the cost charged, which `release` must get back."""
+        if cost > self.budget:
+            self.oversized += 1
+            cost = self.budget
+        if not self._waiters and self._fits(cost):
+            self._take(cost)
+            return cost
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(f"{len(self._waiters)} requests waiting")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        self.deferred += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._leave(entry)
+                raise self._reject(f"waited {self.max_wait}s")
+        except BaseException:
+            # Cancelled while queued: give the slot back if it was granted meanwhile.
+            if future.done() and not future.cancelled():
+                self.release(cost)
+            elif entry in self._waiters:
+                self._leave(entry)
+            raise
+        return cost
+
+    def _leave(self, entry: Tuple[float, asyncio.Future]):
+        self._waiters.remove(entry)
+        entry[1].cancel()
+        # The waiters behind a departed head may fit now
+        self._wake()
+
+    def release(self, cost: float, held_seconds: Optional[float] = None):
+        self.active -= 1
+        self.cost -= cost
+        if held_seconds is not None:
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held_seconds
+        self._wake()
+
+    def stats(self) -> Dict:
+        return {
+            "maxConcurrent": self.max_concurrent,
+            "budget": self.budget if math.isfinite(self.budget) else None,
+            "active": self.active,
+            "costInFlight": round(self.cost, 2),
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "deferred": self.deferred,
+            "rejected": self.rejected,
+            "oversized": self.oversized,
+            "avgHoldSeconds": round(self._hold_seconds, 4),
+        }
+
+
+class AdmissionController:
+    def __init__(self, lanes: Iterable[Lane]):
+        self.lanes = {lane.name: lane for lane in lanes}
+
+    async def acquire(self, lane_name: str, cost: float = 0.0) -> Callable[[], None]:
+        """Take a slot of `lane_name`; returns the function that gives it back. Rejections become HTTPException."""
+        lane = self.lanes[lane_name]
+        try:
+            charged = await lane.acquire(cost)
+        except AdmissionRejected as e:
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+        started = time.perf_counter()
+        return lambda: lane.release(charged, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def admit(self, lane_name: str, cost: float = 0.0):
+        """Hold a slot of `lane_name` for the duration of the block."""
+        release = await self.acquire(lane_name, cost)
+        try:
+            yield
+        finally:
+            release()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+class PayloadLimitMiddleware:
+    """
+    Rejects request bodies above the limit for their path with 413. A declared
+    Content-Length is checked before anything is read; otherwise the body is
+    counted as it streams and reading stops at the limit. Paths mapped to None
+    are not capped (streaming endpoints enforce their own per-line limits).
+    """
+
+    def __init__(self, app, limits: Dict[str, Optional[int]], default: int):
+        self.app = app
+        self.limits = limits
+        self.default = default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get(scope["path"], self.default)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {limit} bytes"
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > limit:
+                    await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the route's body read, so FastAPI answers 413.
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,113 @@
+"""
+Capacity-constrained assignment of employees to project seats.
+
+The input is a projects x employees score matrix, the number of seats of each
+project, the share of a person's time one seat takes (percent) and each
+employee's free capacity (percent). An employee takes at most one seat per
+project, and the seats they take must fit in their free capacity.
+
+`solve_optimal` maximizes the total score of the assignment as a 0/1 program
+over the candidate (project, employee) edges, solved by HiGHS through
+scipy.optimize.milp. This is a min-cost flow with seat-sized capacities; when
+every seat takes the same percentage its constraint matrix is totally
+unimodular, so the LP relaxation is already integral and HiGHS stops at the
+root. `solve_greedy` fills seats in descending score order and is the
+fallback when SciPy is missing or the solver finds nothing in time.
+
+Only the best `per_seat` eligible employees per seat of a project become
+candidate edges, which keeps the program small without changing the result
+unless more than that many projects compete for the same people.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SOLVERS = ("optimal", "greedy")
+
+
+def candidate_edges(scores: np.ndarray, seats: np.ndarray, seat_percent: np.ndarray, free: np.ndarray,
+                    per_seat: int, min_score: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(project, employee) index arrays of the edges worth considering, best first per project."""
+    rows, cols = [], []
+    for j in range(len(scores)):
+        if seats[j] <= 0:
+            continue
+        eligible = np.flatnonzero((free >= seat_percent[j]) & (scores[j] >= min_score))
+        keep = min(len(eligible), int(seats[j]) * per_seat)
+        if keep < len(eligible):
+            eligible = eligible[np.argpartition(-scores[j, eligible], keep - 1)[:keep]]
+        eligible = eligible[np.argsort(-scores[j, eligible], kind="stable")]
+        rows.append(np.full(len(eligible), j, dtype=np.int64))
+        cols.append(eligible)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols).astype(np.int64)
+
+
+def solve_greedy(edge_scores: np.ndarray, rows: np.ndarray, cols: np.ndarray, seats: np.ndarray,
+                 seat_percent: np.ndarray, free: np.ndarray) -> np.ndarray:
+    """Mask of chosen edges, taking the highest scores first while seats and capacity last."""
+    chosen = np.zeros(len(rows), dtype=bool)
+    open_seats = seats.astype(np.int64).copy()
+    remaining = free.astype(np.float64).copy()
+    for e in np.argsort(-edge_scores, kind="stable"):
+        j, i = rows[e], cols[e]
+        if open_seats[j] > 0 and remaining[i] >= seat_percent[j]:
+            chosen[e] = True
+            open_seats[j] -= 1
+            remaining[i] -= seat_percent[j]
+    return chosen
+
+
+def solve_optimal(edge_scores: np.ndarray, rows: np.ndarray, cols: np.ndarray, seats: np.ndarray,
+                  seat_percent: np.ndarray, free: np.ndarray, time_limit_s: float) -> Tuple[Optional[np.ndarray], bool]:
+    """Mask of chosen edges and whether it is proven optimal; None when no solution was found."""
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import csr_matrix
+
+    n_edges = len(rows)
+    used, employee_rows = np.unique(cols, return_inverse=True)
+    edges = np.arange(n_edges)
+    # One row per project (seats) and per employee with an edge (capacity)
+    matrix = csr_matrix(
+        (np.concatenate([np.ones(n_edges), seat_percent[rows]]),
+         (np.concatenate([rows, len(seats) + employee_rows]), np.concatenate([edges, edges]))),
+        shape=(len(seats) + len(used), n_edges),
+    )
+    upper = np.concatenate([seats, free[used]]).astype(np.float64)
+    result = milp(
+        -edge_scores,
+        constraints=LinearConstraint(matrix, -np.inf, upper),
+        integrality=np.ones(n_edges),
+        bounds=Bounds(0, 1),
+        options={"time_limit": time_limit_s},
+    )
+    if result.x is None:
+        return None, False
+    return result.x > 0.5, result.status == 0
+
+
+def assign(scores: np.ndarray, seats: np.ndarray, seat_percent: np.ndarray, free: np.ndarray, solver: str = "optimal",
+           per_seat: int = 20, min_score: float = 0.0, time_limit_s: float = 10.0) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """Chosen (project, employee) pairs and the `solver` report of the response."""
+    started = time.perf_counter()
+    rows, cols = candidate_edges(scores, seats, seat_percent, free, per_seat, min_score)
+    edge_scores = scores[rows, cols].astype(np.float64)
+    info: Dict[str, Any] = {"method": solver, "optimal": None, "candidateEdges": len(rows), "fallbackReason": None}
+
+    chosen = None
+    if solver == "optimal" and len(rows):
+        try:
+            chosen, info["optimal"] = solve_optimal(edge_scores, rows, cols, seats, seat_percent, free, time_limit_s)
+            info["method"] = "milp"
+            if chosen is None:
+                info["fallbackReason"] = f"no solution within {time_limit_s}s"
+        except ImportError:
+            info["fallbackReason"] = "scipy.optimize.milp unavailable"
+    if chosen is None:
+        chosen = solve_greedy(edge_scores, rows, cols, seats, seat_percent, free)
+        info["method"] = "greedy"
+
+    info["solveMs"] = round((time.perf_counter() - started) * 1000, 2)
+    return [(int(rows[e]), int(cols[e])) for e in np.flatnonzero(chosen)], info
@@ -0,0 +1,185 @@
+"""
+In-process IVF (inverted file) index for approximate inner-product search.
+
+Vectors are partitioned by a small k-means coarse quantizer. A query scores the
+centroids, probes the `n_probe` best lists and scores only the vectors in
+those lists exactly. Entries are keyed by id and carry a fingerprint, so a
+caller can `sync` the full set each time and only changed entries are
+re-embedded and reassigned.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_store import top_k_indices
+
+
+def kmeans(points: np.ndarray, n_clusters: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd's k-means with inner-product assignment; returns centroids."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(points))
+    centroids = points[rng.choice(len(points), n_clusters, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(points @ centroids.T, axis=1)
+        counts = np.bincount(assign, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, points)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = points[rng.choice(len(points), int(empty.sum()), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, n_probe: int = 16, min_lists: int = 16, max_lists: int = 4096,
+                 train_iters: int = 10, max_train_points: int = 50000):
+        self.n_probe = n_probe
+        self.min_lists = min_lists
+        self.max_lists = max_lists
+        self.train_iters = train_iters
+        self.max_train_points = max_train_points
+        self.lock = threading.RLock()
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.assign = np.zeros(0, dtype=np.int64)
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._lists: Optional[List[np.ndarray]] = None
+        self.rebuilds = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self.vectors[:len(self.ids)]
+
+    def _reserve(self, rows: int, dim: int):
+        if rows <= self.vectors.shape[0] and self.vectors.shape[1] == dim:
+            return
+        capacity = max(rows, 2 * self.vectors.shape[0], 64)
+        grown = np.zeros((capacity, dim), dtype=np.float32)
+        grown_assign = np.zeros(capacity, dtype=np.int64)
+        if self.ids:
+            grown[:len(self.ids)] = self.vectors[:len(self.ids)]
+            grown_assign[:len(self.ids)] = self.assign[:len(self.ids)]
+        self.vectors = grown
+        self.assign = grown_assign
+
+    def _remove(self, item_id: str):
+        row = self.rows.pop(item_id)
+        self.fingerprints.pop(item_id, None)
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.vectors[row] = self.vectors[last]
+            self.assign[row] = self.assign[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+    def sync(self, ids: Sequence[str], fingerprints: Sequence[str],
+             build_vectors: Callable[[List[int]], np.ndarray]) -> Dict[str, int]:
+        """
+        Make the index hold exactly `ids`. `build_vectors(positions)` is called
+        once with the positions (into `ids`) whose fingerprint is new or changed.
+        """
+        with self.lock:
+            wanted = dict(zip(ids, range(len(ids))))
+            removed = [i for i in self.rows if i not in wanted]
+            for item_id in removed:
+                self._remove(item_id)
+            changed = [pos for item_id, pos in wanted.items()
+                       if self.fingerprints.get(item_id) != fingerprints[pos]]
+            if changed:
+                vectors = np.asarray(build_vectors(changed), dtype=np.float32)
+                self._reserve(len(self.ids) + len(changed), vectors.shape[1])
+                for pos, vector in zip(changed, vectors):
+                    item_id = ids[pos]
+                    row = self.rows.get(item_id)
+                    if row is None:
+                        row = len(self.ids)
+                        self.ids.append(item_id)
+                        self.rows[item_id] = row
+                    self.vectors[row] = vector
+                    self.fingerprints[item_id] = fingerprints[pos]
+                if self.centroids is not None:
+                    changed_rows = np.array([self.rows[ids[p]] for p in changed], dtype=np.int64)
+                    self.assign[changed_rows] = np.argmax(self.vectors[changed_rows] @ self.centroids.T, axis=1)
+            if removed or changed:
+                self._lists = None
+            self._maybe_train()
+            return {"added": len(changed), "removed": len(removed)}
+
+    def _maybe_train(self):
+        size = len(self.ids)
+        if size == 0:
+            return
+        if self.centroids is not None and self.trained_size // 2 <= size <= self.trained_size * 2:
+            return
+        n_lists = int(np.clip(int(np.sqrt(size)), self.min_lists, self.max_lists))
+        points = self.matrix
+        if size > self.max_train_points:
+            sample = np.random.default_rng(0).choice(size, self.max_train_points, replace=False)
+            points = points[sample]
+        self.centroids = kmeans(points, n_lists, self.train_iters)
+        self.assign[:size] = np.argmax(self.matrix @ self.centroids.T, axis=1)
+        self.trained_size = size
+        self._lists = None
+        self.rebuilds += 1
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            assign = self.assign[:len(self.ids)]
+            order = np.argsort(assign, kind="stable")
+            bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._lists
+
+    def search(self, query: np.ndarray, top_k: int, n_probe: Optional[int] = None) -> Tuple[List[str], np.ndarray, int]:
+        """Return (ids, scores, candidates scored) for the approximate top-K."""
+        with self.lock:
+            if not self.ids or self.centroids is None:
+                return [], np.zeros(0, dtype=np.float32), 0
+            n_probe = min(n_probe or self.n_probe, len(self.centroids))
+            probe = top_k_indices(self.centroids @ query, n_probe)
+            lists = self._inverted_lists()
+            candidates = np.concatenate([lists[i] for i in probe])
+            scores = self.vectors[candidates] @ query
+            best = top_k_indices(scores, top_k)
+            return [self.ids[r] for r in candidates[best]], scores[best], len(candidates)
+
+    def exact_search(self, query: np.ndarray, top_k: int) -> Tuple[List[str], np.ndarray]:
+        with self.lock:
+            scores = self.matrix @ query
+            best = top_k_indices(scores, top_k)
+            return [self.ids[r] for r in best], scores[best]
+
+
+class IndexPool:
+    """
+    One IVFIndex per roster key, so callers with different rosters neither see
+    each other's entries nor force each other's retrains. The least recently
+    used index is dropped beyond `max_indexes`.
+    """
+
+    def __init__(self, factory: Callable[[], IVFIndex], max_indexes: int = 4):
+        self.factory = factory
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, IVFIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> IVFIndex:
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = self.factory()
+                while len(self._indexes) > max(self.max_indexes, 1):
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(key)
+            return index
@@ -0,0 +1,260 @@
+"""
+Attrition-risk features and model.
+
+Features are computed from the same records the API stores: an `Employee`
+document plus that employee's `PerformanceReview` and `Allocation`
+documents, as exported JSON. The model is a standardized logistic
+regression, so each prediction splits exactly into per-feature
+contributions (coefficient times standardized value), which become the
+`topFactors` of /ai/perf-insight.
+
+Every feature is computed as of a date from dated records only. Fields that
+describe the employee's current state (`status`, `currentAllocationPercent`)
+are not used: for a leaver they already reflect the departure, which the
+model would otherwise learn as the label.
+
+`train_attrition.py` fits and saves a model; the service loads it once and
+scores any number of employees with one `predict_proba` call.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURES = [
+    "avgReviewScore",
+    "lastReviewScore",
+    "reviewTrend",
+    "minCompetencyScore",
+    "reviewCount",
+    "monthsSinceReview",
+    "tenureMonths",
+    "allocationPercent",
+    "activeAllocations",
+    "recentAllocations",
+    "lateRate",
+    "absenceRate",
+]
+
+COMPETENCIES = ["technical", "communication", "teamwork", "leadership", "initiative"]
+NEUTRAL_SCORE = 3.0
+DAYS_PER_MONTH = 30.44
+
+
+def unwrap(value: Any) -> Any:
+    """Strip mongoexport extended-JSON wrappers ({"$oid": ...}, {"$date": ...})."""
+    if isinstance(value, dict):
+        if "$oid" in value:
+            return value["$oid"]
+        if "$date" in value:
+            date = value["$date"]
+            if isinstance(date, dict) and "$numberLong" in date:
+                return datetime.fromtimestamp(int(date["$numberLong"]) / 1000, tz=timezone.utc)
+            return unwrap(date)
+        return {key: unwrap(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [unwrap(item) for item in value]
+    return value
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """A timezone-aware date from ISO text, epoch milliseconds or extended JSON; ValueError if it is none of these."""
+    value = unwrap(value)
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            date = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+        elif isinstance(value, datetime):
+            date = value
+        else:
+            date = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, TypeError, OverflowError, OSError) as e:
+        raise ValueError(f"invalid date {value!r}") from e
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def _months(start: Optional[datetime], end: datetime) -> float:
+    if start is None:
+        return 0.0
+    return max(0.0, (end - start).total_seconds() / 86400 / DAYS_PER_MONTH)
+
+
+def _review_score(review: Dict[str, Any]) -> float:
+    if review.get("averageScore") is not None:
+        return float(review["averageScore"])
+    scores = review.get("scores") or {}
+    values = [float(scores[c]) for c in COMPETENCIES if scores.get(c) is not None]
+    return sum(values) / len(values) if values else NEUTRAL_SCORE
+
+
+def employee_features(employee: Dict[str, Any], reviews: Sequence[Dict[str, Any]],
+                      allocations: Sequence[Dict[str, Any]], as_of: Optional[datetime] = None) -> np.ndarray:
+    """One row of `FEATURES` for an employee, as of `as_of` (default: now)."""
+    as_of = as_of or datetime.now(timezone.utc)
+
+    def review_end(review):
+        period = review.get("reviewPeriod") or {}
+        return parse_date(period.get("endDate")) or parse_date(review.get("createdAt")) or as_of
+
+    ordered = sorted((r for r in reviews if review_end(r) <= as_of), key=review_end)
+    scores = [_review_score(r) for r in ordered]
+    if scores:
+        avg_score, last_score = sum(scores) / len(scores), scores[-1]
+        trend = last_score - sum(scores[:-1]) / (len(scores) - 1) if len(scores) > 1 else 0.0
+        latest = ordered[-1].get("scores") or {}
+        competencies = [float(latest[c]) for c in COMPETENCIES if latest.get(c) is not None]
+        min_competency = min(competencies) if competencies else last_score
+    else:
+        avg_score = last_score = min_competency = NEUTRAL_SCORE
+        trend = 0.0
+
+    hired = parse_date(employee.get("hireDate")) or parse_date(employee.get("createdAt"))
+    tenure = _months(hired, as_of)
+    since_review = _months(review_end(ordered[-1]), as_of) if ordered else tenure
+
+    # Allocation load from the allocations that ran on `as_of`, not from the
+    # employee's current state: a leaver's allocations have since been ended.
+    active = recent = 0
+    percent = 0.0
+    for allocation in allocations:
+        started = parse_date(allocation.get("startDate")) or parse_date(allocation.get("createdAt"))
+        if started is None:
+            continue
+        if 0 <= (as_of - started).days <= 365:
+            recent += 1
+        if allocation.get("status") == "planned":
+            continue
+        ended = parse_date(allocation.get("endDate"))
+        if ended is None and allocation.get("status") == "completed":
+            ended = parse_date(allocation.get("updatedAt"))
+        if started <= as_of and (ended is None or ended >= as_of):
+            active += 1
+            percent += float(allocation.get("allocationPercent") or 0)
+
+    # Attendance over the last 90 days
+    window = late = absent = 0
+    for entry in employee.get("attendance") or []:
+        day = parse_date(entry.get("date"))
+        if day is None or not 0 <= (as_of - day).days <= 90:
+            continue
+        window += 1
+        late += entry.get("status") == "Late"
+        absent += entry.get("status") == "Absent"
+
+    return np.array([
+        avg_score,
+        last_score,
+        trend,
+        min_competency,
+        len(scores),
+        since_review,
+        tenure,
+        percent,
+        active,
+        recent,
+        late / window if window else 0.0,
+        absent / window if window else 0.0,
+    ], dtype=np.float64)
+
+
+def record_id(record: Dict[str, Any], field: str = "_id") -> str:
+    return str(unwrap(record.get(field)))
+
+
+def group_by_employee(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        grouped.setdefault(record_id(record, "employeeId"), []).append(record)
+    return grouped
+
+
+def records_fingerprint(employee: Dict[str, Any], reviews: Sequence[Dict[str, Any]],
+                        allocations: Sequence[Dict[str, Any]]) -> str:
+    payload = json.dumps([employee, list(reviews), list(allocations)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AttritionModel:
+    """A fitted StandardScaler + LogisticRegression pipeline plus its feature list."""
+
+    def __init__(self, pipeline, features: List[str], metadata: Optional[Dict[str, Any]] = None):
+        self.pipeline = pipeline
+        self.features = features
+        self.metadata = metadata or {}
+        scaler = pipeline.named_steps["scaler"]
+        classifier = pipeline.named_steps["classifier"]
+        self._mean = scaler.mean_
+        self._scale = scaler.scale_
+        self._coef = classifier.coef_[0]
+
+    @classmethod
+    def load(cls, path: str) -> "AttritionModel":
+        import joblib
+        bundle = joblib.load(path)
+        if bundle["features"] != FEATURES:
+            raise ValueError(f"{path} was trained on different features; retrain with train_attrition.py")
+        return cls(bundle["pipeline"], bundle["features"], bundle.get("metadata"))
+
+    def save(self, path: str):
+        import joblib
+        joblib.dump({"pipeline": self.pipeline, "features": self.features, "metadata": self.metadata}, path)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.pipeline.predict_proba(X)[:, 1]
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """Per-feature log-odds contribution relative to the training mean."""
+        return (X - self._mean) / self._scale * self._coef
+
+    def top_factors(self, X: np.ndarray, n: int = 3) -> List[List[Dict[str, float]]]:
+        contributions = self.contributions(X)
+        order = np.argsort(-np.abs(contributions), axis=1, kind="stable")[:, :n]
+        return [[{"feature": self.features[j], "impact": round(float(row[j]), 3)} for j in top]
+                for row, top in zip(contributions, order)]
+
+
+class FeatureCache:
+    """
+    Latest feature row per employee, recomputed only when the employee's
+    records change. Department membership is kept for batch scoring.
+    """
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[str, str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, employee: Dict[str, Any], reviews: Sequence[Dict[str, Any]],
+               allocations: Sequence[Dict[str, Any]]) -> Tuple[str, np.ndarray]:
+        employee_id = record_id(employee)
+        fingerprint = records_fingerprint(employee, reviews, allocations)
+        with self._lock:
+            cached = self._rows.get(employee_id)
+            if cached is not None and cached[0] == fingerprint:
+                self.hits += 1
+                return employee_id, cached[2]
+            self.misses += 1
+        row = employee_features(employee, reviews, allocations)
+        with self._lock:
+            self._rows[employee_id] = (fingerprint, str(employee.get("department") or ""), row)
+        return employee_id, row
+
+    def get(self, employee_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            cached = self._rows.get(employee_id)
+            return None if cached is None else cached[2]
+
+    def department(self, department: str) -> Tuple[List[str], np.ndarray]:
+        with self._lock:
+            ids = [eid for eid, (_, dept, _) in self._rows.items() if dept == department]
+            rows = [self._rows[eid][2] for eid in ids]
+        return ids, np.vstack(rows) if rows else np.zeros((0, len(FEATURES)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"employees": len(self._rows), "hits": self.hits, "misses": self.misses}
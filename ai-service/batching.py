@@ -0,0 +1,145 @@
+"""
+Dynamic micro-batching for embedding calls.
+
+Encode calls from concurrent requests are collected for a few milliseconds (or
+until the batch is full), run through the model as one length-sorted batch and
+the vectors are fanned back out to the waiting callers.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+class _Pending:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Thread-safe batching front for an encode function.
+
+    Callers block in `encode` while a single background thread forms batches.
+    A call larger than `max_batch_size` is run on its own rather than split.
+    Calls above `max_call_size` texts (0 = no limit) are queued as consecutive
+    slices, so small calls arriving meanwhile get the model between slices
+    instead of waiting for the whole bulk call.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 64, max_latency_ms: float = 5.0, max_call_size: int = 0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_call_size = max_call_size
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # Histogram buckets are powers of two up to max_batch_size, plus overflow.
+        self.buckets = []
+        size = 1
+        while size < max_batch_size:
+            self.buckets.append(size)
+            size *= 2
+        self.buckets.append(max_batch_size)
+        self.batch_size_counts = [0] * (len(self.buckets) + 1)
+        self.batches = 0
+        self.texts = 0
+        self.calls = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                    self._thread.start()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        self._ensure_started()
+        if self.max_call_size and len(texts) > self.max_call_size:
+            step = self.max_call_size
+            return np.vstack([self._submit(texts[i:i + step]) for i in range(0, len(texts), step)])
+        return self._submit(texts)
+
+    def _submit(self, texts: List[str]) -> np.ndarray:
+        pending = _Pending(list(texts))
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self) -> List[_Pending]:
+        first = self._queue.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_latency
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [t for p in batch for t in p.texts]
+            # Length-sorted order keeps similarly sized texts in the same padded sub-batch.
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            try:
+                encoded = np.asarray(self.encode_fn([texts[i] for i in order]), dtype=np.float32)
+                vectors = np.empty_like(encoded)
+                vectors[order] = encoded
+                offset = 0
+                for p in batch:
+                    p.result = vectors[offset:offset + len(p.texts)]
+                    offset += len(p.texts)
+            except Exception as e:
+                for p in batch:
+                    p.error = e
+            self._record(len(batch), len(texts))
+            for p in batch:
+                p.done.set()
+
+    def _record(self, calls: int, texts: int):
+        with self._stats_lock:
+            self.batches += 1
+            self.calls += calls
+            self.texts += texts
+            for i, bound in enumerate(self.buckets):
+                if texts <= bound:
+                    self.batch_size_counts[i] += 1
+                    break
+            else:
+                self.batch_size_counts[-1] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            labels = [f"le_{b}" for b in self.buckets] + ["overflow"]
+            return {
+                "maxBatchSize": self.max_batch_size,
+                "maxLatencyMs": self.max_latency * 1000.0,
+                "maxCallSize": self.max_call_size,
+                "batches": self.batches,
+                "calls": self.calls,
+                "texts": self.texts,
+                "avgBatchSize": self.texts / self.batches if self.batches else 0.0,
+                "batchSizeHistogram": dict(zip(labels, self.batch_size_counts)),
+            }
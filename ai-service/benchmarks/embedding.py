@@ -0,0 +1,143 @@
+"""
+Embedding backend benchmark: speed versus agreement with fp32.
+
+Encodes a fixed, seeded corpus of synthetic resumes and skill queries with
+each backend variant and reports:
+  - throughput (texts/s) encoding the whole corpus
+  - p50/p99 latency of request-sized encodes
+  - ranking agreement with the fp32 baseline: mean top-10 overlap and mean
+    Spearman correlation of resume rankings per query, plus the mean cosine
+    between each variant's vectors and the baseline's
+
+    python benchmarks/embedding.py --variants fp32,int8,int8:float16 --threads 4
+
+A variant is BACKEND[:OUTPUT_DTYPE]. The first variant is the baseline.
+Prints one JSON document.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_backend import EmbeddingBackend  # noqa: E402
+from skill_matcher import load_taxonomy  # noqa: E402
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROLES = ["Software Engineer", "Data Scientist", "DevOps Engineer", "Frontend Developer", "Backend Developer", "QA Engineer"]
+SENTENCES = [
+    "Built and maintained {a} services used by {n} internal teams.",
+    "Led the migration from a legacy stack to {a} and {b}, cutting release time in half.",
+    "Designed data pipelines with {a}; mentored {n} junior engineers.",
+    "Improved test coverage of the {a} codebase and introduced {b} for deployments.",
+    "Worked closely with product managers to ship {a} features on a two-week cadence.",
+]
+
+
+def build_corpus(resumes: int, queries: int, seed: int):
+    rng = random.Random(seed)
+    skills = [aliases[0] for aliases in load_taxonomy(os.path.join(SERVICE_DIR, "skill_taxonomy.json")).values()]
+    corpus = []
+    for _ in range(resumes):
+        role = rng.choice(ROLES)
+        picked = rng.sample(skills, rng.randint(3, 8))
+        lines = [f"{role} with {rng.randint(1, 15)} years of experience. Skills: {', '.join(picked)}."]
+        for _ in range(rng.randint(3, 12)):
+            a, b = rng.sample(picked, 2)
+            lines.append(rng.choice(SENTENCES).format(a=a, b=b, n=rng.randint(2, 9)))
+        corpus.append(" ".join(lines))
+    query_texts = [f"{rng.choice(ROLES)} skilled in {', '.join(rng.sample(skills, rng.randint(2, 5)))}"
+                   for _ in range(queries)]
+    return corpus, query_texts
+
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def ranks(scores: np.ndarray) -> np.ndarray:
+    out = np.empty(len(scores))
+    out[np.argsort(scores, kind="stable")] = np.arange(len(scores))
+    return out
+
+
+def run_variant(model_name, spec, threads, corpus, queries, batch_size, request_size):
+    backend, _, dtype = spec.partition(":")
+    model = EmbeddingBackend(model_name, backend, dtype or "float32", threads).load()
+    model.warm()
+
+    started = time.perf_counter()
+    resume_vectors = model.encode(corpus, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    for i in range(0, len(corpus), request_size):
+        started = time.perf_counter()
+        model.encode(corpus[i:i + request_size], batch_size=batch_size)
+        latencies.append((time.perf_counter() - started) * 1000)
+    query_vectors = model.encode(queries, batch_size=batch_size)
+
+    return {
+        "backend": backend,
+        "outputDtype": dtype or "float32",
+        "threads": threads,
+        "textsPerSecond": len(corpus) / elapsed,
+        "p50Ms": float(np.percentile(latencies, 50)),
+        "p99Ms": float(np.percentile(latencies, 99)),
+        "vectorBytes": int(resume_vectors.nbytes),
+    }, normalized(resume_vectors), normalized(query_vectors)
+
+
+def agreement(base_resumes, base_queries, resumes, queries, k=10):
+    base_scores = base_queries @ base_resumes.T
+    scores = queries @ resumes.T
+    overlaps, spearman = [], []
+    for expected, got in zip(base_scores, scores):
+        top_expected = set(np.argsort(-expected, kind="stable")[:k])
+        top_got = set(np.argsort(-got, kind="stable")[:k])
+        overlaps.append(len(top_expected & top_got) / k)
+        spearman.append(float(np.corrcoef(ranks(expected), ranks(got))[0, 1]))
+    return {
+        f"top{k}Overlap": float(np.mean(overlaps)),
+        "spearman": float(np.mean(spearman)),
+        "meanCosineToBaseline": float(np.mean(np.sum(base_resumes * resumes, axis=1))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2"))
+    parser.add_argument("--variants", default="fp32,int8,fp32:float16,int8:float16")
+    parser.add_argument("--threads", default=str(os.cpu_count() or 1), help="comma-separated thread counts")
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--request-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus, queries = build_corpus(args.resumes, args.queries, args.seed)
+    results, baseline = [], None
+    for threads in (int(t) for t in args.threads.split(",")):
+        for spec in args.variants.split(","):
+            row, resume_vectors, query_vectors = run_variant(args.model, spec, threads, corpus, queries,
+                                                             args.batch_size, args.request_size)
+            if baseline is None:
+                baseline = (resume_vectors, query_vectors)
+            row.update(agreement(*baseline, resume_vectors, query_vectors))
+            results.append(row)
+
+    print(json.dumps({"benchmark": "embedding", "model": args.model, "resumes": len(corpus),
+                      "queries": len(queries), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
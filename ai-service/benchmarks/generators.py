@@ -0,0 +1,136 @@
+"""
+Seeded synthetic payloads shaped like the service's request models.
+
+Every generator takes a `seed`, so two runs with the same arguments send
+byte-identical requests. Skill names come from skill_taxonomy.json, mixed
+with alias spellings and casing so canonicalization and caching see
+realistic variety.
+"""
+import os
+import random
+from typing import Any, Dict, List
+
+from skill_matcher import load_taxonomy
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAXONOMY = load_taxonomy(os.path.join(SERVICE_DIR, "skill_taxonomy.json"))
+ALIASES = [alias for aliases in TAXONOMY.values() for alias in aliases]
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Divya", "Elif", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Luis"]
+LAST_NAMES = ["Ahmed", "Brown", "Costa", "Dubois", "Eze", "Fischer", "Gupta", "Hansen", "Ito", "Jensen", "Kim", "Lopez"]
+ROLES = ["Software Engineer", "Senior Backend Engineer", "Frontend Developer", "Data Scientist",
+         "DevOps Engineer", "Engineering Manager", "QA Engineer", "Product Designer"]
+SENTENCES = [
+    "Built and maintained {a} services used by {n} internal teams.",
+    "Led the migration from a legacy stack to {a} and {b}, cutting release time in half.",
+    "Designed data pipelines with {a} and mentored {n} junior engineers.",
+    "Improved test coverage of the {a} codebase and introduced {b} for deployments.",
+    "Worked with product managers to ship {a} features on a two-week cadence.",
+    "Owned on-call for the {a} platform and reduced incident volume by {n}0%.",
+]
+
+
+def _skill(rng: random.Random) -> str:
+    alias = rng.choice(ALIASES)
+    return alias.title() if rng.random() < 0.3 else alias
+
+
+def employees(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        "_id": f"{i:024x}",
+        "employeeId": f"EMP{i:06d}",
+        "userId": {"firstName": rng.choice(FIRST_NAMES), "lastName": rng.choice(LAST_NAMES)},
+        "skills": list(dict.fromkeys(_skill(rng) for _ in range(rng.randint(2, 8)))),
+        "currentAllocationPercent": rng.choice([0, 10, 20, 25, 40, 50, 60, 75, 80, 100]),
+    } for i in range(n)]
+
+
+def skills_match(n_employees: int, seed: int = 0, top_k: int = 5) -> Dict[str, Any]:
+    rng = random.Random(seed + 1)
+    return {
+        "projectId": f"PRJ{seed:04d}",
+        "requiredSkills": [_skill(rng) for _ in range(rng.randint(2, 5))],
+        "employees": employees(n_employees, seed),
+        "topK": top_k,
+    }
+
+
+def allocation(n_employees: int, n_projects: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed + 2)
+    return {
+        "projects": [{
+            "projectId": f"PRJ{j:04d}",
+            "requiredSkills": [_skill(rng) for _ in range(rng.randint(2, 5))],
+            "headcount": rng.randint(1, 5),
+            "allocationPercent": rng.choice([25, 50, 50, 100]),
+        } for j in range(n_projects)],
+        "employees": employees(n_employees, seed),
+    }
+
+
+def resume_text(rng: random.Random, sentences: int) -> str:
+    skills = [_skill(rng) for _ in range(rng.randint(3, 8))]
+    lines = [f"{rng.choice(ROLES)} with {rng.randint(1, 15)} years of experience. Skills: {', '.join(skills)}."]
+    for _ in range(sentences):
+        a, b = rng.choice(skills), rng.choice(skills)
+        lines.append(rng.choice(SENTENCES).format(a=a, b=b, n=rng.randint(2, 9)))
+    return " ".join(lines)
+
+
+def resumes(n: int, sentences: int = 10, seed: int = 0) -> List[Dict[str, Any]]:
+    """`sentences` controls length: ~12 words each, so 20 exceeds the model's 256-token window."""
+    rng = random.Random(seed)
+    return [{
+        "id": f"R{i:06d}",
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "email": f"candidate{i}@example.com",
+        "resumeText": resume_text(rng, rng.randint(max(1, sentences // 2), sentences * 3 // 2)),
+    } for i in range(n)]
+
+
+def ideal_profile(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "keySkills": [_skill(rng) for _ in range(rng.randint(3, 6))],
+        "experience": f"{rng.randint(2, 8)}+ years",
+        "education": "Bachelor's in Computer Science or equivalent",
+        "summary": f"{rng.choice(ROLES)} to build and scale our HR platform.",
+    }
+
+
+def rank_resumes(n: int, sentences: int = 10, seed: int = 0, **options) -> Dict[str, Any]:
+    return {"ideal_profile": ideal_profile(seed), "resumes": resumes(n, sentences, seed), **options}
+
+
+def job_description(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    skills = ", ".join(_skill(rng) for _ in range(rng.randint(3, 7)))
+    return (f"We are hiring a {rng.choice(ROLES)}. You will work with {skills}. "
+            f"{rng.randint(2, 8)}+ years of experience required; a degree in computer science is a plus.")
+
+
+def onboarding(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {"requestId": f"REQ{seed:06d}", "jobTitle": rng.choice(ROLES), "jobDescription": job_description(seed)}
+
+
+def questions(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {"job_title": rng.choice(ROLES), "required_skills": [_skill(rng) for _ in range(rng.randint(2, 5))]}
+
+
+def radar(seed: int = 0, fmt: str = "png") -> Dict[str, Any]:
+    """Integer 1-5 scores, like real reviews, so repeats (and cache hits) occur naturally."""
+    rng = random.Random(seed)
+    fields = ["technical", "communication", "teamwork", "initiative", "leadership", "punctuality"]
+    return {**{f: float(rng.randint(1, 5)) for f in fields}, "format": fmt}
+
+
+def radar_batch(n: int, seed: int = 0, fmt: str = "png") -> Dict[str, Any]:
+    return {"charts": [{**radar(seed * 1_000_003 + i, fmt), "id": f"EMP{i:06d}"} for i in range(n)]}
+
+
+def query(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    topic = rng.choice(["paid leave", "remote work", "expense claims", "parental leave", "performance reviews"])
+    return {"query": f"What is the policy on {topic}?", "userId": f"U{seed}", "authRole": "employee"}
@@ -0,0 +1,109 @@
+"""
+Radar chart rendering benchmark.
+
+Compares the original per-request matplotlib figure construction against the
+cached-background PNG path and the direct SVG path in `radar.py`.
+
+    python benchmarks/radar.py --renders 50 --dpi 150 --size 8
+    python benchmarks/radar.py --write-samples /tmp/radar   # also save one image per mode
+
+Prints one JSON document with per-render latency (ms) and output sizes.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import radar  # noqa: E402
+
+
+def legacy_render(values, size=8, dpi=150):
+    """The pre-cache implementation: new pyplot polar figure on every call."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    values = list(values) + list(values[:1])
+    angles = np.linspace(0, 2 * np.pi, len(radar.CATEGORIES), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=(size, size), subplot_kw=dict(projection='polar'))
+    ax.plot(angles, values, 'o-', linewidth=2, color='#3b82f6', label='Score')
+    ax.fill(angles, values, alpha=0.25, color='#3b82f6')
+    ax.set_ylim(0, 5)
+    ax.set_yticks([1, 2, 3, 4, 5])
+    ax.set_yticklabels(['1', '2', '3', '4', '5'], fontsize=10, color='#64748b')
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(radar.CATEGORIES, fontsize=12, fontweight='bold', color='#1e293b')
+    ax.grid(True, linestyle='--', alpha=0.7, color='#cbd5e1')
+    ax.spines['polar'].set_color('#cbd5e1')
+    ax.set_facecolor('#f8fafc')
+    fig.patch.set_facecolor('white')
+    plt.title('Performance Competencies', size=16, fontweight='bold', pad=20, color='#0f172a')
+
+    buf = BytesIO()
+    plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def measure(render, payloads):
+    render(payloads[0])  # warm-up: imports and, for the cached path, the template
+    samples, sizes = [], []
+    for values in payloads:
+        started = time.perf_counter()
+        out = render(values)
+        samples.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(out))
+    samples.sort()
+    return {
+        "renders": len(samples),
+        "meanMs": statistics.mean(samples),
+        "p50Ms": samples[len(samples) // 2],
+        "p95Ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "meanBytes": statistics.mean(sizes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--size", type=float, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-samples", metavar="DIR")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    payloads = [rng.integers(1, 6, size=6).astype(float).tolist() for _ in range(args.renders)]
+
+    modes = {
+        "legacy_png": lambda v: legacy_render(v, args.size, args.dpi),
+        "cached_png": lambda v: radar.render_radar_png(v, args.size, args.dpi),
+        "svg": lambda v: radar.render_radar_svg(v, args.size),
+    }
+    results = {name: measure(fn, payloads) for name, fn in modes.items()}
+    results["speedup"] = {
+        "cached_png": results["legacy_png"]["meanMs"] / results["cached_png"]["meanMs"],
+        "svg": results["legacy_png"]["meanMs"] / results["svg"]["meanMs"],
+    }
+
+    if args.write_samples:
+        os.makedirs(args.write_samples, exist_ok=True)
+        for name, fn in modes.items():
+            ext = "svg" if name == "svg" else "png"
+            with open(os.path.join(args.write_samples, f"{name}.{ext}"), "wb") as f:
+                f.write(fn(payloads[0]))
+
+    print(json.dumps({"benchmark": "radar", "dpi": args.dpi, "size": args.size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Startup-time benchmark for the AI service.
+
+Measures, over several cold starts:
+  - import time of `main` in a fresh interpreter
+  - time from process launch until /health answers
+  - time from process launch until /ready reports the model warm
+
+    python benchmarks/startup.py --runs 3 --workers 1
+
+Prints one JSON document with per-run samples and medians.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def server_run(workers: int, preload: bool, timeout: float) -> dict:
+    port = free_port()
+    env = dict(os.environ, HOST="127.0.0.1", PORT=str(port), WEB_CONCURRENCY=str(workers),
+               PRELOAD_MODEL="1" if preload else "0", LOG_LEVEL="warning")
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "serve.py"], cwd=SERVICE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        health = wait_for(f"http://127.0.0.1:{port}/health", started, timeout)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", started, timeout)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"healthSeconds": health, "readySeconds": ready}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-preload", action="store_true")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    runs = [server_run(args.workers, not args.no_preload, args.timeout) for _ in range(args.runs)]
+
+    print(json.dumps({
+        "benchmark": "startup",
+        "workers": args.workers,
+        "preload": not args.no_preload,
+        "importSeconds": {"samples": imports, "median": statistics.median(imports)},
+        "healthSeconds": {"samples": [r["healthSeconds"] for r in runs],
+                          "median": statistics.median(r["healthSeconds"] for r in runs)},
+        "readySeconds": {"samples": [r["readySeconds"] for r in runs],
+                         "median": statistics.median(r["readySeconds"] for r in runs)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
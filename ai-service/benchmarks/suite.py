@@ -0,0 +1,265 @@
+"""
+Benchmark suite for every ai-service endpoint.
+
+Two kinds of measurement, both in-process against `main`:
+
+  micro  calls the blocking endpoint functions (compute_skills_match,
+         compute_rank_resumes, build_ideal_profile, renderers, ...) directly
+         on prepared, already-validated requests
+  load   drives the ASGI app through httpx with N concurrent clients, so
+         routing, validation, pools and serialization are included
+
+Payloads come from benchmarks/generators.py and are seeded, so runs are
+reproducible. Each result has throughput and p50/p95/p99 latency in ms.
+
+    python benchmarks/suite.py --quick
+    python benchmarks/suite.py --rosters 100,1000,10000,100000 --output results.json
+    python benchmarks/suite.py --load-only --concurrency 16 --requests 500 --scenarios skills-match,radar-png
+
+Prints one JSON document (and writes it to --output if given).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+os.environ.setdefault("MODEL_LOAD_MODE", "eager")
+
+import generators  # noqa: E402
+
+
+def summarize(latencies_s: List[float], wall_s: float, errors: int = 0) -> Dict[str, Any]:
+    ms = np.array(latencies_s) * 1000
+    return {
+        "requests": len(latencies_s),
+        "errors": errors,
+        "throughputPerSecond": len(latencies_s) / wall_s if wall_s > 0 else None,
+        "meanMs": float(ms.mean()) if len(ms) else None,
+        "p50Ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p95Ms": float(np.percentile(ms, 95)) if len(ms) else None,
+        "p99Ms": float(np.percentile(ms, 99)) if len(ms) else None,
+    }
+
+
+# Micro-benchmarks
+
+def micro(name: str, fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - started
+    latencies = []
+    wall_started = time.perf_counter()
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    result = summarize(latencies, time.perf_counter() - wall_started)
+    return {"name": name, "coldMs": cold * 1000, **result}
+
+
+def micro_cases(main, rosters: List[int], repeats: int) -> List[Tuple[str, Callable[[], Any], int]]:
+    loop = asyncio.new_event_loop()
+    cases = []
+
+    for n in rosters:
+        request = main.SkillsMatchRequest(**generators.skills_match(n, seed=n))
+        cases.append((f"skills-match/exact/{n}", lambda r=request: main.compute_skills_match_exact(r), max(3, repeats * 100 // max(n, 100))))
+        if n >= 10000:
+            request = main.SkillsMatchRequest(**generators.skills_match(n, seed=n), searchMode="ann")
+            cases.append((f"skills-match/ann/{n}", lambda r=request: main.compute_skills_match_ann(r), max(3, repeats * 100 // n)))
+
+    for n, projects in ((1000, 100),):
+        for solver in ("optimal", "greedy"):
+            request = main.AllocationRequest(**generators.allocation(n, projects, seed=n))
+            cases.append((f"allocate/{solver}/{n}x{projects}", lambda r=request, s=solver: main.compute_allocation(r, s), max(3, repeats // 10)))
+
+    # Body validation and response encoding: FastAPI's default path vs FAST_JSON
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fast_json import FastJSONResponse
+    for n in rosters:
+        payload = {**generators.skills_match(n, seed=n), "topK": n}
+        body = json.dumps(payload).encode("utf-8")
+        response = main.compute_skills_match_exact(main.SkillsMatchRequest(**payload))
+        reps = max(3, repeats * 100 // max(n, 100))
+        cases.append((f"codec/validate/default/{n}", lambda b=body: main.SkillsMatchRequest.model_validate(json.loads(b)), reps))
+        cases.append((f"codec/validate/fast/{n}", lambda b=body: main.SkillsMatchRequest.model_validate_json(b), reps))
+        cases.append((f"codec/respond/default/{n}", lambda r=response: JSONResponse(jsonable_encoder(r)), reps))
+        cases.append((f"codec/respond/fast/{n}", lambda r=response: FastJSONResponse(r), reps))
+
+    for n, sentences in ((100, 5), (100, 20), (1000, 10)):
+        request = main.RankResumesRequest(**generators.rank_resumes(n, sentences, seed=n))
+        cases.append((f"rank-resumes/{n}x{sentences}", lambda r=request: main.compute_rank_resumes(r), max(3, repeats // 10)))
+    request = main.RankResumesRequest(**generators.rank_resumes(100, 40, seed=7, chunking=True))
+    cases.append(("rank-resumes/chunked/100x40", lambda r=request: main.compute_rank_resumes(r), max(3, repeats // 10)))
+
+    description = generators.job_description(1)
+    cases.append(("generate-ideal-profile", lambda: main.build_ideal_profile(description), repeats))
+    onboarding = main.OnboardingRequest(**generators.onboarding(1))
+    cases.append(("generate-onboarding", lambda: loop.run_until_complete(main.generate_onboarding(onboarding)), repeats))
+    questions = main.GenerateQuestionsRequest(**generators.questions(1))
+    cases.append(("generate-questions", lambda: loop.run_until_complete(main.generate_questions(questions)), repeats))
+    cases.append(("perf-insight", lambda: loop.run_until_complete(main.perf_insight("0" * 24)), repeats))
+
+    from radar import render_radar_png, render_radar_svg
+    values = main.radar_values(main.RadarChartRequest(**generators.radar(1)))
+    cases.append(("radar/png", lambda: render_radar_png(values), max(3, repeats // 10)))
+    cases.append(("radar/svg", lambda: render_radar_svg(values), repeats))
+    return cases
+
+
+# In-process load driver
+
+async def lifespan(app, event: str, state: Dict[str, Any]):
+    """Drive the ASGI lifespan protocol so startup/shutdown handlers run."""
+    if event == "startup":
+        inbox: asyncio.Queue = asyncio.Queue()
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(message):
+            await done.put(message)
+
+        state["inbox"] = inbox
+        state["task"] = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+        await inbox.put({"type": "lifespan.startup"})
+        message = await done.get()
+        state["done"] = done
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"startup failed: {message}")
+    else:
+        await state["inbox"].put({"type": "lifespan.shutdown"})
+        await state["done"].get()
+        await state["task"]
+
+
+def load_scenarios(rosters: List[int]) -> Dict[str, Callable[[int], Tuple[str, str, Optional[dict]]]]:
+    roster = min(max(rosters), 1000)
+    return {
+        "health": lambda i: ("GET", "/health", None),
+        "generate-onboarding": lambda i: ("POST", "/ai/generate-onboarding", generators.onboarding(i)),
+        "generate-questions": lambda i: ("POST", "/ai/generate-questions", generators.questions(i)),
+        "generate-ideal-profile": lambda i: ("POST", "/ai/generate-ideal-profile", {"job_description": generators.job_description(i)}),
+        "skills-match": lambda i: ("POST", "/ai/skills-match", generators.skills_match(roster, seed=i)),
+        "rank-resumes": lambda i: ("POST", "/ai/rank-resumes", generators.rank_resumes(50, 10, seed=i)),
+        "allocate": lambda i: ("POST", "/ai/allocate", generators.allocation(roster, 20, seed=i)),
+        "perf-insight": lambda i: ("GET", f"/ai/perf-insight?employeeId={i:024x}", None),
+        "query": lambda i: ("POST", "/ai/query", generators.query(i)),
+        "radar-png": lambda i: ("POST", "/ai/generate-performance-radar", generators.radar(i)),
+        "radar-svg": lambda i: ("POST", "/ai/generate-performance-radar", generators.radar(i, "svg")),
+        "radar-batch": lambda i: ("POST", "/ai/generate-performance-radar/batch", generators.radar_batch(20, seed=i)),
+        "metrics": lambda i: ("GET", "/metrics", None),
+    }
+
+
+async def drive(client, name: str, make: Callable[[int], Tuple[str, str, Optional[dict]]],
+                requests: int, concurrency: int, distinct: int) -> Dict[str, Any]:
+    # Payloads are built up front so generation time is not measured.
+    payloads = [make(i % distinct) for i in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    cursor = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in cursor:
+            method, path, body = payloads[i]
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {"name": name, "concurrency": concurrency, "distinctPayloads": distinct,
+            **summarize(latencies, time.perf_counter() - wall_started, errors)}
+
+
+async def run_load(main, scenarios: Dict[str, Callable], requests: int, concurrency: int, distinct: int) -> List[Dict[str, Any]]:
+    import httpx
+
+    state: Dict[str, Any] = {}
+    await lifespan(main.app, "startup", state)
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            results = []
+            for name, make in scenarios.items():
+                await drive(client, name, make, min(requests, concurrency * 2), concurrency, distinct)  # warm-up
+                results.append(await drive(client, name, make, requests, concurrency, distinct))
+            return results
+    finally:
+        await lifespan(main.app, "shutdown", state)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rosters", help="employee roster sizes for skills-match (default 100,1000,10000,100000)")
+    parser.add_argument("--repeats", type=int, help="micro-benchmark repetitions, scaled down for big inputs (default 50)")
+    parser.add_argument("--requests", type=int, help="requests per load scenario (default 200)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=50, help="distinct payloads per load scenario (controls cache hits)")
+    parser.add_argument("--scenarios", help="comma-separated subset of load scenarios")
+    parser.add_argument("--micro-only", action="store_true")
+    parser.add_argument("--load-only", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="small rosters and few requests, for smoke runs")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    defaults = {"rosters": "100,1000", "repeats": 10, "requests": 40} if args.quick else \
+        {"rosters": "100,1000,10000,100000", "repeats": 50, "requests": 200}
+    for name, value in defaults.items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    import main
+
+    rosters = [int(n) for n in args.rosters.split(",")]
+    report: Dict[str, Any] = {
+        "benchmark": "suite",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "micro": [],
+        "load": [],
+    }
+
+    scenarios = load_scenarios(rosters)
+    if args.scenarios:
+        wanted = args.scenarios.split(",")
+        unknown = set(wanted) - set(scenarios)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = {name: scenarios[name] for name in wanted}
+
+    # The service logs with print(); keep stdout for the report.
+    with contextlib.redirect_stdout(sys.stderr):
+        if not args.load_only:
+            main.load_models()
+            report["micro"] = [micro(name, fn, repeats) for name, fn, repeats in micro_cases(main, rosters, args.repeats)]
+        if not args.micro_only:
+            report["load"] = asyncio.run(run_load(main, scenarios, args.requests, args.concurrency, args.distinct))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,110 @@
+"""
+Overlapping-window chunking for long documents and per-document score pooling.
+
+all-MiniLM-L6-v2 truncates input at 256 word pieces, so a long resume would
+otherwise be ranked on its first paragraph only. Documents are split into
+token windows, all windows are encoded in one pass and the window
+similarities are pooled back to one score per document.
+"""
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+POOLING_MODES = ("max", "mean", "topk_mean")
+
+_WORD = re.compile(r"\S+")
+
+
+def _token_offsets(texts: Sequence[str], tokenizer) -> List[List[Tuple[int, int]]]:
+    """Character offsets of each token; falls back to whitespace words."""
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(list(texts), add_special_tokens=False,
+                                return_offsets_mapping=True, truncation=False)
+            return [list(map(tuple, offsets)) for offsets in encoded["offset_mapping"]]
+        except (TypeError, KeyError, NotImplementedError):
+            pass
+    return [[m.span() for m in _WORD.finditer(text)] for text in texts]
+
+
+def chunk_texts(texts: Sequence[str], tokenizer=None, window: int = 200,
+                overlap: int = 50) -> List[List[Tuple[str, int]]]:
+    """
+    Split each text into windows of at most `window` tokens, consecutive
+    windows sharing `overlap` tokens. Returns (chunk text, token count) lists.
+    """
+    stride = max(1, window - overlap)
+    chunks = []
+    for text, offsets in zip(texts, _token_offsets(texts, tokenizer)):
+        if len(offsets) <= window:
+            chunks.append([(text, len(offsets))])
+            continue
+        doc_chunks = []
+        for start in range(0, len(offsets), stride):
+            span = offsets[start:start + window]
+            doc_chunks.append((text[span[0][0]:span[-1][1]], len(span)))
+            if start + window >= len(offsets):
+                break
+        chunks.append(doc_chunks)
+    return chunks
+
+
+def first_chunk_tokens(chunks: List[List[Tuple[str, int]]]) -> int:
+    """Tokens needed to score every document at all: its first chunk each."""
+    return sum(doc_chunks[0][1] for doc_chunks in chunks if doc_chunks)
+
+
+def select_chunks(chunks: List[List[Tuple[str, int]]], token_budget: Optional[int]) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Pick (document, chunk) pairs within the token budget, which is a hard cap.
+    Every document gets its first chunk, so the budget must cover
+    `first_chunk_tokens` (ValueError otherwise); further chunks are taken
+    round-robin so that the rest is spread across documents instead of spent
+    on the longest one. Returns the pairs in document order and the tokens used.
+    """
+    used = first_chunk_tokens(chunks)
+    if token_budget is not None and used > token_budget:
+        raise ValueError(f"token budget {token_budget} is below the {used} tokens of the first window of each document")
+    selected = [(doc, 0) for doc in range(len(chunks)) if chunks[doc]]
+    depth = 1
+    remaining = True
+    while remaining:
+        remaining = False
+        for doc, doc_chunks in enumerate(chunks):
+            if depth >= len(doc_chunks):
+                continue
+            remaining = True
+            tokens = doc_chunks[depth][1]
+            if token_budget is not None and used + tokens > token_budget:
+                remaining = False
+                break
+            selected.append((doc, depth))
+            used += tokens
+        depth += 1
+    selected.sort()
+    return selected, used
+
+
+def pool_scores(similarities: np.ndarray, owners: np.ndarray, n_docs: int,
+                pooling: str = "max", top_k: int = 2) -> np.ndarray:
+    """
+    Pool chunk similarities into one score per document. `owners` must be
+    sorted (chunks of a document contiguous) and cover every document.
+    """
+    starts = np.searchsorted(owners, np.arange(n_docs))
+    if pooling == "max":
+        return np.maximum.reduceat(similarities, starts)
+    if pooling == "mean":
+        counts = np.diff(np.append(starts, len(owners)))
+        return np.add.reduceat(similarities, starts) / counts
+    if pooling == "topk_mean":
+        bounds = np.append(starts, len(owners))
+        pooled = np.empty(n_docs, dtype=similarities.dtype)
+        for doc in range(n_docs):
+            doc_scores = similarities[bounds[doc]:bounds[doc + 1]]
+            if len(doc_scores) > top_k:
+                doc_scores = np.partition(doc_scores, len(doc_scores) - top_k)[-top_k:]
+            pooled[doc] = doc_scores.mean()
+        return pooled
+    raise ValueError(f"Unknown pooling mode '{pooling}', expected one of {POOLING_MODES}")
@@ -0,0 +1,64 @@
+"""
+Accept header negotiation for endpoints that answer JSON by default.
+
+A client opts into another representation (a raw image, a zip, a multipart
+body) by ranking it above JSON. Media ranges are matched by specificity
+(`image/png` over `image/*` over `*/*`) and weighed by their q-value, so
+`image/png;q=0` or a bare `*/*` leave the JSON default in place.
+"""
+from typing import List, Tuple
+
+# (type, subtype, q) per media range
+MediaRanges = List[Tuple[str, str, float]]
+
+
+def parse_accept(header: str) -> MediaRanges:
+    ranges = []
+    for part in header.split(","):
+        media_range, *params = [piece.strip() for piece in part.split(";")]
+        if media_range.count("/") != 1:
+            continue
+        main_type, subtype = media_range.lower().split("/")
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges.append((main_type, subtype, q))
+    return ranges
+
+
+def _quality(ranges: MediaRanges, media_type: str) -> Tuple[float, int]:
+    """The q-value of the most specific range matching `media_type`, with that specificity (0-2)."""
+    main_type, subtype = media_type.lower().split("/")
+    best = (0.0, -1)
+    for range_type, range_subtype, q in ranges:
+        if range_type == main_type and range_subtype == subtype:
+            specificity = 2
+        elif range_type == main_type and range_subtype == "*":
+            specificity = 1
+        elif range_type == "*" and range_subtype == "*":
+            specificity = 0
+        else:
+            continue
+        if specificity > best[1]:
+            best = (q, specificity)
+    return best
+
+
+def prefers_media(header: str, media_type: str, default: str = "application/json") -> bool:
+    """
+    True if `header` ranks `media_type` above `default`: a higher q-value, or
+    the same q-value through a more specific range.
+    """
+    if not header:
+        return False
+    ranges = parse_accept(header)
+    q, specificity = _quality(ranges, media_type)
+    default_q, default_specificity = _quality(ranges, default)
+    if q <= 0:
+        return False
+    return q > default_q or (q == default_q and specificity > default_specificity)
@@ -0,0 +1,69 @@
+"""
+Selectable embedding backends.
+
+Every backend wraps the same sentence-transformers checkpoint and exposes
+`encode` and `tokenizer`, so the rest of the service does not care which
+one is active:
+
+  fp32  the model as published, float32 PyTorch on CPU
+  int8  the same model with its Linear layers dynamically quantized to int8
+        (weights stored as int8, activations quantized per batch); faster on
+        CPUs with AVX2/AVX-512 VNNI at a small accuracy cost, which
+        benchmarks/embedding.py measures against fp32
+
+Output vectors can be returned as float16 to halve what caches and stores
+hold. Intra-op thread count is applied in `warm()`, which runs in each
+worker after serve.py forks, so the parent never starts a torch thread pool.
+"""
+from typing import List
+
+import numpy as np
+
+BACKENDS = ("fp32", "int8")
+OUTPUT_DTYPES = ("float32", "float16")
+
+
+class EmbeddingBackend:
+    def __init__(self, model_name: str, backend: str = "fp32", output_dtype: str = "float32", threads: int = 0):
+        if backend not in BACKENDS:
+            raise ValueError(f"EMBEDDING_BACKEND must be one of {', '.join(BACKENDS)}")
+        if output_dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"EMBEDDING_OUTPUT_DTYPE must be one of {', '.join(OUTPUT_DTYPES)}")
+        self.model_name = model_name
+        self.backend = backend
+        self.output_dtype = np.dtype(output_dtype)
+        self.threads = threads
+        self.model = None
+
+    @property
+    def cache_name(self) -> str:
+        """Name for cache keys: quantized vectors differ from fp32 ones and must not mix."""
+        return self.model_name if self.backend == "fp32" else f"{self.model_name}@{self.backend}"
+
+    def load(self) -> "EmbeddingBackend":
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(self.model_name, device="cpu")
+        if self.backend == "int8":
+            import torch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        return self
+
+    def warm(self):
+        if self.threads > 0:
+            import torch
+            torch.set_num_threads(self.threads)
+        self.encode(["warm-up"])
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def tokenizer(self):
+        return getattr(self.model, "tokenizer", None)
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True, **kwargs)
+        return np.asarray(vectors).astype(self.output_dtype, copy=False)
+
@@ -0,0 +1,265 @@
+"""
+Content-addressed cache for sentence embeddings.
+
+Vectors are keyed by a hash of the normalized text plus the model name, so the
+same resume or skill string is encoded at most once per model. There is an
+in-memory LRU tier bounded by bytes and an optional on-disk tier backed by a
+memory-mapped array that survives restarts.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one process per directory
+    fcntl = None
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic edits don't produce new cache keys."""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, model_name: str) -> str:
+    digest = hashlib.sha1()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiskTier:
+    """
+    Append-only vector store: one raw array file plus a key list.
+
+    Row i of `vectors.bin` belongs to line i of `keys.txt`. Vectors are written
+    before their keys, so a crash mid-append leaves at worst an unreferenced row.
+
+    Several worker processes may share the directory. Appends hold an exclusive
+    lock on a file in it, first read the keys other processes appended and
+    drop any unreferenced rows, so the next row is always the number of keys
+    in the file. Readers pick up new keys with `refresh`, reading only the
+    complete lines past what they already know.
+    """
+
+    def __init__(self, directory: str, model_name: str, dtype: str = "float16"):
+        slug = model_name.replace("/", "_")
+        self.directory = os.path.join(directory, slug)
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, "vectors.bin")
+        self.keys_path = os.path.join(self.directory, "keys.txt")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.lock_path = os.path.join(self.directory, ".lock")
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        # lines of keys.txt read so far, and the byte offset just past them
+        self._count = 0
+        self._offset = 0
+        self._mmap = None
+        with self._file_lock():
+            self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta.get("dtype") != self.dtype.name:
+            # Stored with a different precision; start over rather than mix.
+            self._reset()
+            return
+        self.dim = meta["dim"]
+        self.refresh()
+
+    def _reset(self):
+        for path in (self.vectors_path, self.keys_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+        self.rows = {}
+        self._count = 0
+        self._offset = 0
+        self._mmap = None
+
+    def refresh(self):
+        """Read keys appended to `keys.txt` since the last call, by this or another process."""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        try:
+            if os.path.getsize(self.keys_path) <= self._offset:
+                return
+        except FileNotFoundError:
+            return
+        row_bytes = self.dim * self.dtype.itemsize
+        stored_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        with open(self.keys_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # A line still being written has no newline yet; leave it for the next refresh
+        data = data[:data.rfind(b"\n") + 1]
+        for line in data.split(b"\n")[:-1]:
+            if self._count >= stored_rows:
+                break
+            self.rows.setdefault(line.decode("utf-8").strip(), self._count)
+            self._count += 1
+            self._offset += len(line) + 1
+        self._mmap = None
+
+    def _view(self):
+        if self._mmap is None and self._count:
+            self._mmap = np.memmap(self.vectors_path, dtype=self.dtype, mode="r",
+                                   shape=(self._count, self.dim))
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.asarray(self._view()[row], dtype=np.float32)
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray):
+        if all(key in self.rows for key in keys):
+            return
+        with self._file_lock():
+            self.refresh()
+            positions = {key: i for i, key in enumerate(keys)}
+            fresh = [key for key in positions if key not in self.rows]
+            if not fresh:
+                return
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+            block = np.ascontiguousarray(vectors[[positions[key] for key in fresh]], dtype=self.dtype)
+            with open(self.vectors_path, "ab") as f:
+                # Rows past the last key were left by a crashed append; overwrite them
+                f.truncate(self._count * self.dim * self.dtype.itemsize)
+                f.write(block.tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.truncate(self._offset)
+                f.write("".join(key + "\n" for key in fresh).encode("utf-8"))
+            self.refresh()
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache. Only texts missing from both tiers reach the
+    encode function, and they are encoded together in one call.
+    """
+
+    def __init__(self, model_name: str, max_bytes: int = 256 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, disk_dtype: str = "float16", memory_dtype: str = "float32"):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.memory_dtype = np.dtype(memory_dtype)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.disk = DiskTier(disk_dir, model_name, disk_dtype) if disk_dir else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        vector = vector.astype(self.memory_dtype, copy=False)
+        if vector.nbytes > self.max_bytes:
+            return
+        self._memory[key] = vector
+        self._bytes += vector.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return one float32 row per text, calling `encode_fn` only for misses."""
+        keys = [cache_key(t, self.model_name) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        with self._lock:
+            if self.disk is not None:
+                self.disk.refresh()
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                vector = self._lookup(key)
+                if vector is None:
+                    missing[key] = text
+                else:
+                    found[key] = vector
+            self.misses += len(missing)
+
+        if missing:
+            miss_keys = list(missing)
+            encoded = np.asarray(encode_fn([missing[k] for k in miss_keys]), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(miss_keys, encoded):
+                    vector = vector.astype(self.memory_dtype)
+                    found[key] = vector
+                    self._remember(key, vector)
+                if self.disk is not None:
+                    self.disk.put_many(miss_keys, encoded)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys]).astype(np.float32, copy=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRatio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memoryEntries": len(self._memory),
+                "memoryBytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "diskEntries": len(self.disk) if self.disk is not None else 0,
+            }
@@ -0,0 +1,100 @@
+"""
+Execution layer that keeps blocking work off the asyncio event loop.
+
+Model inference runs on a bounded thread pool (torch releases the GIL inside
+encode) and matplotlib rendering runs on a process pool. Each pool caps how
+many calls may be queued or running at once and every call has a timeout, so a
+single heavy request cannot starve `/health` or the cheaper endpoints.
+"""
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class PoolSaturated(Exception):
+    """Raised when a pool already holds its maximum number of pending calls."""
+
+
+class PoolTimeout(Exception):
+    """Raised when a call does not finish within its timeout."""
+
+
+class BoundedPool:
+    """
+    Wraps an executor with a pending-call limit.
+
+    The pending count is released when the work actually finishes, not when
+    the caller gives up, so a timed-out call still occupies its slot until the
+    worker is free again.
+    """
+
+    def __init__(self, name: str, executor: Executor, workers: int, max_queue: int):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: float = None) -> Any:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.name} pool is saturated ({self.pending} pending calls)")
+            self.pending += 1
+        if isinstance(self.executor, ThreadPoolExecutor):
+            # Like asyncio.to_thread: the call sees the caller's context variables.
+            fn, args = contextvars.copy_context().run, (fn, *args)
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"{self.name} call exceeded {timeout}s")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "maxPending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def thread_pool(name: str, workers: int, max_queue: int) -> BoundedPool:
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+    return BoundedPool(name, executor, workers, max_queue)
+
+
+def process_pool(name: str, workers: int, max_queue: int, start_method: str = "spawn") -> BoundedPool:
+    """
+    Process pool for CPU-bound Python work. `spawn` is the default because
+    forking a process that already holds torch threads is unsafe.
+    """
+    context = multiprocessing.get_context(start_method)
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return BoundedPool(name, executor, workers, max_queue)
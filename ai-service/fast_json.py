@@ -0,0 +1,63 @@
+"""
+Opt-in fast paths for request parsing and response encoding.
+
+FastAPI turns a returned dict into JSON in two passes: `jsonable_encoder`
+walks and copies the whole structure, then `json.dumps` encodes the copy. For
+responses with thousands of items the first pass dominates. `FastJSONResponse`
+encodes the content in one pass, with orjson when it is installed (which also
+writes NumPy arrays and scalars directly) and with the standard library
+otherwise.
+
+On the way in, FastAPI decodes the body into Python dicts and validates those.
+`json_body` validates the raw bytes with pydantic's JSON mode instead, which
+skips building a dict per list item.
+"""
+import json
+from typing import Any, Type
+
+import numpy as np
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _numpy_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def fast_dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_numpy_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return fast_dumps(content)
+
+
+def json_body(model: Type[BaseModel]):
+    """Dependency returning the request body validated as `model` straight from its bytes."""
+    async def parse(request: Request) -> BaseModel:
+        body = await request.body()
+        if not body:
+            raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+        try:
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            # Same shape as FastAPI's own body errors: locations start with "body"
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
+    return parse
@@ -0,0 +1,75 @@
+"""
+Content-addressed cache for rendered chart images.
+
+A chart is fully determined by its score vector and render settings, so the
+hash of those is both the cache key and the HTTP ETag. Scores are on a 1-5
+scale and repeat a lot across employees, which makes an in-memory LRU bounded
+by bytes very effective. Each image is stored with its media type, so a
+lookup by key alone can serve it correctly.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+
+def chart_key(values: Sequence[float], fmt: str, size: float, dpi: int) -> str:
+    """Stable key for one chart; dpi is ignored for SVG, which has none."""
+    digest = hashlib.sha1()
+    digest.update(f"{fmt}|{float(size)!r}|{int(dpi) if fmt == 'png' else 0}|".encode("utf-8"))
+    digest.update(",".join(repr(float(v)) for v in values).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ImageCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # key -> (image, media type)
+        self._images: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.entry(key)
+        return None if entry is None else entry[0]
+
+    def entry(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """The cached image and its media type."""
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, image: bytes, media_type: str):
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return
+            if len(image) > self.max_bytes:
+                return
+            self._images[key] = (image, media_type)
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._images),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+            }
@@ -1,28 +1,387 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
 from typing import List, Optional, Dict, Any
+import asyncio
+import functools
+import io
+import itertools
+import os
 import re
+import tempfile
+import threading
+import time
 from datetime import datetime
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from types import MappingProxyType
 import numpy as np
-from io import BytesIO
 import base64
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import uuid
+import zipfile
+
+from admission import AdmissionController, Lane, PayloadLimitMiddleware, estimate_cost
+from allocation import SOLVERS, assign
+from ann_index import IndexPool, IVFIndex
+from attrition import AttritionModel, FeatureCache, group_by_employee, record_id
+from batching import MicroBatcher
+from chunking import POOLING_MODES, chunk_texts, first_chunk_tokens, pool_scores, select_chunks
+from content_negotiation import prefers_media
+from embedding_backend import EmbeddingBackend
+from embedding_cache import EmbeddingCache
+from executors import PoolSaturated, PoolTimeout, process_pool, thread_pool
+from fast_json import FastJSONResponse, json_body
+from image_cache import ImageCache, chart_key
+from packed_embeddings import merge_supplied, pack
+from metrics import Gauge, MetricsMiddleware, encode_batch_size, encode_tokens, registry, stage
+from near_duplicates import NearDuplicateDetector
+from profiler import SamplingProfiler
+from radar import render_radar_png_batch, render_radar_svg
+from rag import DocumentIndex, iter_pdf_pages
+from ranking_sessions import RankingSession, SessionStore
+from response_cache import ResponseCache, dumps, response_key, with_leading_field
+from skill_matcher import SkillMatcher, load_taxonomy
+from skill_vocabulary import SkillVocabulary
+from streaming import NDJSONStreamResponse, TopKHeap
+from vector_store import VectorStore, normalize_rows, top_k_indices
 
 app = FastAPI(title="HRMS AI Service", version="1.0.0")
 
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# "fp32" or "int8" (dynamically quantized Linear layers); see embedding_backend.py
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "fp32")
+EMBEDDING_OUTPUT_DTYPE = os.getenv("EMBEDDING_OUTPUT_DTYPE", "float32")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+
+embedding_backend = EmbeddingBackend(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, EMBEDDING_OUTPUT_DTYPE, EMBEDDING_THREADS)
 embedding_model = None
+embedding_cache = EmbeddingCache(
+    embedding_backend.cache_name,
+    max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    disk_dir=os.getenv("EMBEDDING_CACHE_DIR") or None,
+    disk_dtype=os.getenv("EMBEDDING_CACHE_DISK_DTYPE", "float16"),
+    memory_dtype=EMBEDDING_OUTPUT_DTYPE,
+)
+resume_index = VectorStore(os.getenv("RESUME_INDEX_DIR") or None)
+
+# Skill keyword extraction, compiled once from the taxonomy file
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json"))
+skill_matcher = SkillMatcher(load_taxonomy(SKILL_TAXONOMY_PATH))
+
+# Skill vocabulary: each distinct skill is embedded once. "pooled" builds skill-set
+# vectors from those rows; "joined" embeds the comma-joined skill list as before.
+# Skill strings are canonicalized with a synonym table of spelling variants only
+# (the taxonomy's aliases are "implies" keywords such as django -> python).
+SKILL_VECTOR_MODE = os.getenv("SKILL_VECTOR_MODE", "pooled")
+SKILL_MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.8"))
+SKILL_SYNONYMS_PATH = os.getenv("SKILL_SYNONYMS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_synonyms.json"))
+skill_synonym_table = load_taxonomy(SKILL_SYNONYMS_PATH)
+skill_synonyms = SkillMatcher(skill_synonym_table)
+skill_vocabulary = SkillVocabulary(lambda skills: encode_texts(skills), skill_synonyms.canonical,
+                                   lambda: embedding_backend.dimension,
+                                   int(os.getenv("SKILL_VOCABULARY_MAX_SKILLS", "50000")))
+
+# Long-resume chunking (all-MiniLM-L6-v2 truncates at 256 word pieces)
+RESUME_CHUNK_TOKENS = int(os.getenv("RESUME_CHUNK_TOKENS", "200"))
+RESUME_CHUNK_OVERLAP = int(os.getenv("RESUME_CHUNK_OVERLAP", "50"))
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "200000"))
+
+# Near-duplicate collapsing before rank-resumes embeds anything
+RESUME_DEDUP = os.getenv("RESUME_DEDUP", "0") == "1"
+resume_dedup = NearDuplicateDetector(
+    threshold=float(os.getenv("RESUME_DEDUP_THRESHOLD", "0.8")),
+    num_perm=int(os.getenv("RESUME_DEDUP_NUM_PERM", "128")),
+    bands=int(os.getenv("RESUME_DEDUP_BANDS", "16")),
+    shingle_size=int(os.getenv("RESUME_DEDUP_SHINGLE_WORDS", "3")),
+)
+
+# Policy document retrieval for /ai/query
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR") or None
+RAG_MAX_UPLOAD_BYTES = int(os.getenv("RAG_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+document_index = DocumentIndex(
+    RAG_INDEX_DIR,
+    encode_fn=lambda texts: encode_texts(texts),
+    chunk_fn=lambda texts: chunk_texts(texts, getattr(embedding_model, "tokenizer", None), RESUME_CHUNK_TOKENS, RESUME_CHUNK_OVERLAP),
+)
+
+# Approximate search for skills-match on large rosters
+SKILLS_MATCH_SEARCH_MODE = os.getenv("SKILLS_MATCH_SEARCH_MODE", "exact")
+ANN_MIN_EMPLOYEES = int(os.getenv("ANN_MIN_EMPLOYEES", "5000"))
+ANN_N_PROBE = int(os.getenv("ANN_N_PROBE", "16"))
+# One index per roster (`rosterKey`, or the set of employee ids)
+employee_ann_indexes = IndexPool(lambda: IVFIndex(n_probe=ANN_N_PROBE), int(os.getenv("ANN_MAX_INDEXES", "4")))
+
+# Multi-project allocation: "optimal" (HiGHS via SciPy, greedy if unavailable)
+# or "greedy"; only the best ALLOCATION_CANDIDATES_PER_SEAT employees per seat
+# are considered
+ALLOCATION_SOLVER = os.getenv("ALLOCATION_SOLVER", "optimal")
+ALLOCATION_CANDIDATES_PER_SEAT = int(os.getenv("ALLOCATION_CANDIDATES_PER_SEAT", "20"))
+ALLOCATION_TIME_LIMIT_S = float(os.getenv("ALLOCATION_TIME_LIMIT_S", "10"))
+
+# Execution pools: encode on threads, matplotlib on processes
+ENCODE_POOL_WORKERS = int(os.getenv("ENCODE_POOL_WORKERS", "2"))
+ENCODE_POOL_MAX_QUEUE = int(os.getenv("ENCODE_POOL_MAX_QUEUE", "32"))
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", "2"))
+RENDER_POOL_MAX_QUEUE = int(os.getenv("RENDER_POOL_MAX_QUEUE", "16"))
+ENDPOINT_TIMEOUTS = {
+    "skills-match": float(os.getenv("SKILLS_MATCH_TIMEOUT_S", "30")),
+    "rank-resumes": float(os.getenv("RANK_RESUMES_TIMEOUT_S", "60")),
+    "generate-performance-radar": float(os.getenv("RADAR_TIMEOUT_S", "15")),
+    "generate-performance-radar-batch": float(os.getenv("RADAR_BATCH_TIMEOUT_S", "120")),
+    "resume-index": float(os.getenv("RESUME_INDEX_TIMEOUT_S", "120")),
+    "docs-ingest": float(os.getenv("DOCS_INGEST_TIMEOUT_S", "600")),
+    "query": float(os.getenv("QUERY_TIMEOUT_S", "10")),
+    "embed": float(os.getenv("EMBED_TIMEOUT_S", "120")),
+    "allocate": float(os.getenv("ALLOCATE_TIMEOUT_S", "60")),
+    "perf-insight": float(os.getenv("PERF_INSIGHT_TIMEOUT_S", "60")),
+}
+
+# Admission control (admission.py). Each heavy endpoint has a lane with a
+# concurrency limit and a cost budget; one cost unit is an item (employee,
+# resume, chart) or ADMISSION_CHARS_PER_UNIT characters of text. Requests that
+# do not fit wait up to ADMISSION_MAX_WAIT_S, then get 429 with Retry-After.
+# Cheap requests (cost <= ADMISSION_LIGHT_COST) and the query endpoint use the
+# priority lane and their own small pool, so they never queue behind bulk work.
+ADMISSION_CHARS_PER_UNIT = int(os.getenv("ADMISSION_CHARS_PER_UNIT", "1000"))
+ADMISSION_LIGHT_COST = float(os.getenv("ADMISSION_LIGHT_COST", "50"))
+ADMISSION_MAX_WAIT_S = float(os.getenv("ADMISSION_MAX_WAIT_S", "2"))
+PRIORITY_POOL_WORKERS = int(os.getenv("PRIORITY_POOL_WORKERS", "2"))
+PRIORITY_POOL_MAX_QUEUE = int(os.getenv("PRIORITY_POOL_MAX_QUEUE", "64"))
+
+
+def admission_lane(name: str, concurrency: int, budget: float, queue: int) -> Lane:
+    prefix = "ADMISSION_" + name.upper().replace("-", "_")
+    return Lane(
+        name,
+        int(os.getenv(prefix + "_CONCURRENCY", str(concurrency))),
+        float(os.getenv(prefix + "_BUDGET", str(budget))),
+        int(os.getenv(prefix + "_QUEUE", str(queue))),
+        ADMISSION_MAX_WAIT_S,
+    )
+
+
+admission = AdmissionController([
+    admission_lane("priority", 32, float("inf"), 64),
+    # Pooled skill vectors are vocabulary lookups, so an employee costs far less
+    # than a resume; the budget holds a 100k roster (ANN target) at a time
+    admission_lane("skills-match", 2, 100000, 8),
+    admission_lane("rank-resumes", 2, 20000, 8),
+    admission_lane("rank-resumes-stream", 2, float("inf"), 2),
+    admission_lane("resume-index", 1, 20000, 4),
+    admission_lane("embed", 2, 20000, 8),
+    admission_lane("allocate", 1, 20000, 4),
+    admission_lane("perf-insight", 2, 20000, 8),
+    admission_lane("docs-ingest", 1, float("inf"), 2),
+    admission_lane("radar-batch", 2, 2000, 4),
+])
+
+# Request body caps, enforced while the body streams in. The NDJSON stream
+# endpoint is uncapped; it limits each line instead.
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(1024 * 1024)))
+MAX_BULK_REQUEST_BYTES = int(os.getenv("MAX_BULK_REQUEST_BYTES", str(32 * 1024 * 1024)))
+
+# Attrition-risk model for /ai/perf-insight (trained by train_attrition.py)
+ATTRITION_MODEL_PATH = os.getenv("ATTRITION_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "attrition.joblib"))
+attrition_model = None
+attrition_features = FeatureCache()
+
+# Rendered radar charts, keyed by a hash of the scores and render settings
+RADAR_CACHE_MAX_BYTES = int(os.getenv("RADAR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RADAR_BATCH_MAX_CHARTS = int(os.getenv("RADAR_BATCH_MAX_CHARTS", "1000"))
+radar_cache = ImageCache(RADAR_CACHE_MAX_BYTES)
+
+# Serialized responses of the deterministic generators (onboarding, questions, ideal profile)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000")),
+    ttl_s=float(os.getenv("RESPONSE_CACHE_TTL_S", "3600")),
+)
+
+# Ranking sessions: candidate vectors kept so a changed ideal profile or weights
+# re-rank with one matrix-vector product (ranking_sessions.py). With several
+# workers the sessions are also written to a directory they share, since a
+# follow-up can reach any worker.
+RANKING_SESSION_DIR = os.getenv("RANKING_SESSION_DIR") or (
+    os.path.join(tempfile.gettempdir(), "ranking-sessions") if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else None
+)
+ranking_sessions = SessionStore(
+    max_sessions=int(os.getenv("RANKING_SESSION_MAX", "100")),
+    max_bytes=int(os.getenv("RANKING_SESSION_MAX_BYTES", str(512 * 1024 * 1024))),
+    ttl_s=float(os.getenv("RANKING_SESSION_TTL_S", "1800")),
+    directory=RANKING_SESSION_DIR,
+    # Employee sessions keep the request models; files hold them as plain JSON
+    item_codecs={"employees": (lambda employees: [emp.model_dump() for emp in employees],
+                               lambda data: [Employee.model_validate(emp) for emp in data])},
+)
+
+# Bulk endpoints validate bodies from raw bytes and encode responses in one
+# pass (orjson when installed); off keeps FastAPI's own parsing and encoding
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+
+# Micro-batching of concurrent encode calls
+ENCODE_BATCH_MAX_SIZE = int(os.getenv("ENCODE_BATCH_MAX_SIZE", "64"))
+ENCODE_BATCH_MAX_LATENCY_MS = float(os.getenv("ENCODE_BATCH_MAX_LATENCY_MS", "5"))
+# Bulk encode calls are fed to the model in slices of this many texts so small
+# requests can interleave (0 = whole call at once)
+ENCODE_MAX_CALL_TEXTS = int(os.getenv("ENCODE_MAX_CALL_TEXTS", "256"))
+
+# Metrics: every Nth encode batch is also tokenized to record token counts (0 disables)
+METRICS_TOKEN_SAMPLE_EVERY = int(os.getenv("METRICS_TOKEN_SAMPLE_EVERY", "10"))
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+profiler = SamplingProfiler()
+
+# "background" loads the model after startup so /health answers at once;
+# "eager" blocks startup until the model is warm.
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "background")
+
+encode_pool = None
+render_pool = None
+priority_pool = None
+encode_batcher = None
+_preloaded_model = None
+model_status = {"state": "pending", "preloaded": False, "loadSeconds": None, "warmupSeconds": None, "error": None}
+
+
+def cosine_similarity(a, b):
+    # sklearn is imported on first use to keep service import fast.
+    from sklearn.metrics.pairwise import cosine_similarity as sklearn_cosine_similarity
+    return sklearn_cosine_similarity(a, b)
+
+
+def create_model():
+    return embedding_backend.load()
+
+
+def preload_model():
+    """
+    Load the weights in the current process without running inference.
+    serve.py calls this before forking so workers share the weights
+    copy-on-write; no torch threads exist yet at that point.
+    """
+    global _preloaded_model
+    started = time.perf_counter()
+    _preloaded_model = create_model()
+    model_status["loadSeconds"] = time.perf_counter() - started
+    model_status["preloaded"] = True
+
+
+def load_and_warm_model():
+    """Load the model (unless preloaded), run one warm-up encode and publish it."""
+    global embedding_model, encode_batcher
+    try:
+        model = _preloaded_model
+        if model is None:
+            model_status["state"] = "loading"
+            print("Loading sentence-transformers model...")
+            started = time.perf_counter()
+            model = create_model()
+            model_status["loadSeconds"] = time.perf_counter() - started
+            print("Model loaded successfully!")
+        model_status["state"] = "warming"
+        started = time.perf_counter()
+        model.warm()
+        model_status["warmupSeconds"] = time.perf_counter() - started
+        encode_batcher = MicroBatcher(instrumented_encode(model), ENCODE_BATCH_MAX_SIZE, ENCODE_BATCH_MAX_LATENCY_MS,
+                                      ENCODE_MAX_CALL_TEXTS)
+        embedding_model = model
+        model_status["state"] = "ready"
+    except Exception as e:
+        model_status["state"] = "failed"
+        model_status["error"] = str(e)
+        print(f"Model load failed: {e}")
+
+
+def instrumented_encode(model):
+    """Wrap model.encode to record batch sizes, sampled token counts and model time."""
+    batches = itertools.count()
+
+    def encode(texts):
+        encode_batch_size.observe(len(texts))
+        tokenizer = model.tokenizer
+        if METRICS_TOKEN_SAMPLE_EVERY and tokenizer is not None and next(batches) % METRICS_TOKEN_SAMPLE_EVERY == 0:
+            with stage("tokenize"):
+                token_ids = tokenizer(texts)["input_ids"]
+            for ids in token_ids:
+                encode_tokens.observe(len(ids))
+        with stage("model"):
+            return model.encode(texts)
+    return encode
+
+
+def load_attrition_model():
+    """Load the trained attrition model if one exists; /ai/perf-insight falls back without it."""
+    global attrition_model
+    if not os.path.exists(ATTRITION_MODEL_PATH):
+        print(f"No attrition model at {ATTRITION_MODEL_PATH}; perf-insight stays in fallback mode")
+        return
+    try:
+        attrition_model = AttritionModel.load(ATTRITION_MODEL_PATH)
+        print("Attrition model loaded successfully!")
+    except Exception as e:
+        print(f"Attrition model load failed: {e}")
+
+
+def load_models():
+    load_attrition_model()
+    load_and_warm_model()
+
 
 @app.on_event("startup")
 async def load_model():
-    global embedding_model
-    print("Loading sentence-transformers model...")
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-    print("Model loaded successfully!")
+    global encode_pool, render_pool, priority_pool
+    encode_pool = thread_pool("encode", ENCODE_POOL_WORKERS, ENCODE_POOL_MAX_QUEUE)
+    priority_pool = thread_pool("priority", PRIORITY_POOL_WORKERS, PRIORITY_POOL_MAX_QUEUE)
+    render_pool = process_pool("render", RENDER_POOL_WORKERS, RENDER_POOL_MAX_QUEUE)
+    if MODEL_LOAD_MODE == "eager":
+        load_models()
+    else:
+        threading.Thread(target=load_models, name="model-loader", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    for pool in (encode_pool, render_pool, priority_pool):
+        if pool is not None:
+            pool.shutdown()
+
+
+async def run_in_pool(pool, endpoint: str, fn, *args):
+    """Run blocking work on a pool, mapping saturation to 503 and overruns to 504."""
+    try:
+        return await pool.run(fn, *args, timeout=ENDPOINT_TIMEOUTS[endpoint])
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except PoolTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+def bulk_body(model):
+    """Body parameter of a bulk endpoint: `model` validated straight from the bytes under FAST_JSON."""
+    return Depends(json_body(model)) if FAST_JSON else Body(...)
+
+
+def json_response(content: Dict[str, Any]):
+    """Return value of a bulk endpoint: encoded in one pass under FAST_JSON, left to FastAPI otherwise."""
+    return FastJSONResponse(content) if FAST_JSON else content
+
+
+def admit(lane: str, cost: float):
+    """
+    Admission for a request of `lane` costing `cost` units. Returns the context
+    manager holding the slot and the pool the work should run on.
+    """
+    if cost <= ADMISSION_LIGHT_COST:
+        return admission.admit("priority", cost), priority_pool
+    return admission.admit(lane, cost), encode_pool
+
+
+def texts_cost(texts: List[str]) -> float:
+    return estimate_cost(len(texts), sum(len(t) for t in texts), ADMISSION_CHARS_PER_UNIT)
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """Embed texts through the shared cache; only misses reach the model."""
+    with stage("encode"):
+        return embedding_cache.encode(texts, encode_batcher.encode)
 
 # CORS
 app.add_middleware(
@@ -32,6 +391,73 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    PayloadLimitMiddleware,
+    limits={
+        "/ai/skills-match": MAX_BULK_REQUEST_BYTES,
+        "/ai/rank-resumes": MAX_BULK_REQUEST_BYTES,
+        "/ai/rank-resumes/stream": None,
+        "/ai/resume-index/upsert": MAX_BULK_REQUEST_BYTES,
+        "/ai/embed": MAX_BULK_REQUEST_BYTES,
+        "/ai/allocate": MAX_BULK_REQUEST_BYTES,
+        "/ai/perf-insight/features": MAX_BULK_REQUEST_BYTES,
+        "/ai/generate-performance-radar/batch": MAX_BULK_REQUEST_BYTES,
+        "/ai/generate-ideal-profile/batch": MAX_BULK_REQUEST_BYTES,
+        "/ai/generate-onboarding/batch": MAX_BULK_REQUEST_BYTES,
+        "/ai/generate-questions/batch": MAX_BULK_REQUEST_BYTES,
+        "/ai/docs/ingest": RAG_MAX_UPLOAD_BYTES,
+    },
+    default=MAX_REQUEST_BYTES,
+)
+app.add_middleware(MetricsMiddleware)
+
+
+def cache_gauges():
+    for name, cache in (("embedding", embedding_cache), ("radar", radar_cache), ("response", response_cache)):
+        stats = cache.stats()
+        yield (name,), stats["hitRatio"]
+
+
+def cache_entries():
+    yield ("embedding",), embedding_cache.stats()["memoryEntries"]
+    yield ("radar",), radar_cache.stats()["entries"]
+    yield ("response",), response_cache.stats()["entries"]
+    yield ("skillVocabulary",), len(skill_vocabulary)
+    yield ("attritionFeatures",), attrition_features.stats()["employees"]
+    yield ("rankingSessions",), ranking_sessions.stats()["sessions"]
+
+
+def pool_gauge(field):
+    def collect():
+        for name, pool in (("encode", encode_pool), ("render", render_pool), ("priority", priority_pool)):
+            if pool is not None:
+                yield (name,), pool.stats()[field]
+    return collect
+
+
+def lane_gauge(field):
+    def collect():
+        for name, lane in admission.lanes.items():
+            yield (name,), lane.stats()[field]
+    return collect
+
+
+def model_gauges():
+    yield ("load",), model_status["loadSeconds"]
+    yield ("warmup",), model_status["warmupSeconds"]
+
+
+registry.register(Gauge("hrms_ai_cache_hit_ratio", "Hit ratio of the in-process caches.", ("cache",), cache_gauges))
+registry.register(Gauge("hrms_ai_cache_entries", "Entries held by the in-process caches.", ("cache",), cache_entries))
+registry.register(Gauge("hrms_ai_pool_pending", "Calls queued or running on an execution pool.", ("pool",), pool_gauge("pending")))
+registry.register(Gauge("hrms_ai_pool_workers", "Workers of an execution pool.", ("pool",), pool_gauge("workers")))
+registry.register(Gauge("hrms_ai_pool_rejected_total", "Calls rejected because a pool was saturated.", ("pool",), pool_gauge("rejected"), kind="counter"))
+registry.register(Gauge("hrms_ai_pool_timeouts_total", "Calls that exceeded their timeout.", ("pool",), pool_gauge("timeouts"), kind="counter"))
+registry.register(Gauge("hrms_ai_admission_active", "Requests holding a slot of an admission lane.", ("lane",), lane_gauge("active")))
+registry.register(Gauge("hrms_ai_admission_waiting", "Requests queued for an admission lane.", ("lane",), lane_gauge("waiting")))
+registry.register(Gauge("hrms_ai_admission_rejected_total", "Requests rejected with 429 by an admission lane.", ("lane",), lane_gauge("rejected"), kind="counter"))
+registry.register(Gauge("hrms_ai_model_seconds", "Embedding model load and warm-up time.", ("phase",), model_gauges))
+registry.register(Gauge("hrms_ai_model_ready", "1 once the embedding model is warm.", (), lambda: [((), 1 if embedding_model is not None else 0)]))
 
 
 # Models
@@ -43,6 +469,10 @@ class OnboardingRequest(BaseModel):
     constraints: Optional[Dict[str, Any]] = {"maxTasks": 12, "lang": "en", "format": "short"}
 
 
+class OnboardingBatchRequest(BaseModel):
+    requests: List[OnboardingRequest]
+
+
 class OnboardingTask(BaseModel):
     phase: str
     title: str
@@ -59,18 +489,42 @@ class OnboardingResponse(BaseModel):
     sources: Optional[List[Dict[str, str]]] = []
     todo: Optional[str] = None
 
+class PackedEmbedding(BaseModel):
+    # As returned by /ai/embed: base64 of little-endian float16 values and the
+    # tag of the model that produced them; ignored when the tag is stale.
+    version: str
+    data: str
+
+
 class Employee(BaseModel):
     _id: str
     employeeId: str
     userId: Optional[Dict[str, str]]
     skills: List[str]
     currentAllocationPercent: int
+    skillsEmbedding: Optional[PackedEmbedding] = None
+
+class SkillsMatchWeights(BaseModel):
+    skills: float = 0.7
+    availability: float = 0.3
+
 
 class SkillsMatchRequest(BaseModel):
     projectId: str
     requiredSkills: List[str]
-    employees: List[Employee]
+    employees: List[Employee] = []
     topK: int = 5
+    weights: SkillsMatchWeights = SkillsMatchWeights()
+    # "exact" scores every employee; "ann" probes the in-process IVF index
+    searchMode: Optional[str] = None
+    measureRecall: bool = False
+    # ANN index to sync against; a stable key (e.g. the organization) keeps
+    # the index incremental as the roster changes. Defaults to the id set.
+    rosterKey: Optional[str] = None
+    # `session` keeps the employee vectors server-side and returns an id; later
+    # calls send `sessionId` with new required skills or weights and no roster.
+    session: bool = False
+    sessionId: Optional[str] = None
 
 
 # Health check
@@ -83,186 +537,590 @@ async def health():
     }
 
 
+# Readiness: 200 once the model is loaded and warmed up, 503 before
+@app.get("/ready")
+async def ready():
+    body = {"ready": embedding_model is not None, "model": EMBEDDING_MODEL_NAME, "backend": EMBEDDING_BACKEND,
+            "embeddingVersions": {kind: embedding_version(kind) for kind in ("text", "skills")}, **model_status}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+# Prometheus metrics
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# Sampling profiler, armed per route at runtime (PROFILER_ENABLED=1)
+class ProfilerStartRequest(BaseModel):
+    route: str
+    intervalMs: float = 5.0
+    durationS: float = 60.0
+
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler disabled; set PROFILER_ENABLED=1")
+
+
+@app.post("/ai/profiler/start")
+async def profiler_start(request: ProfilerStartRequest):
+    require_profiler()
+    try:
+        profiler.start(request.route, request.intervalMs, request.durationS)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.report()
+
+
+@app.post("/ai/profiler/stop")
+async def profiler_stop():
+    require_profiler()
+    await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+    return profiler.report()
+
+
+@app.get("/ai/profiler")
+async def profiler_report(top: int = 100):
+    require_profiler()
+    return profiler.report(top)
+
+
+# Embedding cache counters
+@app.get("/ai/embedding-cache/stats")
+async def embedding_cache_stats():
+    return embedding_cache.stats()
+
+
+# Encode batch-size histogram
+@app.get("/ai/batching/stats")
+async def batching_stats():
+    return encode_batcher.stats() if encode_batcher else None
+
+
+# Skill vocabulary size
+@app.get("/ai/skill-vocabulary/stats")
+async def skill_vocabulary_stats():
+    return skill_vocabulary.stats()
+
+
+# Execution pool queue depth
+@app.get("/ai/pools/stats")
+async def pool_stats():
+    return {
+        "encode": encode_pool.stats() if encode_pool else None,
+        "render": render_pool.stats() if render_pool else None,
+        "priority": priority_pool.stats() if priority_pool else None,
+    }
+
+
+# Response cache of the deterministic generators
+@app.get("/ai/response-cache/stats")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+# Ranking sessions held for re-ranking without re-embedding
+@app.get("/ai/ranking-sessions/stats")
+async def ranking_session_stats():
+    return ranking_sessions.stats()
+
+
+# Admission lanes: slots and cost in flight, queued and rejected requests
+@app.get("/ai/admission/stats")
+async def admission_stats():
+    return admission.stats()
+
+
+# Radar image cache counters
+@app.get("/ai/radar-cache/stats")
+async def radar_cache_stats():
+    return radar_cache.stats()
+
+
 # Generate onboarding tasks
-@app.post("/ai/generate-onboarding", response_model=OnboardingResponse)
-async def generate_onboarding(request: OnboardingRequest):
-    """
-    Generate onboarding checklist from job description.
-    Currently returns deterministic stub - replace with LLM call.
-    """
+# Onboarding checklist template: (phase, title, description, duration, required
+# role flags). A task is included when the job title has all of its flags.
+ONBOARDING_TASKS = (
+    ("day1", "Account setup and access", "Create email, Slack, and repository access. Set up 2FA and security keys.", "1h", frozenset()),
+    ("day1", "Team introductions", "Meet your immediate team members and understand team structure.", "2h", frozenset()),
+    ("week1", "Development environment setup", "Install IDE, dependencies, and run local development server. Clone repos and run tests.", "4h", frozenset({"engineer"})),
+    ("week1", "Codebase walkthrough", "Review architecture, coding standards, PR process, and CI/CD pipeline.", "3h", frozenset({"engineer"})),
+    ("week1", "1:1s with direct reports", "Schedule and conduct introductory meetings with each team member.", "1w", frozenset({"manager"})),
+    ("month1", "Complete first small feature", "Pick up a small-sized ticket, implement, test, and deploy with mentor guidance.", "1w", frozenset({"engineer", "non-senior"})),
+    ("month1", "Complete first medium feature", "Pick up a medium-sized ticket, implement, test, and deploy with mentor guidance.", "2w", frozenset({"engineer", "senior"})),
+    ("month1", "Company-wide knowledge sessions", "Attend sessions on company values, product roadmap, and cross-team collaboration.", "6h", frozenset()),
+    ("month3", "Technical design document", "Write and present a technical design for a new feature or improvement.", "1w", frozenset({"senior"})),
+    ("month3", "90-day review and goal setting", "Reflect on onboarding experience and set goals for next quarter with manager.", "2h", frozenset()),
+)
+ONBOARDING_TODO = "Replace this stub with real LLM call (e.g., OpenAI GPT-4 or local Llama model) for context-aware task generation"
+
+
+@functools.lru_cache(maxsize=None)
+def onboarding_checklist(is_engineer: bool, is_senior: bool, is_manager: bool) -> tuple:
+    flags = {"engineer"} if is_engineer else set()
+    flags |= {"senior"} if is_senior else {"non-senior"}
+    if is_manager:
+        flags.add("manager")
+    tasks = [task for task in ONBOARDING_TASKS if task[4] <= flags]
+    return tuple(
+        {"phase": phase, "title": title, "description": description, "duration": duration, "order": order}
+        for order, (phase, title, description, duration, _) in enumerate(tasks)
+    )
 
-    # Extract keywords from job title
-    job_lower = request.jobTitle.lower()
+
+def build_onboarding(job_title: str, job_description: str, max_tasks) -> Dict[str, Any]:
+    """OnboardingResponse fields except requestId, as plain JSON data."""
+    job_lower = job_title.lower()
     is_engineer = any(word in job_lower for word in ["engineer", "developer", "programmer"])
     is_senior = "senior" in job_lower or "lead" in job_lower
     is_manager = "manager" in job_lower
+    tasks = list(onboarding_checklist(is_engineer, is_senior, is_manager)[:max_tasks])
+    return {
+        "fallback": True,  # Mark as fallback since we're using heuristics
+        "generatedChecklist": tasks,
+        "rationale": f"Heuristic-based generation: Detected role={job_title}, engineer={is_engineer}, senior={is_senior}, manager={is_manager}. Generated {len(tasks)} phase-based tasks.",
+        "sources": [{"type": "job_description", "snippet": job_description[:200]}],
+        "todo": ONBOARDING_TODO,
+    }
 
-    # Build task list based on role
-    tasks = []
-    order = 0
-
-    # Day 1 tasks (always)
-    tasks.append(OnboardingTask(
-        phase="day1",
-        title="Account setup and access",
-        description="Create email, Slack, and repository access. Set up 2FA and security keys.",
-        duration="1h",
-        order=order
-    ))
-    order += 1
-
-    tasks.append(OnboardingTask(
-        phase="day1",
-        title="Team introductions",
-        description="Meet your immediate team members and understand team structure.",
-        duration="2h",
-        order=order
-    ))
-    order += 1
-
-    # Week 1 tasks
-    if is_engineer:
-        tasks.append(OnboardingTask(
-            phase="week1",
-            title="Development environment setup",
-            description="Install IDE, dependencies, and run local development server. Clone repos and run tests.",
-            duration="4h",
-            order=order
-        ))
-        order += 1
-
-        tasks.append(OnboardingTask(
-            phase="week1",
-            title="Codebase walkthrough",
-            description="Review architecture, coding standards, PR process, and CI/CD pipeline.",
-            duration="3h",
-            order=order
-        ))
-        order += 1
 
-    if is_manager:
-        tasks.append(OnboardingTask(
-            phase="week1",
-            title="1:1s with direct reports",
-            description="Schedule and conduct introductory meetings with each team member.",
-            duration="1w",
-            order=order
-        ))
-        order += 1
-
-    # Month 1 tasks
-    if is_engineer:
-        complexity = "medium" if is_senior else "small"
-        tasks.append(OnboardingTask(
-            phase="month1",
-            title=f"Complete first {complexity} feature",
-            description=f"Pick up a {complexity}-sized ticket, implement, test, and deploy with mentor guidance.",
-            duration="2w" if is_senior else "1w",
-            order=order
-        ))
-        order += 1
-
-    tasks.append(OnboardingTask(
-        phase="month1",
-        title="Company-wide knowledge sessions",
-        description="Attend sessions on company values, product roadmap, and cross-team collaboration.",
-        duration="6h",
-        order=order
-    ))
-    order += 1
-
-    # Month 3 tasks
-    if is_senior:
-        tasks.append(OnboardingTask(
-            phase="month3",
-            title="Technical design document",
-            description="Write and present a technical design for a new feature or improvement.",
-            duration="1w",
-            order=order
-        ))
-        order += 1
+def onboarding_body(request: OnboardingRequest) -> bytes:
+    # Only the title, the description snippet and maxTasks shape the response.
+    max_tasks = request.constraints.get("maxTasks", 12)
+    key = response_key("generate-onboarding", request.jobTitle, request.jobDescription[:200], max_tasks)
+    body = response_cache.get(key)
+    if body is None:
+        body = dumps(build_onboarding(request.jobTitle, request.jobDescription, max_tasks))
+        response_cache.put(key, body)
+    return with_leading_field("requestId", request.requestId, body)
 
-    tasks.append(OnboardingTask(
-        phase="month3",
-        title="90-day review and goal setting",
-        description="Reflect on onboarding experience and set goals for next quarter with manager.",
-        duration="2h",
-        order=order
-    ))
 
-    # Limit to maxTasks
-    max_tasks = request.constraints.get("maxTasks", 12)
-    tasks = tasks[:max_tasks]
-
-    return OnboardingResponse(
-        requestId=request.requestId,
-        fallback=True,  # Mark as fallback since we're using heuristics
-        generatedChecklist=tasks,
-        rationale=f"Heuristic-based generation: Detected role={request.jobTitle}, engineer={is_engineer}, senior={is_senior}, manager={is_manager}. Generated {len(tasks)} phase-based tasks.",
-        sources=[{"type": "job_description", "snippet": request.jobDescription[:200]}],
-        todo="Replace this stub with real LLM call (e.g., OpenAI GPT-4 or local Llama model) for context-aware task generation"
-    )
+def json_bytes_response(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
+
+def batch_response(field: str, bodies: List[bytes]) -> Response:
+    """`{field: [...]}` assembled from already serialized items."""
+    return json_bytes_response(b"{" + dumps(field) + b":[" + b",".join(bodies) + b"]}")
+
+
+@app.post("/ai/generate-onboarding", response_model=OnboardingResponse)
+async def generate_onboarding(request: OnboardingRequest):
+    """
+    Generate onboarding checklist from job description.
+    Currently returns deterministic stub - replace with LLM call.
+    """
+    return json_bytes_response(onboarding_body(request))
+
+
+@app.post("/ai/generate-onboarding/batch")
+async def generate_onboarding_batch(request: OnboardingBatchRequest = bulk_body(OnboardingBatchRequest)):
+    """
+    Onboarding checklists for many openings in one call, in request order.
+    """
+    return batch_response("checklists", [onboarding_body(item) for item in request.requests])
 
 
 # Skills matching
 @app.post("/ai/skills-match")
-async def skills_match(request: SkillsMatchRequest):
+async def skills_match(request: SkillsMatchRequest = bulk_body(SkillsMatchRequest)):
     """
     Match employees to project based on skills using sentence embeddings.
     """
     if not embedding_model:
         raise HTTPException(status_code=503, detail="Model not loaded yet")
 
-    project_skills_text = ", ".join(request.requiredSkills)
-    project_embedding = embedding_model.encode([project_skills_text])
+    weights = request.weights
+    if weights.skills <= 0 or weights.availability < 0:
+        raise HTTPException(status_code=400, detail="weights.skills must be positive and weights.availability non-negative")
 
-    employee_skills_texts = [", ".join(emp.skills) for emp in request.employees]
-    if not employee_skills_texts:
-        return {
-            "projectId": request.projectId,
-            "topCandidates": [],
-            "fallback": False,
-        }
-    
-    employee_embeddings = embedding_model.encode(employee_skills_texts)
+    # Re-scoring a live session costs one matrix-vector product; the roster,
+    # when sent along, is only embedded if the session has expired.
+    cost = estimate_cost(len(request.employees), sum(len(s) for e in request.employees for s in e.skills), ADMISSION_CHARS_PER_UNIT) if request.employees else 1
+    admitted, pool = admit("skills-match", cost)
+    async with admitted:
+        return json_response(await run_in_pool(pool, "skills-match", compute_skills_match, request))
+
+
+def compute_skills_match(request: SkillsMatchRequest):
+    """Blocking part of skills-match: encode, similarity and candidate scoring."""
+    if request.sessionId or (request.session and request.employees):
+        return compute_skills_match_session(request)
+    if (request.searchMode or SKILLS_MATCH_SEARCH_MODE) == "ann":
+        if len(request.employees) >= ANN_MIN_EMPLOYEES:
+            return compute_skills_match_ann(request)
+        result = compute_skills_match_exact(request)
+        result["search"] = {"mode": "exact", "fallbackReason": f"roster smaller than {ANN_MIN_EMPLOYEES}"}
+        return result
+    return compute_skills_match_exact(request)
+
+
+def skill_set_vectors(skill_sets: List[List[str]]) -> np.ndarray:
+    """Normalized vector per skill list, pooled from the vocabulary or embedded joined."""
+    if SKILL_VECTOR_MODE == "joined":
+        return normalize_rows(encode_texts([", ".join(skills) for skills in skill_sets]))
+    return skill_vocabulary.pooled(skill_sets)
+
+
+def embedding_version(kind: str) -> str:
+    """Tag of "text" or "skills" vectors from the loaded backend and skill vector mode."""
+    if kind == "skills" and SKILL_VECTOR_MODE == "pooled":
+        # Pooled vectors depend on how skills are canonicalized
+        return f"{embedding_backend.cache_name}/skills-pooled-{response_key('skill-synonyms', skill_synonym_table)[:8]}"
+    if kind == "skills":
+        return f"{embedding_backend.cache_name}/skills-{SKILL_VECTOR_MODE}"
+    return f"{embedding_backend.cache_name}/text"
 
-    similarities = cosine_similarity(project_embedding, employee_embeddings)[0]
 
+def employee_skill_vectors(employees: List[Employee]):
+    """Normalized skill-set vector per employee, taken from `skillsEmbedding` when current."""
+    return merge_supplied([emp.skillsEmbedding for emp in employees], embedding_version("skills"), embedding_backend.dimension,
+                          lambda positions: skill_set_vectors([employees[p].skills for p in positions]))
+
+
+def merge_counts(*counts: Dict[str, int]) -> Dict[str, int]:
+    return {key: sum(c[key] for c in counts) for key in counts[0]}
+
+
+def matching_skills(skills: List[str], required_vectors: np.ndarray) -> List[str]:
+    """Employee skills equal to, a spelling variant of, or close enough in embedding space to a required skill."""
+    if not skills or not len(required_vectors):
+        return []
+    best = (skill_vocabulary.vectors(skills) @ required_vectors.T).max(axis=1)
+    return [skill for skill, similarity in zip(skills, best) if similarity >= SKILL_MATCH_THRESHOLD]
+
+
+def skill_candidate(emp: Employee, skill_score: float, availability_score: float, score: float, required_vectors: np.ndarray) -> Dict[str, Any]:
+    return {
+        "employeeId": emp.employeeId,
+        "employeeName": f"{emp.userId['firstName']} {emp.userId['lastName']}",
+        "score": float(score),
+        "matchingSkills": matching_skills(emp.skills, required_vectors),
+        "explain": f"Skill match: {skill_score:.2f}, Availability: {availability_score:.2f}. Current allocation: {emp.currentAllocationPercent}%"
+    }
+
+
+def compute_skills_match_ann(request: SkillsMatchRequest):
+    """
+    Approximate search over the employee IVF index. Index vectors are
+    [normalized skills embedding, availability] and the query is
+    [w_skills * normalized project embedding, w_availability], so the inner
+    product is exactly the weighted score; probed lists are scored exactly.
+    """
+    weights = request.weights
+    employees = request.employees
+    ids = [emp.employeeId for emp in employees]
+    fingerprints = ["\x1f".join(emp.skills) + f"|{emp.currentAllocationPercent}" for emp in employees]
+
+    def build_vectors(positions):
+        vectors, _ = employee_skill_vectors([employees[p] for p in positions])
+        availability = np.array([(100 - employees[p].currentAllocationPercent) / 100 for p in positions], dtype=np.float32)
+        return np.hstack([vectors, availability[:, None]])
+
+    project_vector = skill_set_vectors([request.requiredSkills])[0]
+    query = np.append(weights.skills * project_vector, np.float32(weights.availability)).astype(np.float32)
+
+    roster_key = request.rosterKey or response_key("ann-roster", sorted(ids))
+    index = employee_ann_indexes.get(roster_key)
+    # Sync and search under one lock so a concurrent sync cannot swap the roster in between
+    with index.lock:
+        sync = index.sync(ids, fingerprints, build_vectors)
+        top_ids, scores, scored = index.search(query, request.topK)
+        index_size = len(index)
+        exact_ids, exact_scores = index.exact_search(query, request.topK) if request.measureRecall else ([], None)
+
+    by_id = {emp.employeeId: emp for emp in employees}
+    hits = [(emp_id, score) for emp_id, score in zip(top_ids, scores) if emp_id in by_id]
+    scores = np.array([score for _, score in hits], dtype=np.float32)
+    required_vectors = skill_vocabulary.vectors(request.requiredSkills)
     candidates = []
-    for i, emp in enumerate(request.employees):
-        skill_score = similarities[i]
+    for emp_id, score in hits:
+        emp = by_id[emp_id]
         availability_score = (100 - emp.currentAllocationPercent) / 100
-        
-        # Weighted score
-        score = 0.7 * skill_score + 0.3 * availability_score
-        
-        matching_skills = [s for s in emp.skills if s.lower() in [rs.lower() for rs in request.requiredSkills]]
-
-        candidates.append({
-            "employeeId": emp.employeeId,
-            "employeeName": f"{emp.userId['firstName']} {emp.userId['lastName']}",
-            "score": float(score),
-            "matchingSkills": matching_skills,
-            "explain": f"Skill match: {skill_score:.2f}, Availability: {availability_score:.2f}. Current allocation: {emp.currentAllocationPercent}%"
-        })
-
-    candidates.sort(key=lambda x: x['score'], reverse=True)
+        skill_score = (float(score) - weights.availability * availability_score) / weights.skills
+        candidates.append(skill_candidate(emp, skill_score, availability_score, score, required_vectors))
+
+    search = {
+        "mode": "ann",
+        "indexSize": index_size,
+        "candidatesScored": scored,
+        "reembedded": sync["added"],
+        "recall": None,
+    }
+    if request.measureRecall:
+        # Tie-aware recall: an ANN hit counts if it scores at least the exact K-th best.
+        if exact_ids:
+            threshold = exact_scores[-1] - 1e-6
+            search["recall"] = int(np.sum(scores >= threshold)) / len(exact_ids)
+        else:
+            search["recall"] = 1.0
 
     return {
         "projectId": request.projectId,
-        "topCandidates": candidates[:request.topK],
+        "topCandidates": candidates,
+        "fallback": False,
+        "todo": None,
+        "search": search
+    }
+
+
+def compute_skills_match_exact(request: SkillsMatchRequest):
+    if not request.employees:
+        return {
+            "projectId": request.projectId,
+            "topCandidates": [],
+            "fallback": False,
+        }
+
+    precomputed = None
+    if SKILL_VECTOR_MODE == "joined" and not any(emp.skillsEmbedding for emp in request.employees):
+        project_embedding = encode_texts([", ".join(request.requiredSkills)])
+        employee_embeddings = encode_texts([", ".join(emp.skills) for emp in request.employees])
+        with stage("similarity"):
+            similarities = cosine_similarity(project_embedding, employee_embeddings)[0]
+    else:
+        # Vocabulary lookups (only skills never seen before reach the model),
+        # or caller-supplied vectors where their version tag is current.
+        with stage("pooling"):
+            project_vector = skill_set_vectors([request.requiredSkills])[0]
+            employee_vectors, precomputed = employee_skill_vectors(request.employees)
+        with stage("similarity"):
+            similarities = employee_vectors @ project_vector
+
+    with stage("postprocess"):
+        # Scores in float64, as the per-employee scalar arithmetic produced them.
+        availability = (100 - np.array([emp.currentAllocationPercent for emp in request.employees])) / 100
+        scores = request.weights.skills * similarities.astype(np.float64) + request.weights.availability * availability
+
+        # Only the survivors get matching skills and explanation strings.
+        required_vectors = skill_vocabulary.vectors(request.requiredSkills)
+        candidates = []
+        for i in top_k_indices(scores, request.topK):
+            emp = request.employees[i]
+            candidates.append(skill_candidate(emp, similarities[i], float(availability[i]), scores[i], required_vectors))
+
+    result = {
+        "projectId": request.projectId,
+        "topCandidates": candidates,
         "fallback": False,
         "todo": None
     }
+    if precomputed and precomputed["supplied"]:
+        result["precomputed"] = precomputed
+    return result
+
+
+def build_employee_session(request: SkillsMatchRequest) -> Optional[RankingSession]:
+    if not request.employees:
+        return None
+    vectors, precomputed = employee_skill_vectors(request.employees)
+    availability = (100 - np.array([emp.currentAllocationPercent for emp in request.employees])) / 100
+    payload_bytes = sum(64 + sum(len(skill) for skill in emp.skills) for emp in request.employees)
+    info = {"availability": availability}
+    if precomputed["supplied"]:
+        info["precomputed"] = precomputed
+    return RankingSession("employees", vectors, list(request.employees), payload_bytes, info=info)
+
+
+def compute_skills_match_session(request: SkillsMatchRequest):
+    """Score the session's roster for the request's skills and weights with one matrix-vector product."""
+    session, session_info = ranking_session(request.sessionId, "employees", lambda: build_employee_session(request))
+    employees = session.items
+    with stage("pooling"):
+        project_vector = skill_set_vectors([request.requiredSkills])[0]
+    with stage("similarity"):
+        similarities = session.vectors @ project_vector
+
+    with stage("postprocess"):
+        availability = session.info["availability"]
+        scores = request.weights.skills * similarities.astype(np.float64) + request.weights.availability * availability
+        required_vectors = skill_vocabulary.vectors(request.requiredSkills)
+        candidates = [
+            skill_candidate(employees[i], similarities[i], float(availability[i]), scores[i], required_vectors)
+            for i in top_k_indices(scores, request.topK)
+        ]
+
+    result = {
+        "projectId": request.projectId,
+        "topCandidates": candidates,
+        "fallback": False,
+        "todo": None,
+        "session": session_info,
+    }
+    if "precomputed" in session.info and not session_info["reused"]:
+        result["precomputed"] = session.info["precomputed"]
+    return result
+
+
+class AllocationProject(BaseModel):
+    projectId: str
+    requiredSkills: List[str]
+    headcount: int = 1
+    # Share of a person's time one seat takes
+    allocationPercent: int = 50
+
+
+class AllocationRequest(BaseModel):
+    projects: List[AllocationProject]
+    employees: List[Employee]
+    weights: SkillsMatchWeights = SkillsMatchWeights()
+    # Pairs scoring below this are never proposed
+    minScore: float = 0.0
+    solver: Optional[str] = None
+
+
+@app.post("/ai/allocate")
+async def allocate(request: AllocationRequest = bulk_body(AllocationRequest)):
+    """
+    Staff many projects from one roster at once. Employees are scored against
+    every project in one pass and assigned so that nobody goes past 100%
+    allocation, maximizing the total skills-match score.
+    """
+    if not embedding_model:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+
+    solver = request.solver or ALLOCATION_SOLVER
+    if solver not in SOLVERS:
+        raise HTTPException(status_code=400, detail=f"solver must be one of {', '.join(SOLVERS)}")
+    weights = request.weights
+    if weights.skills <= 0 or weights.availability < 0:
+        raise HTTPException(status_code=400, detail="weights.skills must be positive and weights.availability non-negative")
+    if any(p.headcount < 0 or not 0 < p.allocationPercent <= 100 for p in request.projects):
+        raise HTTPException(status_code=400, detail="headcount must be non-negative and allocationPercent in (0, 100]")
+
+    cost = estimate_cost(len(request.employees) + len(request.projects),
+                         sum(len(s) for e in request.employees for s in e.skills), ADMISSION_CHARS_PER_UNIT)
+    admitted, pool = admit("allocate", cost)
+    async with admitted:
+        return json_response(await run_in_pool(pool, "allocate", compute_allocation, request, solver))
+
+
+def compute_allocation(request: AllocationRequest, solver: str):
+    """Blocking part of allocate: one projects x employees score matrix, then the assignment."""
+    projects, employees = request.projects, request.employees
+    if not projects or not employees:
+        return {"projects": [{"projectId": p.projectId, "assigned": [], "unfilledSeats": p.headcount} for p in projects],
+                "employees": [], "totalScore": 0.0, "solver": None}
+
+    with stage("pooling"):
+        employee_vectors, precomputed = employee_skill_vectors(employees)
+        project_vectors = skill_set_vectors([p.requiredSkills for p in projects])
+    with stage("similarity"):
+        similarities = project_vectors @ employee_vectors.T
+
+    current = np.array([emp.currentAllocationPercent for emp in employees], dtype=np.float64)
+    availability = (100 - current) / 100
+    scores = request.weights.skills * similarities.astype(np.float64) + request.weights.availability * availability
+    seats = np.array([p.headcount for p in projects], dtype=np.int64)
+    seat_percent = np.array([p.allocationPercent for p in projects], dtype=np.float64)
+    with stage("solve"):
+        pairs, solver_info = assign(scores, seats, seat_percent, np.maximum(100 - current, 0), solver,
+                                    ALLOCATION_CANDIDATES_PER_SEAT, request.minScore, ALLOCATION_TIME_LIMIT_S)
+
+    with stage("postprocess"):
+        by_project: Dict[int, List[int]] = {}
+        added = np.zeros(len(employees))
+        for j, i in pairs:
+            by_project.setdefault(j, []).append(i)
+            added[i] += seat_percent[j]
+        project_results = []
+        for j, project in enumerate(projects):
+            assigned = sorted(by_project.get(j, []), key=lambda i: -scores[j, i])
+            required_vectors = skill_vocabulary.vectors(project.requiredSkills)
+            project_results.append({
+                "projectId": project.projectId,
+                "assigned": [
+                    {**skill_candidate(employees[i], similarities[j, i], float(availability[i]), scores[j, i], required_vectors),
+                     "allocationPercent": project.allocationPercent}
+                    for i in assigned
+                ],
+                "unfilledSeats": project.headcount - len(assigned),
+            })
+
+    result = {
+        "projects": project_results,
+        "employees": [
+            {"employeeId": employees[i].employeeId, "currentAllocationPercent": employees[i].currentAllocationPercent,
+             "proposedAllocationPercent": int(current[i] + added[i])}
+            for i in np.flatnonzero(added)
+        ],
+        "totalScore": float(sum(scores[j, i] for j, i in pairs)),
+        "solver": solver_info,
+    }
+    if precomputed["supplied"]:
+        result["precomputed"] = precomputed
+    return result
 
 
 # Performance insight
+class EmployeeRecordsRequest(BaseModel):
+    # Raw Employee, PerformanceReview and Allocation documents as the API stores them
+    employees: List[Dict[str, Any]]
+    reviews: List[Dict[str, Any]] = []
+    allocations: List[Dict[str, Any]] = []
+
+
+class PerfInsightBatchRequest(BaseModel):
+    department: Optional[str] = None
+    employeeIds: Optional[List[str]] = None
+    records: Optional[EmployeeRecordsRequest] = None
+    topFactors: int = 3
+
+
+def records_cost(records: Optional[EmployeeRecordsRequest]) -> float:
+    if records is None:
+        return 1
+    return len(records.employees) + (len(records.reviews) + len(records.allocations)) / 10
+
+
+def cache_employee_records(records: EmployeeRecordsRequest) -> List[str]:
+    """Refresh cached feature rows for `records`; returns the employee ids in order."""
+    reviews = group_by_employee(records.reviews)
+    allocations = group_by_employee(records.allocations)
+    ids = []
+    for employee in records.employees:
+        employee_id = record_id(employee)
+        try:
+            attrition_features.update(employee, reviews.get(employee_id, []), allocations.get(employee_id, []))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Records of employee {employee_id}: {e}")
+        ids.append(employee_id)
+    return ids
+
+
+def compute_perf_insight_features(request: EmployeeRecordsRequest) -> Dict[str, Any]:
+    ids = cache_employee_records(request)
+    return {"employees": len(ids), "cache": attrition_features.stats()}
+
+
+def score_attrition(ids: List[str], rows: np.ndarray, top_factors: int) -> List[Dict[str, Any]]:
+    """Score all rows with one predict_proba call."""
+    risks = attrition_model.predict(rows)
+    factors = attrition_model.top_factors(rows, top_factors)
+    return [
+        {"employeeId": employee_id, "attritionRisk": round(float(risk), 4), "topFactors": top}
+        for employee_id, risk, top in zip(ids, risks, factors)
+    ]
+
+
 @app.get("/ai/perf-insight")
 async def perf_insight(employeeId: str):
     """
     Calculate attrition risk and performance insights.
-    Currently returns deterministic stub - replace with ML model.
+    Scores the employee's cached features with the trained model; without a
+    model or cached features it returns the deterministic stub.
     """
+    row = attrition_features.get(employeeId)
+    if attrition_model is not None and row is not None:
+        result = score_attrition([employeeId], row[None, :], 3)[0]
+        drivers = ", ".join(f["feature"] for f in result["topFactors"])
+        return {
+            **result,
+            "explain": f"Logistic model on review, allocation and attendance features; main drivers: {drivers}",
+            "fallback": False,
+            "todo": None
+        }
 
     return {
         "employeeId": employeeId,
@@ -277,20 +1135,146 @@ async def perf_insight(employeeId: str):
     }
 
 
+@app.post("/ai/perf-insight/features")
+async def perf_insight_features(request: EmployeeRecordsRequest = bulk_body(EmployeeRecordsRequest)):
+    """Push employee records so their feature rows are cached for scoring."""
+    admitted, pool = admit("perf-insight", records_cost(request))
+    async with admitted:
+        return await run_in_pool(pool, "perf-insight", compute_perf_insight_features, request)
+
+
+@app.post("/ai/perf-insight/batch")
+async def perf_insight_batch(request: PerfInsightBatchRequest = bulk_body(PerfInsightBatchRequest)):
+    """
+    Score many employees at once: the records sent with the request, a list
+    of cached employee ids, or every cached employee of a department.
+    Results are ordered by risk, highest first.
+    """
+    if attrition_model is None:
+        raise HTTPException(status_code=503, detail="Attrition model not loaded; train one with train_attrition.py")
+    if request.records is None and request.employeeIds is None and request.department is None:
+        raise HTTPException(status_code=400, detail="Provide records, employeeIds or department")
+
+    if request.records is not None:
+        cost = records_cost(request.records)
+    else:
+        # Cached rows only: one predict_proba over at most the whole cache
+        cost = (len(request.employeeIds) if request.employeeIds is not None else attrition_features.stats()["employees"]) / 10
+    admitted, pool = admit("perf-insight", cost)
+    async with admitted:
+        return json_response(await run_in_pool(pool, "perf-insight", compute_perf_insight_batch, request))
+
+
+def compute_perf_insight_batch(request: PerfInsightBatchRequest) -> Dict[str, Any]:
+    """Blocking part of perf-insight batch: feature rows and one predict_proba call."""
+    missing: List[str] = []
+    if request.records is not None:
+        ids = cache_employee_records(request.records)
+        rows = [attrition_features.get(employee_id) for employee_id in ids]
+    elif request.employeeIds is not None:
+        ids, rows = [], []
+        for employee_id in request.employeeIds:
+            row = attrition_features.get(employee_id)
+            if row is None:
+                missing.append(employee_id)
+            else:
+                ids.append(employee_id)
+                rows.append(row)
+    else:
+        ids, matrix = attrition_features.department(request.department)
+        rows = list(matrix)
+
+    results = score_attrition(ids, np.vstack(rows), request.topFactors) if ids else []
+    results.sort(key=lambda r: -r["attritionRisk"])
+    return {"results": results, "missing": missing, "model": attrition_model.metadata}
+
+
 # Query chatbot (policy & docs)
 class QueryRequest(BaseModel):
     query: str
     userId: str
     contextDocs: Optional[List[str]] = []
     authRole: str
+    topK: int = 3
+
+
+@app.post("/ai/docs/ingest")
+async def ingest_document(request: Request, doc: str, roles: Optional[str] = None):
+    """
+    Ingest a policy PDF sent as the raw request body. `roles` is a
+    comma-separated list of roles allowed to retrieve it (empty = everyone).
+    Re-ingesting a document only re-embeds pages whose text changed.
+    """
+    if not embedding_model:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > RAG_MAX_UPLOAD_BYTES:
+            upload.close()
+            raise HTTPException(status_code=413, detail=f"Document exceeds {RAG_MAX_UPLOAD_BYTES} bytes")
+        upload.write(chunk)
+    upload.seek(0)
+
+    role_list = [r.strip() for r in roles.split(",") if r.strip()] if roles else []
+    try:
+        async with admission.admit("docs-ingest"):
+            stats = await run_in_pool(encode_pool, "docs-ingest", lambda: document_index.ingest(doc, iter_pdf_pages(upload), role_list))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not ingest document: {str(e)}")
+    finally:
+        upload.close()
+
+    return {"doc": doc, "roles": role_list, **stats}
+
+
+@app.get("/ai/docs")
+async def list_documents():
+    return {"documents": document_index.documents(), "chunks": len(document_index.store)}
+
+
+def retrieve_chunks(request: QueryRequest):
+    query_vector = encode_texts([request.query])[0]
+    with stage("search"):
+        return document_index.query(query_vector, request.topK, request.authRole, request.contextDocs or None)
 
 
 @app.post("/ai/query")
 async def query_docs(request: QueryRequest):
     """
     Answer questions about company policies and documents.
-    Currently returns stub - implement RAG with ChromaDB + LLM.
+    Retrieves the best chunks from ingested documents visible to `authRole`;
+    falls back to the demo stub only when nothing has been ingested. A role
+    that can see none of the ingested documents (or of `contextDocs`) gets
+    an explicit empty answer, not the stub.
     """
+    if request.topK < 1:
+        raise HTTPException(status_code=400, detail="topK must be at least 1")
+    if embedding_model and len(document_index.store):
+        async with admission.admit("priority", 1):
+            hits = await run_in_pool(priority_pool, "query", retrieve_chunks, request)
+        if not hits:
+            return {
+                "answer": f"No documents accessible to role '{request.authRole}' match this request.",
+                "sources": [],
+                "confidence": 0.0,
+                "fallback": False,
+                "reason": "no-accessible-documents"
+            }
+        return {
+            "answer": hits[0]["text"][:500],
+            "sources": [
+                {"doc": h["doc"], "page": h["page"], "snippet": h["text"][:200], "score": round(h["score"], 4)}
+                for h in hits
+            ],
+            "confidence": round(max(0.0, hits[0]["score"]), 4),
+            "fallback": False,
+            "todo": "Generate a synthesized answer from the retrieved chunks with an LLM"
+        }
 
     # Simple keyword matching for demo
     query_lower = request.query.lower()
@@ -319,6 +1303,9 @@ async def query_docs(request: QueryRequest):
     }
 
 
+RADAR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
 class RadarChartRequest(BaseModel):
     technical: float
     communication: float
@@ -326,69 +1313,232 @@ class RadarChartRequest(BaseModel):
     initiative: float
     leadership: float
     punctuality: float
+    format: str = "png"
+    dpi: int = 150
+    size: float = 8
 
 
-@app.post("/ai/generate-performance-radar")
-async def generate_performance_radar(request: RadarChartRequest):
-    """
-    Generate a hexagonal radar chart for employee performance competencies.
-    Returns a base64-encoded PNG image.
-    """
-    try:
-        categories = ['Technical', 'Communication', 'Teamwork', 'Initiative', 'Leadership', 'Punctuality']
-        values = [
-            request.technical,
-            request.communication,
-            request.teamwork,
-            request.initiative,
-            request.leadership,
-            request.punctuality
-        ]
+class RadarBatchItem(RadarChartRequest):
+    id: Optional[str] = None
 
-        values += values[:1]
 
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        angles += angles[:1]
+class RadarBatchRequest(BaseModel):
+    charts: List[RadarBatchItem]
 
-        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
 
-        ax.plot(angles, values, 'o-', linewidth=2, color='#3b82f6', label='Score')
-        ax.fill(angles, values, alpha=0.25, color='#3b82f6')
+def validate_radar_request(request: RadarChartRequest):
+    if request.format not in RADAR_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(RADAR_MEDIA_TYPES)}")
+    if not 50 <= request.dpi <= 300:
+        raise HTTPException(status_code=400, detail="dpi must be between 50 and 300")
+    if not 2 <= request.size <= 12:
+        raise HTTPException(status_code=400, detail="size must be between 2 and 12")
 
-        ax.set_ylim(0, 5)
-        ax.set_yticks([1, 2, 3, 4, 5])
-        ax.set_yticklabels(['1', '2', '3', '4', '5'], fontsize=10, color='#64748b')
 
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories, fontsize=12, fontweight='bold', color='#1e293b')
+def radar_values(request: RadarChartRequest) -> List[float]:
+    return [
+        request.technical,
+        request.communication,
+        request.teamwork,
+        request.initiative,
+        request.leadership,
+        request.punctuality
+    ]
 
-        ax.grid(True, linestyle='--', alpha=0.7, color='#cbd5e1')
-        ax.spines['polar'].set_color('#cbd5e1')
 
-        ax.set_facecolor('#f8fafc')
-        fig.patch.set_facecolor('white')
+def radar_key(request: RadarChartRequest) -> str:
+    return chart_key(radar_values(request), request.format, request.size, request.dpi)
 
-        plt.title('Performance Competencies', size=16, fontweight='bold', pad=20, color='#0f172a')
 
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-        buf.seek(0)
+def radar_etag(key: str) -> str:
+    return f'"{key}"'
 
-        image_base64 = base64.b64encode(buf.read()).decode('utf-8')
 
-        plt.close(fig)
+def etag_matches(http_request: Request, key: str) -> bool:
+    header = http_request.headers.get("if-none-match", "")
+    return header.strip() == "*" or radar_etag(key) in [tag.strip() for tag in header.split(",")]
 
-        return {
-            "image": f"data:image/png;base64,{image_base64}",
-            "format": "png"
-        }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating radar chart: {str(e)}")
+def wants_media(http_request: Request, media_type: str) -> bool:
+    """True if the client ranks `media_type` above the default JSON body."""
+    return prefers_media(http_request.headers.get("accept", ""), media_type)
+
+
+def radar_image_response(image: bytes, media_type: str, key: str) -> Response:
+    return Response(image, media_type=media_type,
+                    headers={"ETag": radar_etag(key), "Cache-Control": "public, max-age=31536000, immutable"})
+
+
+async def render_radar_charts(charts: List[RadarChartRequest], endpoint: str):
+    """
+    Render `charts`, each distinct chart once, reusing cached images.
+
+    Returns the cache key per chart, the image per distinct key, and counters.
+    PNG misses are split into one group per render worker so a large batch
+    takes only as many pool slots as there are workers.
+    """
+    keys = [radar_key(chart) for chart in charts]
+    images: Dict[str, bytes] = {}
+    missing: Dict[str, RadarChartRequest] = {}
+    for key, chart in zip(keys, charts):
+        if key in images or key in missing:
+            continue
+        image = radar_cache.get(key)
+        if image is None:
+            missing[key] = chart
+        else:
+            images[key] = image
+    counts = {"unique": len(images) + len(missing), "cacheHits": len(images), "rendered": len(missing)}
+
+    png_keys = []
+    for key, chart in missing.items():
+        if chart.format == "svg":
+            # Plain string building, cheap enough to stay on the event loop.
+            with stage("svg"):
+                images[key] = render_radar_svg(radar_values(chart), chart.size)
+            radar_cache.put(key, images[key], RADAR_MEDIA_TYPES["svg"])
+        else:
+            png_keys.append(key)
+
+    if png_keys:
+        groups = [png_keys[i::RENDER_POOL_WORKERS] for i in range(min(RENDER_POOL_WORKERS, len(png_keys)))]
+        jobs = [[(radar_values(missing[key]), missing[key].size, missing[key].dpi) for key in group] for group in groups]
+        try:
+            with stage("rasterize"):
+                results = await asyncio.gather(*(run_in_pool(render_pool, endpoint, render_radar_png_batch, job) for job in jobs))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error generating radar chart: {str(e)}")
+        for group, rendered in zip(groups, results):
+            for key, image in zip(group, rendered):
+                images[key] = image
+                radar_cache.put(key, image, RADAR_MEDIA_TYPES["png"])
+    return keys, images, counts
+
+
+@app.post("/ai/generate-performance-radar")
+async def generate_performance_radar(request: RadarChartRequest, http_request: Request):
+    """
+    Generate a hexagonal radar chart for employee performance competencies.
+    Returns a base64 data URI: PNG by default, or SVG with format="svg".
+    With `Accept: image/png` (or `image/svg+xml`) the raw image is returned
+    instead, with an ETag derived from the scores; a matching If-None-Match
+    gets 304 without rendering.
+    """
+    validate_radar_request(request)
+    key = radar_key(request)
+    binary = wants_media(http_request, RADAR_MEDIA_TYPES[request.format])
+    if binary and etag_matches(http_request, key):
+        return Response(status_code=304, headers={"ETag": radar_etag(key)})
+
+    _, images, _ = await render_radar_charts([request], "generate-performance-radar")
+    image = images[key]
+    if binary:
+        return radar_image_response(image, RADAR_MEDIA_TYPES[request.format], key)
+
+    with stage("base64"):
+        image_base64 = base64.b64encode(image).decode('utf-8')
+
+    return {
+        "image": f"data:{RADAR_MEDIA_TYPES[request.format]};base64,{image_base64}",
+        "format": request.format
+    }
+
+
+@app.get("/ai/generate-performance-radar/{key}")
+async def get_performance_radar(key: str, http_request: Request, format: Optional[str] = None):
+    """
+    Fetch a previously rendered chart by the key returned from the batch
+    endpoint, with the media type it was rendered in. 404 once the image has
+    been evicted, or if `format` is given and differs; re-render it then.
+    """
+    if format is not None and format not in RADAR_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(RADAR_MEDIA_TYPES)}")
+    entry = radar_cache.entry(key)
+    if entry is None or (format is not None and entry[1] != RADAR_MEDIA_TYPES[format]):
+        raise HTTPException(status_code=404, detail="Chart not in cache")
+    if etag_matches(http_request, key):
+        return Response(status_code=304, headers={"ETag": radar_etag(key)})
+    return radar_image_response(*entry, key)
+
+
+def radar_filenames(charts: List[RadarBatchItem]) -> List[str]:
+    """One file name per chart from its id (or position), unique within the batch."""
+    names, seen = [], set()
+    for index, chart in enumerate(charts):
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", chart.id) if chart.id else str(index)
+        if name in seen:
+            name = f"{name}-{index}"
+        seen.add(name)
+        names.append(f"{name}.{chart.format}")
+    return names
+
+
+@app.post("/ai/generate-performance-radar/batch")
+async def generate_performance_radar_batch(http_request: Request, request: RadarBatchRequest = bulk_body(RadarBatchRequest)):
+    """
+    Render many radar charts in one call. Identical score vectors are
+    rendered once and shared in the response.
+
+    The default JSON body lists each chart's key and carries every distinct
+    image once as a data URI. `Accept: application/zip` returns a zip with
+    one file per chart; `Accept: multipart/mixed` returns one part per chart.
+    """
+    if len(request.charts) > RADAR_BATCH_MAX_CHARTS:
+        raise HTTPException(status_code=400, detail=f"At most {RADAR_BATCH_MAX_CHARTS} charts per batch")
+    for chart in request.charts:
+        validate_radar_request(chart)
+
+    # PNGs dominate the cost; SVGs are built on the event loop in microseconds.
+    admitted, _ = admit("radar-batch", sum(1 for chart in request.charts if chart.format == "png"))
+    async with admitted:
+        keys, images, counts = await render_radar_charts(request.charts, "generate-performance-radar-batch")
+
+    if wants_media(http_request, "application/zip"):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as archive:
+            for chart, key, name in zip(request.charts, keys, radar_filenames(request.charts)):
+                # PNGs are already deflated; only SVG text gains from compression.
+                compression = zipfile.ZIP_DEFLATED if chart.format == "svg" else zipfile.ZIP_STORED
+                archive.writestr(name, images[key], compress_type=compression)
+        return Response(buf.getvalue(), media_type="application/zip",
+                        headers={"Content-Disposition": 'attachment; filename="performance-radar.zip"'})
+
+    if wants_media(http_request, "multipart/mixed"):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for chart, key, name in zip(request.charts, keys, radar_filenames(request.charts)):
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: {RADAR_MEDIA_TYPES[chart.format]}\r\n"
+                f"Content-Disposition: attachment; filename=\"{name}\"\r\n"
+                f"ETag: {radar_etag(key)}\r\n\r\n".encode("utf-8")
+            )
+            parts.append(images[key])
+            parts.append(b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+        return Response(b"".join(parts), media_type=f"multipart/mixed; boundary={boundary}")
+
+    formats = {key: chart.format for chart, key in zip(request.charts, keys)}
+    return json_response({
+        "charts": [{"id": chart.id, "key": key, "format": chart.format} for chart, key in zip(request.charts, keys)],
+        "images": {key: f"data:{RADAR_MEDIA_TYPES[formats[key]]};base64,{base64.b64encode(image).decode('utf-8')}"
+                   for key, image in images.items()},
+        **counts,
+    })
 
 
 class IdealProfileRequest(BaseModel):
     job_description: str
+    includeMatches: bool = False
+
+
+class SkillMatchOffset(BaseModel):
+    skill: str
+    alias: str
+    start: int
+    end: int
 
 
 class IdealProfileResponse(BaseModel):
@@ -396,42 +1546,54 @@ class IdealProfileResponse(BaseModel):
     experience: str
     education: str
     summary: str
+    matches: Optional[List[SkillMatchOffset]] = None
+    embedding: Optional[PackedEmbedding] = None
+
+
+class IdealProfileBatchItem(BaseModel):
+    id: str
+    job_description: str
+
+
+class IdealProfileBatchRequest(BaseModel):
+    jobs: List[IdealProfileBatchItem]
+    includeMatches: bool = False
 
 
-@app.post("/ai/generate-ideal-profile", response_model=IdealProfileResponse)
+@app.post("/ai/generate-ideal-profile", response_model=IdealProfileResponse, response_model_exclude_none=True)
 async def generate_ideal_profile(request: IdealProfileRequest):
     """
     Analyze job description and extract ideal candidate profile.
     """
-    job_desc = request.job_description.lower()
-
-    skill_keywords = {
-        'react': ['react', 'reactjs', 'react.js'],
-        'nodejs': ['node', 'nodejs', 'node.js', 'express'],
-        'typescript': ['typescript', 'ts'],
-        'python': ['python', 'django', 'flask', 'fastapi'],
-        'mongodb': ['mongodb', 'mongo'],
-        'postgresql': ['postgresql', 'postgres', 'sql'],
-        'docker': ['docker', 'container'],
-        'kubernetes': ['kubernetes', 'k8s'],
-        'aws': ['aws', 'amazon web services', 'cloud'],
-        'microservices': ['microservices', 'microservice'],
-        'machine-learning': ['machine learning', 'ml', 'ai', 'artificial intelligence'],
-        'tensorflow': ['tensorflow', 'tf'],
-        'pytorch': ['pytorch'],
-        'redux': ['redux', 'state management'],
-        'css': ['css', 'styling', 'sass', 'scss'],
-        'graphql': ['graphql', 'gql'],
-        'ci-cd': ['ci/cd', 'ci cd', 'continuous integration', 'jenkins', 'github actions'],
-        'terraform': ['terraform', 'infrastructure as code'],
-        'agile': ['agile', 'scrum'],
-        'rest-api': ['rest', 'api', 'restful']
-    }
+    return json_bytes_response(ideal_profile_body(request.job_description, request.includeMatches))
+
+
+@app.post("/ai/generate-ideal-profile/batch")
+async def generate_ideal_profile_batch(request: IdealProfileBatchRequest = bulk_body(IdealProfileBatchRequest)):
+    """
+    Extract ideal candidate profiles for many job openings in one call.
+    """
+    return batch_response("profiles", [
+        with_leading_field("id", job.id, ideal_profile_body(job.job_description, request.includeMatches))
+        for job in request.jobs
+    ])
+
+
+def ideal_profile_body(job_description: str, include_matches: bool) -> bytes:
+    key = response_key("generate-ideal-profile", job_description, include_matches)
+    body = response_cache.get(key)
+    if body is None:
+        body = dumps(build_ideal_profile(job_description, include_matches).dict(exclude_none=True))
+        response_cache.put(key, body)
+    return body
 
-    detected_skills = []
-    for skill, keywords in skill_keywords.items():
-        if any(keyword in job_desc for keyword in keywords):
-            detected_skills.append(skill)
+
+def build_ideal_profile(job_description: str, include_matches: bool = False) -> IdealProfileResponse:
+    job_desc = job_description.lower()
+
+    skill_matches = skill_matcher.scan(job_description)
+    found = {m.skill for m in skill_matches}
+    detected_skills = [skill for skill in skill_matcher.skills if skill in found]
 
     exp_years = 5
     if 'senior' in job_desc or 'lead' in job_desc:
@@ -456,7 +1618,8 @@ async def generate_ideal_profile(request: IdealProfileRequest):
         keySkills=detected_skills[:10] if detected_skills else ['programming', 'problem-solving'],
         experience=experience,
         education=education,
-        summary=summary
+        summary=summary,
+        matches=[SkillMatchOffset(**m._asdict()) for m in skill_matches] if include_matches else None
     )
 
 
@@ -465,176 +1628,609 @@ class ResumeItem(BaseModel):
     name: str
     email: str
     resumeText: str
+    embedding: Optional[PackedEmbedding] = None
 
 
 class RankResumesRequest(BaseModel):
     ideal_profile: IdealProfileResponse
+    resumes: List[ResumeItem] = []
+    # Indexed mode: rank resumes already stored via /ai/resume-index/upsert
+    useIndex: bool = False
+    resumeIds: Optional[List[str]] = None
+    topK: int = 10
+    # Chunked mode: score overlapping windows of long resumes and pool them
+    chunking: bool = False
+    pooling: str = "max"
+    poolingTopK: int = 2
+    # Hard cap on tokens encoded (400 when it cannot cover one window per resume)
+    tokenBudget: Optional[int] = None
+    # `session` keeps the resume (or chunk) vectors server-side and returns an
+    # id; later calls send `sessionId` with a new ideal profile and no resumes.
+    session: bool = False
+    sessionId: Optional[str] = None
+    # Collapse re-submissions and near-identical copies to one ranked resume;
+    # None follows RESUME_DEDUP
+    dedup: Optional[bool] = None
+
+
+class ResumeIndexUpsertRequest(BaseModel):
     resumes: List[ResumeItem]
 
 
-class RankedCandidate(BaseModel):
-    id: str
-    name: str
-    email: str
-    matchScore: float
-    explanation: str
+class ResumeIndexDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+def ideal_profile_text(profile: IdealProfileResponse) -> str:
+    return f"{profile.summary} Key skills: {', '.join(profile.keySkills)}. Experience: {profile.experience}. Education: {profile.education}"
+
+
+def profile_embedding(profile: IdealProfileResponse):
+    """Profile vector, from `profile.embedding` when its tag is current."""
+    return merge_supplied([profile.embedding], embedding_version("text"), embedding_backend.dimension,
+                          lambda _: encode_texts([ideal_profile_text(profile)]))
+
+
+def resume_embeddings(resumes: List[ResumeItem]):
+    """One vector per resume, from `embedding` where its tag is current."""
+    return merge_supplied([r.embedding for r in resumes], embedding_version("text"), embedding_backend.dimension,
+                          lambda positions: encode_texts([resumes[p].resumeText for p in positions]))
+
+
+def collapse_duplicates(request: RankResumesRequest):
+    """
+    The resumes to embed and rank, and the response's `dedup` field (None when
+    dedup is off). Each cluster of exact or near duplicates is represented by
+    its first resume in request order.
+    """
+    resumes = request.resumes
+    if not (request.dedup if request.dedup is not None else RESUME_DEDUP) or len(resumes) < 2:
+        return resumes, None
+    with stage("dedup"):
+        representatives, counts = resume_dedup.find([r.resumeText for r in resumes])
+    members: Dict[int, List[str]] = {}
+    for i, rep in enumerate(representatives):
+        if rep != i:
+            members.setdefault(rep, []).append(resumes[i].id)
+    kept = [r for i, r in enumerate(resumes) if representatives[i] == i]
+    return kept, {
+        "clusters": [{"representative": resumes[rep].id, "duplicates": ids} for rep, ids in members.items()],
+        "exactDuplicates": counts["exact"],
+        "nearDuplicates": counts["near"],
+        "encodesSaved": len(resumes) - len(kept),
+    }
+
+
+def ranked_candidate(resume_id: str, name: str, email: str, match_score: float, explanation: str) -> Dict[str, Any]:
+    return {"id": resume_id, "name": name, "email": email, "matchScore": round(match_score, 1), "explanation": explanation}
+
+
+def explain_resume_match(match_score: float, resume_text: str, key_skills: List[str]) -> str:
+    matched_skills = []
+    resume_lower = resume_text.lower()
+    for skill in key_skills:
+        if skill.replace('-', ' ') in resume_lower or skill.replace('-', '') in resume_lower:
+            matched_skills.append(skill)
+
+    if match_score >= 70:
+        return f"Excellent match! Strong alignment on skills: {', '.join(matched_skills[:5]) if matched_skills else 'relevant experience'}. High compatibility with job requirements."
+    elif match_score >= 50:
+        return f"Good match on {len(matched_skills)} skills: {', '.join(matched_skills[:4]) if matched_skills else 'core competencies'}. Solid candidate for consideration."
+    else:
+        return f"Moderate match. Has {len(matched_skills)} relevant skills: {', '.join(matched_skills[:3]) if matched_skills else 'some experience'}."
 
 
 @app.post("/ai/rank-resumes")
-async def rank_resumes(request: RankResumesRequest):
+async def rank_resumes(request: RankResumesRequest = bulk_body(RankResumesRequest)):
     """
     Rank resumes based on similarity to ideal candidate profile using embeddings.
+    With `useIndex`, ranks the stored resume index instead of `resumes`.
     """
     if not embedding_model:
         raise HTTPException(status_code=503, detail="Model not loaded yet")
 
-    if not request.resumes:
+    if request.useIndex and (request.session or request.sessionId):
+        raise HTTPException(status_code=400, detail="useIndex already scores stored vectors; it cannot be combined with a session")
+
+    if request.useIndex:
+        # Scoring stored vectors is a matrix product; only the profile is encoded.
+        count = len(request.resumeIds) if request.resumeIds is not None else len(resume_index)
+        admitted, pool = admit("rank-resumes", count / 100)
+        async with admitted:
+            return json_response(await run_in_pool(pool, "rank-resumes", compute_rank_indexed, request))
+
+    if not request.resumes and not request.sessionId:
         return {"topCandidates": [], "totalProcessed": 0}
 
-    ideal_text = f"{request.ideal_profile.summary} Key skills: {', '.join(request.ideal_profile.keySkills)}. Experience: {request.ideal_profile.experience}. Education: {request.ideal_profile.education}"
+    # A session follow-up pools the session's chunks even without `chunking`
+    if (request.chunking or request.sessionId) and request.pooling not in POOLING_MODES:
+        raise HTTPException(status_code=400, detail=f"pooling must be one of {', '.join(POOLING_MODES)}")
+
+    # Re-ranking a live session costs one matrix-vector product; the resumes,
+    # when sent along, are only embedded if the session has expired.
+    admitted, pool = admit("rank-resumes", texts_cost([r.resumeText for r in request.resumes]) if request.resumes else 1)
+    async with admitted:
+        return json_response(await run_in_pool(pool, "rank-resumes", compute_rank_resumes, request))
+
+
+def top_k_rounded(match_scores: np.ndarray, k: int) -> List[int]:
+    """
+    Top-K positions ordered by the score rounded to one decimal, ties kept in
+    input order. Rounding is monotone, so only scores within 0.1 of the raw
+    K-th best can make the cut and need the exact Python round().
+    """
+    if k <= 0 or match_scores.size == 0:
+        return []
+    if k < match_scores.size:
+        kth = np.partition(match_scores, match_scores.size - k)[match_scores.size - k]
+        shortlist = np.flatnonzero(match_scores >= kth - 0.1)
+    else:
+        shortlist = np.arange(match_scores.size)
+    rounded = [round(float(match_scores[i]), 1) for i in shortlist]
+    order = sorted(range(len(shortlist)), key=lambda j: rounded[j], reverse=True)
+    return [int(shortlist[j]) for j in order[:k]]
+
+
+def compute_rank_resumes(request: RankResumesRequest):
+    """Blocking part of rank-resumes: encode, similarity and explanations."""
+    if request.session or request.sessionId:
+        return compute_rank_session(request)
+    ideal_embedding, precomputed = profile_embedding(request.ideal_profile)
+
+    resumes, dedup = collapse_duplicates(request)
+    resume_texts = [r.resumeText for r in resumes]
+    chunk_stats = None
+    if request.chunking:
+        # Supplied resume vectors cover whole texts; chunk pooling needs per-chunk ones.
+        similarities, chunk_stats = chunked_similarities(ideal_embedding, resume_texts, request)
+    else:
+        embeddings, resume_counts = resume_embeddings(resumes)
+        precomputed = merge_counts(precomputed, resume_counts)
+        with stage("similarity"):
+            similarities = cosine_similarity(ideal_embedding, embeddings)[0]
+    match_scores = similarities.astype(np.float64) * 100
+
+    with stage("postprocess"):
+        top_candidates = []
+        for idx in top_k_rounded(match_scores, request.topK):
+            resume = resumes[idx]
+            match_score = float(match_scores[idx])
+            top_candidates.append(ranked_candidate(
+                resume.id, resume.name, resume.email, match_score,
+                explain_resume_match(match_score, resume.resumeText, request.ideal_profile.keySkills)
+            ))
+
+    result = {
+        "topCandidates": top_candidates,
+        "totalProcessed": len(request.resumes)
+    }
+    if chunk_stats is not None:
+        result["chunking"] = chunk_stats
+    if dedup is not None:
+        result["dedup"] = dedup
+    if precomputed["supplied"]:
+        result["precomputed"] = precomputed
+    return result
+
+
+def encode_chunks(resume_texts: List[str], request: RankResumesRequest):
+    """Encode every selected chunk of every resume in one pass; returns the vectors, each row's resume and stats."""
+    tokenizer = getattr(embedding_model, "tokenizer", None)
+    with stage("chunking"):
+        chunks = chunk_texts(resume_texts, tokenizer, RESUME_CHUNK_TOKENS, RESUME_CHUNK_OVERLAP)
+    # A caller's tokenBudget is a hard cap. The default only limits the extra
+    # windows: every resume's first window is always scored.
+    budget = request.tokenBudget if request.tokenBudget is not None else max(RESUME_TOKEN_BUDGET, first_chunk_tokens(chunks))
+    try:
+        selected, tokens_used = select_chunks(chunks, budget)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"tokenBudget too small: {e}; raise it or send fewer resumes")
+
+    chunk_embeddings = encode_texts([chunks[doc][i][0] for doc, i in selected])
+    owners = np.array([doc for doc, _ in selected], dtype=np.int64)
+
+    total_chunks = sum(len(c) for c in chunks)
+    return chunk_embeddings, owners, {
+        "pooling": request.pooling,
+        "chunksEncoded": len(selected),
+        "chunksSkipped": total_chunks - len(selected),
+        "tokensUsed": tokens_used,
+        "tokenBudget": budget,
+    }
 
-    ideal_embedding = embedding_model.encode([ideal_text])
 
-    resume_texts = [r.resumeText for r in request.resumes]
-    resume_embeddings = embedding_model.encode(resume_texts)
+def chunked_similarities(ideal_embedding: np.ndarray, resume_texts: List[str], request: RankResumesRequest):
+    """Score every selected chunk and pool per resume."""
+    chunk_embeddings, owners, stats = encode_chunks(resume_texts, request)
+    chunk_similarities = cosine_similarity(ideal_embedding, chunk_embeddings)[0]
+    similarities = pool_scores(chunk_similarities, owners, len(resume_texts), request.pooling, request.poolingTopK)
+    return similarities, stats
 
-    similarities = cosine_similarity(ideal_embedding, resume_embeddings)[0]
 
-    ranked_candidates = []
-    for idx, (resume, similarity) in enumerate(zip(request.resumes, similarities)):
-        match_score = float(similarity * 100)
+def ranking_session(session_id: Optional[str], kind: str, build):
+    """
+    The live session `session_id`, or a new one from `build()` (None when the
+    request carries no candidates to build from). Returns the session and the
+    `session` field of the response.
+    """
+    session = ranking_sessions.get(session_id, kind) if session_id else None
+    if session is not None:
+        return session, {"id": session.id, "reused": True, "ttlSeconds": ranking_sessions.ttl}
+    session = build()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Ranking session expired or unknown; send the candidates again")
+    stored = ranking_sessions.put(session)
+    return session, {"id": session.id if stored else None, "reused": False, "ttlSeconds": ranking_sessions.ttl}
 
-        matched_skills = []
-        resume_lower = resume.resumeText.lower()
-        for skill in request.ideal_profile.keySkills:
-            if skill.replace('-', ' ') in resume_lower or skill.replace('-', '') in resume_lower:
-                matched_skills.append(skill)
 
-        if match_score >= 70:
-            explanation = f"Excellent match! Strong alignment on skills: {', '.join(matched_skills[:5]) if matched_skills else 'relevant experience'}. High compatibility with job requirements."
-        elif match_score >= 50:
-            explanation = f"Good match on {len(matched_skills)} skills: {', '.join(matched_skills[:4]) if matched_skills else 'core competencies'}. Solid candidate for consideration."
-        else:
-            explanation = f"Moderate match. Has {len(matched_skills)} relevant skills: {', '.join(matched_skills[:3]) if matched_skills else 'some experience'}."
-
-        ranked_candidates.append(RankedCandidate(
-            id=resume.id,
-            name=resume.name,
-            email=resume.email,
-            matchScore=round(match_score, 1),
-            explanation=explanation
+def build_resume_session(request: RankResumesRequest) -> Optional[RankingSession]:
+    if not request.resumes:
+        return None
+    resumes, dedup = collapse_duplicates(request)
+    resume_texts = [r.resumeText for r in resumes]
+    items = [(r.id, r.name, r.email, text.lower()) for r, text in zip(resumes, resume_texts)]
+    payload_bytes = sum(len(text) + len(r.id) + len(r.name) + len(r.email) for r, text in zip(resumes, resume_texts))
+    info = {"totalProcessed": len(request.resumes)}
+    if dedup is not None:
+        info["dedup"] = dedup
+    if request.chunking:
+        chunk_embeddings, owners, info["chunking"] = encode_chunks(resume_texts, request)
+        return RankingSession("resumes", normalize_rows(chunk_embeddings), items, payload_bytes, owners, info)
+    embeddings, precomputed = resume_embeddings(resumes)
+    if precomputed["supplied"]:
+        info["precomputed"] = precomputed
+    return RankingSession("resumes", normalize_rows(embeddings), items, payload_bytes, info=info)
+
+
+def compute_rank_session(request: RankResumesRequest):
+    """Rank the session's resumes against the request's ideal profile: one encode and one matrix-vector product."""
+    session, session_info = ranking_session(request.sessionId, "resumes", lambda: build_resume_session(request))
+    ideal_vector = normalize_rows(profile_embedding(request.ideal_profile)[0])[0]
+    with stage("similarity"):
+        similarities = session.vectors @ ideal_vector
+        if session.owners is not None:
+            similarities = pool_scores(similarities, session.owners, len(session.items), request.pooling, request.poolingTopK)
+    match_scores = similarities.astype(np.float64) * 100
+
+    with stage("postprocess"):
+        top_candidates = []
+        for idx in top_k_rounded(match_scores, request.topK):
+            resume_id, name, email, text_lower = session.items[idx]
+            match_score = float(match_scores[idx])
+            top_candidates.append(ranked_candidate(
+                resume_id, name, email, match_score,
+                explain_resume_match(match_score, text_lower, request.ideal_profile.keySkills)
+            ))
+
+    result = {"topCandidates": top_candidates, "totalProcessed": session.info["totalProcessed"]}
+    if "chunking" in session.info:
+        result["chunking"] = {**session.info["chunking"], "pooling": request.pooling}
+    if "dedup" in session.info:
+        result["dedup"] = session.info["dedup"]
+    if "precomputed" in session.info and not session_info["reused"]:
+        result["precomputed"] = session.info["precomputed"]
+    result["session"] = session_info
+    return result
+
+
+def compute_rank_indexed(request: RankResumesRequest):
+    """One encode for the profile plus one matrix-vector product over the index."""
+    ideal_embedding = profile_embedding(request.ideal_profile)[0][0]
+    resume_ids = list(dict.fromkeys(request.resumeIds)) if request.resumeIds is not None else None
+    hits = resume_index.search(ideal_embedding, request.topK, ids=resume_ids)
+
+    top_candidates = []
+    for resume_id, similarity, record in hits:
+        match_score = similarity * 100
+        top_candidates.append(ranked_candidate(
+            resume_id, record["name"], record["email"], match_score,
+            explain_resume_match(match_score, record["resumeText"], request.ideal_profile.keySkills)
         ))
 
-    ranked_candidates.sort(key=lambda x: x.matchScore, reverse=True)
+    return {
+        "topCandidates": top_candidates,
+        # Only ids found in the index were scored
+        "totalProcessed": len(resume_index.rows_for(resume_ids)) if resume_ids is not None else len(resume_index)
+    }
+
+
+class StreamRankHeader(BaseModel):
+    ideal_profile: IdealProfileResponse
+    topK: int = 10
+    batchSize: int = 256
+    leaders: int = 3
+
+
+def score_resume_batch(ideal_embedding: np.ndarray, resume_texts: List[str]) -> np.ndarray:
+    resume_embeddings = encode_texts(resume_texts)
+    return cosine_similarity(ideal_embedding, resume_embeddings)[0].astype(np.float64) * 100
+
+
+async def stream_rank_resumes(lines):
+    """
+    Producer for /ai/rank-resumes/stream. The first NDJSON line is a
+    StreamRankHeader, every following line a ResumeItem. Resumes are embedded
+    in fixed-size batches and only a top-K heap survives between batches.
+    """
+    try:
+        header = StreamRankHeader(**(await lines.__anext__()))
+    except StopAsyncIteration:
+        yield {"event": "error", "detail": "Missing header line"}
+        return
+    except ValidationError as e:
+        yield {"event": "error", "detail": f"Invalid header: {e}"}
+        return
+
+    key_skills = header.ideal_profile.keySkills
+    ideal_embedding, _ = await encode_pool.run(profile_embedding, header.ideal_profile,
+                                               timeout=ENDPOINT_TIMEOUTS["rank-resumes"])
+    heap = TopKHeap(header.topK)
+    processed = 0
+    batch: List[ResumeItem] = []
+
+    async def flush():
+        match_scores = await encode_pool.run(score_resume_batch, ideal_embedding, [r.resumeText for r in batch],
+                                             timeout=ENDPOINT_TIMEOUTS["rank-resumes"])
+        for resume, match_score in zip(batch, match_scores):
+            rounded = round(float(match_score), 1)
+            if not heap.admits(rounded):
+                heap.skip()
+                continue
+            heap.push(rounded, ranked_candidate(
+                resume.id, resume.name, resume.email, float(match_score),
+                explain_resume_match(float(match_score), resume.resumeText, key_skills)
+            ))
+        batch.clear()
+
+    try:
+        async for item in lines:
+            batch.append(ResumeItem(**item))
+            if len(batch) >= header.batchSize:
+                processed += len(batch)
+                await flush()
+                leaders = heap.items()[:header.leaders]
+                yield {"event": "progress", "processed": processed,
+                       "leaders": [{"id": c["id"], "name": c["name"], "matchScore": c["matchScore"]} for c in leaders]}
+        if batch:
+            processed += len(batch)
+            await flush()
+    except ValidationError as e:
+        yield {"event": "error", "detail": f"Invalid resume after {processed} processed: {e}"}
+        return
+    except (PoolSaturated, PoolTimeout) as e:
+        yield {"event": "error", "detail": str(e)}
+        return
+
+    yield {"event": "final", "topCandidates": heap.items(), "totalProcessed": processed}
+
+
+@app.post("/ai/rank-resumes/stream")
+async def rank_resumes_stream(request: Request):
+    """
+    Streaming variant of rank-resumes for bulk screening. Request and response
+    bodies are NDJSON; the response carries progress events and a final ranking.
+    """
+    if not embedding_model:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+
+    # The slot is held until the stream ends; the cost is unknown up front, so
+    # this lane limits concurrency only.
+    release = await admission.acquire("rank-resumes-stream")
+    return NDJSONStreamResponse(stream_rank_resumes, background=BackgroundTask(release))
+
+
+def upsert_resumes(resumes: List[ResumeItem]):
+    vectors, _ = resume_embeddings(resumes)
+    resume_index.upsert(
+        [r.id for r in resumes],
+        vectors,
+        [{"name": r.name, "email": r.email, "resumeText": r.resumeText} for r in resumes]
+    )
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str] = []
+    skillSets: List[List[str]] = []
+    profiles: List[IdealProfileResponse] = []
+    # "packed" (base64 float16, accepted back by matching) or "float" (a list
+    # of numbers, for stores that index raw vectors)
+    encoding: str = "packed"
 
-    top_candidates = ranked_candidates[:10]
 
+EMBED_ENCODINGS = ("packed", "float")
+
+
+def embedding_payload(version: str, vector: np.ndarray, encoding: str) -> Dict[str, Any]:
+    if encoding == "float":
+        # The fast encoder writes NumPy rows directly; FastAPI's needs lists
+        return {"version": version, "values": vector if FAST_JSON else vector.tolist()}
+    return {"version": version, "data": pack(vector)}
+
+
+def compute_embeddings(request: EmbedRequest) -> Dict[str, Any]:
+    texts = request.texts + [ideal_profile_text(p) for p in request.profiles]
+    packed_texts = []
+    if texts:
+        version = embedding_version("text")
+        packed_texts = [embedding_payload(version, v, request.encoding) for v in normalize_rows(encode_texts(texts))]
+    packed_skills = []
+    if request.skillSets:
+        version = embedding_version("skills")
+        packed_skills = [embedding_payload(version, v, request.encoding) for v in skill_set_vectors(request.skillSets)]
     return {
-        "topCandidates": [c.dict() for c in top_candidates],
-        "totalProcessed": len(request.resumes)
+        "dimension": embedding_backend.dimension,
+        "texts": packed_texts[:len(request.texts)],
+        "profiles": packed_texts[len(request.texts):],
+        "skillSets": packed_skills,
     }
 
 
+@app.post("/ai/embed")
+async def embed(request: EmbedRequest = bulk_body(EmbedRequest)):
+    """
+    Bulk embedding for callers that store vectors beside their documents.
+    Texts (resumes), ideal profiles and employee skill lists come back as
+    packed float16 vectors (or float lists) with a version tag; sending packed ones back as
+    `embedding` / `skillsEmbedding` lets matching skip the model while the
+    tag matches the loaded model.
+    """
+    if not embedding_model:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+    if request.encoding not in EMBED_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {', '.join(EMBED_ENCODINGS)}")
+
+    cost = texts_cost(request.texts) + len(request.profiles) + len(request.skillSets)
+    admitted, pool = admit("embed", cost)
+    async with admitted:
+        return json_response(await run_in_pool(pool, "embed", compute_embeddings, request))
+
+
+# Resume index maintenance
+@app.post("/ai/resume-index/upsert")
+async def resume_index_upsert(request: ResumeIndexUpsertRequest = bulk_body(ResumeIndexUpsertRequest)):
+    if not embedding_model:
+        raise HTTPException(status_code=503, detail="Model not loaded yet")
+
+    if request.resumes:
+        admitted, pool = admit("resume-index", texts_cost([r.resumeText for r in request.resumes]))
+        async with admitted:
+            await run_in_pool(pool, "resume-index", upsert_resumes, request.resumes)
+
+    return {"upserted": len(request.resumes), "total": len(resume_index)}
+
+
+@app.post("/ai/resume-index/delete")
+async def resume_index_delete(request: ResumeIndexDeleteRequest):
+    deleted = resume_index.delete(request.ids)
+    return {"deleted": deleted, "total": len(resume_index)}
+
+
 class GenerateQuestionsRequest(BaseModel):
     job_title: str
     required_skills: List[str]
 
 
-@app.post("/ai/generate-questions")
-async def generate_questions(request: GenerateQuestionsRequest):
-    """
-    Generate interview questions based on job title and required skills.
-    """
-    behavioral_questions = [
-        "Tell me about a time when you faced a significant challenge in a project. How did you overcome it?",
-        "Describe a situation where you had to work with a difficult team member. How did you handle it?",
-        "Can you share an example of when you had to meet a tight deadline? What was your approach?",
-        "Tell me about a time when you had to learn a new technology quickly. How did you approach it?",
-        "Describe a project where you took initiative beyond your assigned responsibilities."
-    ]
+class GenerateQuestionsBatchRequest(BaseModel):
+    jobs: List[GenerateQuestionsRequest]
 
-    technical_question_bank = {
-        'react': [
-            "Explain the difference between class components and functional components in React.",
-            "What are React hooks and why were they introduced? Give examples of commonly used hooks.",
-            "How does React's virtual DOM work and why is it beneficial?",
-            "Explain the concept of lifting state up in React and when you would use it."
-        ],
-        'nodejs': [
-            "Explain the event loop in Node.js and how it handles asynchronous operations.",
-            "What is the difference between process.nextTick() and setImmediate()?",
-            "How would you handle errors in Express.js middleware?",
-            "Explain the concept of streams in Node.js and when you would use them."
-        ],
-        'typescript': [
-            "What are the benefits of using TypeScript over JavaScript?",
-            "Explain generics in TypeScript and provide a use case.",
-            "What is the difference between 'interface' and 'type' in TypeScript?",
-            "How does TypeScript handle null and undefined values?"
-        ],
-        'python': [
-            "Explain the difference between lists and tuples in Python.",
-            "What are decorators in Python and how would you use them?",
-            "Explain the Global Interpreter Lock (GIL) and its implications.",
-            "What is the difference between @staticmethod and @classmethod?"
-        ],
-        'docker': [
-            "Explain the difference between a Docker image and a Docker container.",
-            "What is a Dockerfile and what are some best practices for writing one?",
-            "How would you optimize Docker image size?",
-            "Explain Docker networking and how containers communicate with each other."
-        ],
-        'kubernetes': [
-            "Explain the architecture of Kubernetes and its main components.",
-            "What is a Pod in Kubernetes and how is it different from a container?",
-            "Explain Kubernetes Services and the different types available.",
-            "How does Kubernetes handle application scaling?"
-        ],
-        'aws': [
-            "Explain the difference between EC2 and Lambda.",
-            "What is an S3 bucket and what are its use cases?",
-            "How would you design a highly available architecture on AWS?",
-            "Explain VPC and its components in AWS."
-        ],
-        'mongodb': [
-            "Explain the difference between SQL and NoSQL databases.",
-            "What are indexes in MongoDB and why are they important?",
-            "Explain aggregation pipelines in MongoDB.",
-            "How would you handle data modeling in MongoDB?"
-        ],
-        'machine-learning': [
-            "Explain the difference between supervised and unsupervised learning.",
-            "What is overfitting and how can you prevent it?",
-            "Explain the bias-variance tradeoff.",
-            "What evaluation metrics would you use for a classification problem?"
-        ],
-        'microservices': [
-            "What are the key benefits and challenges of microservices architecture?",
-            "How do microservices communicate with each other?",
-            "Explain the concept of service discovery in microservices.",
-            "How would you handle distributed transactions in a microservices architecture?"
-        ]
-    }
+
+BEHAVIORAL_QUESTIONS = (
+    "Tell me about a time when you faced a significant challenge in a project. How did you overcome it?",
+    "Describe a situation where you had to work with a difficult team member. How did you handle it?",
+    "Can you share an example of when you had to meet a tight deadline? What was your approach?",
+    "Tell me about a time when you had to learn a new technology quickly. How did you approach it?",
+    "Describe a project where you took initiative beyond your assigned responsibilities."
+)
+
+TECHNICAL_QUESTION_BANK = MappingProxyType({
+    'react': (
+        "Explain the difference between class components and functional components in React.",
+        "What are React hooks and why were they introduced? Give examples of commonly used hooks.",
+        "How does React's virtual DOM work and why is it beneficial?",
+        "Explain the concept of lifting state up in React and when you would use it."
+    ),
+    'nodejs': (
+        "Explain the event loop in Node.js and how it handles asynchronous operations.",
+        "What is the difference between process.nextTick() and setImmediate()?",
+        "How would you handle errors in Express.js middleware?",
+        "Explain the concept of streams in Node.js and when you would use them."
+    ),
+    'typescript': (
+        "What are the benefits of using TypeScript over JavaScript?",
+        "Explain generics in TypeScript and provide a use case.",
+        "What is the difference between 'interface' and 'type' in TypeScript?",
+        "How does TypeScript handle null and undefined values?"
+    ),
+    'python': (
+        "Explain the difference between lists and tuples in Python.",
+        "What are decorators in Python and how would you use them?",
+        "Explain the Global Interpreter Lock (GIL) and its implications.",
+        "What is the difference between @staticmethod and @classmethod?"
+    ),
+    'docker': (
+        "Explain the difference between a Docker image and a Docker container.",
+        "What is a Dockerfile and what are some best practices for writing one?",
+        "How would you optimize Docker image size?",
+        "Explain Docker networking and how containers communicate with each other."
+    ),
+    'kubernetes': (
+        "Explain the architecture of Kubernetes and its main components.",
+        "What is a Pod in Kubernetes and how is it different from a container?",
+        "Explain Kubernetes Services and the different types available.",
+        "How does Kubernetes handle application scaling?"
+    ),
+    'aws': (
+        "Explain the difference between EC2 and Lambda.",
+        "What is an S3 bucket and what are its use cases?",
+        "How would you design a highly available architecture on AWS?",
+        "Explain VPC and its components in AWS."
+    ),
+    'mongodb': (
+        "Explain the difference between SQL and NoSQL databases.",
+        "What are indexes in MongoDB and why are they important?",
+        "Explain aggregation pipelines in MongoDB.",
+        "How would you handle data modeling in MongoDB?"
+    ),
+    'machine-learning': (
+        "Explain the difference between supervised and unsupervised learning.",
+        "What is overfitting and how can you prevent it?",
+        "Explain the bias-variance tradeoff.",
+        "What evaluation metrics would you use for a classification problem?"
+    ),
+    'microservices': (
+        "What are the key benefits and challenges of microservices architecture?",
+        "How do microservices communicate with each other?",
+        "Explain the concept of service discovery in microservices.",
+        "How would you handle distributed transactions in a microservices architecture?"
+    ),
+})
+
+GENERAL_TECHNICAL_QUESTIONS = (
+    "Walk me through your approach to solving a complex technical problem.",
+    "How do you stay updated with new technologies and industry trends?",
+    "Describe your experience with version control systems like Git.",
+    "How do you approach code reviews and ensure code quality?"
+)
+
+
+def questions_body(request: GenerateQuestionsRequest) -> bytes:
+    key = response_key("generate-questions", request.job_title, request.required_skills)
+    body = response_cache.get(key)
+    if body is not None:
+        return body
 
     technical_questions = {}
     for skill in request.required_skills:
         skill_normalized = skill.lower().replace(' ', '-')
-        if skill_normalized in technical_question_bank:
-            technical_questions[skill] = technical_question_bank[skill_normalized]
+        if skill_normalized in TECHNICAL_QUESTION_BANK:
+            technical_questions[skill] = TECHNICAL_QUESTION_BANK[skill_normalized]
 
     if not technical_questions:
-        technical_questions['general'] = [
-            "Walk me through your approach to solving a complex technical problem.",
-            "How do you stay updated with new technologies and industry trends?",
-            "Describe your experience with version control systems like Git.",
-            "How do you approach code reviews and ensure code quality?"
-        ]
+        technical_questions['general'] = GENERAL_TECHNICAL_QUESTIONS
 
-    return {
-        "behavioral_questions": behavioral_questions,
+    body = dumps({
+        "behavioral_questions": BEHAVIORAL_QUESTIONS,
         "technical_questions": technical_questions,
         "job_title": request.job_title
-    }
+    })
+    response_cache.put(key, body)
+    return body
+
+
+@app.post("/ai/generate-questions")
+async def generate_questions(request: GenerateQuestionsRequest):
+    """
+    Generate interview questions based on job title and required skills.
+    """
+    return json_bytes_response(questions_body(request))
+
+
+@app.post("/ai/generate-questions/batch")
+async def generate_questions_batch(request: GenerateQuestionsBatchRequest = bulk_body(GenerateQuestionsBatchRequest)):
+    """
+    Interview questions for many job titles in one call, in request order.
+    """
+    return batch_response("questionSets", [questions_body(job) for job in request.jobs])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Histograms are updated on the request path; gauges are read
+from callbacks at scrape time (cache and pool stats already exist as
+`stats()` dicts). `stage()` times a named step of the current request and
+files it under that request's route. Each uvicorn worker keeps its own
+registry; `hrms_ai_process_info` tells which worker answered a scrape.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    Values computed at scrape time: `collect` yields (label values, value).
+    kind="counter" exposes monotonically growing totals kept elsewhere.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, Optional[float]]]], kind: str = "gauge"):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        try:
+            values = list(self.collect())
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}" for k, v in values if v is not None]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.register(Gauge("hrms_ai_process_info", "Worker process serving this scrape.", ("pid",), lambda: [((str(os.getpid()),), 1)]))
+request_seconds = registry.register(Histogram(
+    "hrms_ai_request_seconds", "Request latency by route, method and status.", ("route", "method", "status")))
+stage_seconds = registry.register(Histogram(
+    "hrms_ai_stage_seconds", "Time spent in a named stage of a request.", ("route", "stage")))
+encode_batch_size = registry.register(Histogram(
+    "hrms_ai_encode_batch_texts", "Texts per model encode call.", (), SIZE_BUCKETS))
+encode_tokens = registry.register(Histogram(
+    "hrms_ai_encode_text_tokens", "Word-piece tokens per encoded text (sampled batches).", (), SIZE_BUCKETS))
+
+# The ASGI scope of the request being served; routing fills in scope["route"].
+current_scope: contextvars.ContextVar = contextvars.ContextVar("current_scope", default=None)
+# Scopes of in-flight requests, for the sampling profiler
+active_requests: Dict[int, dict] = {}
+
+
+def route_of(scope) -> str:
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, route_of(current_scope.get()), name)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and makes its scope visible to `stage()`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = current_scope.set(scope)
+        key = id(scope)
+        active_requests[key] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            active_requests.pop(key, None)
+            current_scope.reset(token)
+            request_seconds.observe(time.perf_counter() - started, route_of(scope), scope["method"], str(status["code"]))
@@ -0,0 +1,119 @@
+"""
+Near-duplicate detection for resume pools.
+
+Texts are normalized (lowercased, punctuation dropped, whitespace collapsed)
+and grouped by a hash of the normalized form, which catches re-submissions.
+The remaining distinct texts get a MinHash signature over word shingles, and
+LSH banding puts texts that agree on a whole band of the signature in the same
+bucket. Only texts sharing a bucket are compared, so the work grows with the
+number of texts rather than the number of pairs. A candidate pair is a
+duplicate when its estimated Jaccard similarity reaches the threshold.
+"""
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+def normalize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def shingle_hashes(tokens: List[str], size: int) -> np.ndarray:
+    """64-bit hashes of the `size`-word shingles (the whole text when it is shorter)."""
+    token_hashes = np.array([zlib.crc32(t.encode("utf-8")) for t in tokens], dtype=np.uint64)
+    if len(token_hashes) <= size:
+        size = len(token_hashes)
+    # Polynomial combination of consecutive token hashes, wrapping at 2**64
+    shingles = np.zeros(len(token_hashes) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        shingles = shingles * np.uint64(1000003) + token_hashes[offset:len(token_hashes) - size + 1 + offset]
+    return np.unique(shingles)
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        # The lower index stays the root, so it becomes the representative
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+class NearDuplicateDetector:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Multiply-shift hash family: (a * x + b) >> 32 with odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: List[str]) -> np.ndarray:
+        shingles = shingle_hashes(tokens, self.shingle_size)
+        with np.errstate(over="ignore"):
+            hashed = (shingles[:, None] * self._a + self._b) >> np.uint64(32)
+        return (hashed & _MASK).min(axis=0).astype(np.uint32)
+
+    def find(self, texts: Sequence[str]) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Representative position for every text: the first text of its cluster
+        in input order (a text alone in its cluster is its own representative).
+        Also returns how many texts were folded in as exact and as near
+        duplicates.
+        """
+        n = len(texts)
+        clusters = _DisjointSet(n)
+        first_by_hash: Dict[bytes, int] = {}
+        distinct: List[Tuple[int, List[str]]] = []
+        exact = 0
+        for i, text in enumerate(texts):
+            tokens = normalize(text)
+            key = hashlib.sha1(" ".join(tokens).encode("utf-8")).digest()
+            if key in first_by_hash:
+                clusters.union(first_by_hash[key], i)
+                exact += 1
+                continue
+            first_by_hash[key] = i
+            if tokens:
+                distinct.append((i, tokens))
+
+        near = 0
+        if len(distinct) > 1:
+            signatures = np.stack([self.signature(tokens) for _, tokens in distinct])
+            positions = [i for i, _ in distinct]
+            for band in range(self.bands):
+                buckets: Dict[bytes, int] = {}
+                band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+                for row, band_key in enumerate(band_rows):
+                    leader = buckets.setdefault(band_key.tobytes(), row)
+                    if leader == row:
+                        continue
+                    # Compare against the bucket's first text only; other bands catch the rest
+                    a, b = positions[leader], positions[row]
+                    if clusters.find(a) == clusters.find(b):
+                        continue
+                    if np.mean(signatures[leader] == signatures[row]) >= self.threshold:
+                        clusters.union(a, b)
+                        near += 1
+
+        return [clusters.find(i) for i in range(n)], {"exact": exact, "near": near}
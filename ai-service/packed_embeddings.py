@@ -0,0 +1,69 @@
+"""
+Compact wire format for embeddings that callers store and send back.
+
+A vector travels as base64 of its little-endian float16 values (about 1 KB for
+384 dimensions, a quarter of the same vector as a JSON number list) next to a
+version tag naming the model and the kind of vector. A request may carry
+such vectors in place of text to embed; `merge_supplied` uses the ones whose
+tag matches the loaded model and computes the rest.
+"""
+import base64
+import binascii
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WIRE_DTYPE = np.dtype("<f2")
+
+
+def pack(vector: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=WIRE_DTYPE).tobytes()).decode("ascii")
+
+
+def unpack(data: str, dim: int) -> np.ndarray:
+    """Decode to float32; raises ValueError on malformed data or the wrong dimension."""
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"invalid base64: {e}")
+    if len(raw) != dim * WIRE_DTYPE.itemsize:
+        raise ValueError(f"expected {dim} float16 values, got {len(raw)} bytes")
+    vector = np.frombuffer(raw, dtype=WIRE_DTYPE).astype(np.float32)
+    if not np.isfinite(vector).all():
+        raise ValueError("vector has non-finite values")
+    return vector
+
+
+def merge_supplied(supplied: Sequence[Optional[object]], version: str, dim: int,
+                   compute: Callable[[List[int]], np.ndarray]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    One vector per position. `supplied` holds objects with `version` and
+    `data` (or None); usable ones are decoded and normalized, the other
+    positions are passed to `compute`, which returns their rows in order.
+    """
+    counts = {"supplied": 0, "used": 0, "stale": 0, "invalid": 0}
+    decoded: Dict[int, np.ndarray] = {}
+    for i, packed in enumerate(supplied):
+        if packed is None:
+            continue
+        counts["supplied"] += 1
+        if packed.version != version:
+            counts["stale"] += 1
+            continue
+        try:
+            vector = unpack(packed.data, dim)
+        except ValueError:
+            counts["invalid"] += 1
+            continue
+        norm = np.linalg.norm(vector)
+        decoded[i] = vector / norm if norm > 0 else vector
+    counts["used"] = len(decoded)
+
+    if not decoded:
+        return np.asarray(compute(list(range(len(supplied)))), dtype=np.float32), counts
+    out = np.empty((len(supplied), dim), dtype=np.float32)
+    out[list(decoded)] = np.stack(list(decoded.values()))
+    missing = [i for i in range(len(supplied)) if i not in decoded]
+    if missing:
+        out[missing] = compute(missing)
+    return out, counts
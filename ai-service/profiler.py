@@ -0,0 +1,94 @@
+"""
+Opt-in sampling profiler.
+
+While armed for a route, a background thread wakes every `interval`
+seconds and, if a request on that route is in flight, records the Python
+stack of every busy thread (the event loop and the encode pool threads).
+Stacks are aggregated in collapsed form ("a;b;c count"), which flamegraph
+tools read directly. Nothing is sampled while no such request runs, and
+nothing at all unless PROFILER_ENABLED=1.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from metrics import active_requests, route_of
+
+# Innermost frames of threads that are merely waiting for work
+_IDLE = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"),
+         ("threading.py", "_wait_for_tstate_lock"), ("base_events.py", "_run_once")}
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.interval = 0.005
+        self.deadline = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, route: str, interval_ms: float = 5.0, duration_s: float = 60.0):
+        with self._lock:
+            if self.running:
+                raise RuntimeError(f"profiler already running for {self.route}")
+            self.route = route
+            self.interval = interval_ms / 1000
+            self.deadline = time.monotonic() + duration_s
+            self.samples = 0
+            self.stacks = Counter()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self.deadline = 0.0
+        if self._thread is not None:
+            self._thread.join()
+
+    def _route_active(self) -> bool:
+        return any(route_of(scope) == self.route for scope in list(active_requests.values()))
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while time.monotonic() < self.deadline:
+            time.sleep(self.interval)
+            if not self._route_active():
+                continue
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                with self._lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+            with self._lock:
+                self.samples += 1
+
+    def report(self, top: int = 100) -> Dict[str, Any]:
+        with self._lock:
+            stacks = self.stacks.most_common(top)
+            return {
+                "route": self.route,
+                "running": self.running,
+                "intervalMs": self.interval * 1000,
+                "samples": self.samples,
+                "collapsed": [f"{stack} {count}" for stack, count in stacks],
+            }
@@ -0,0 +1,195 @@
+"""
+Radar chart rendering for performance competencies.
+
+Kept separate from `main.py` so render workers only import matplotlib and not
+the embedding model; matplotlib itself is imported on first render.
+
+PNG charts are not rebuilt per call. The static part (grid, tick labels,
+category labels, title) is drawn once per (size, dpi) and kept as a pixel
+buffer, for the few most recently used sizes; a render restores that buffer, draws only the data line and fill on
+top (matplotlib blitting) and encodes the tightly cropped result. SVG charts
+are assembled as text directly, without matplotlib.
+"""
+import math
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import List, Tuple
+
+import numpy as np
+
+CATEGORIES = ['Technical', 'Communication', 'Teamwork', 'Initiative', 'Leadership', 'Punctuality']
+MAX_SCORE = 5
+
+LINE_COLOR = '#3b82f6'
+GRID_COLOR = '#cbd5e1'
+FACE_COLOR = '#f8fafc'
+TICK_COLOR = '#64748b'
+LABEL_COLOR = '#1e293b'
+TITLE_COLOR = '#0f172a'
+TITLE = 'Performance Competencies'
+
+ANGLES = np.linspace(0, 2 * np.pi, len(CATEGORIES), endpoint=False)
+
+# Backgrounds kept per process; size and dpi come from callers, so older ones are dropped
+MAX_TEMPLATES = 8
+MAX_SVG_BACKGROUNDS = 32
+
+
+class _Template:
+    """A drawn chart background plus the animated artists for the data."""
+
+    def __init__(self, size: float, dpi: int):
+        # Imported here so that importing this module (in the API process) stays cheap.
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        angles = ANGLES.tolist() + ANGLES[:1].tolist()
+        fig = Figure(figsize=(size, size), dpi=dpi)
+        self.canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(projection='polar')
+
+        self.line, = ax.plot(angles, [0] * len(angles), 'o-', linewidth=2, color=LINE_COLOR, label='Score', animated=True)
+        self.fill, = ax.fill(angles, [0] * len(angles), alpha=0.25, color=LINE_COLOR, animated=True)
+
+        ax.set_ylim(0, MAX_SCORE)
+        ax.set_yticks([1, 2, 3, 4, 5])
+        ax.set_yticklabels(['1', '2', '3', '4', '5'], fontsize=10, color=TICK_COLOR)
+
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(CATEGORIES, fontsize=12, fontweight='bold', color=LABEL_COLOR)
+
+        ax.grid(True, linestyle='--', alpha=0.7, color=GRID_COLOR)
+        ax.spines['polar'].set_color(GRID_COLOR)
+
+        ax.set_facecolor(FACE_COLOR)
+        fig.patch.set_facecolor('white')
+
+        ax.set_title(TITLE, size=16, fontweight='bold', pad=20, color=TITLE_COLOR)
+
+        self.canvas.draw()
+        self.ax = ax
+        self.background = self.canvas.copy_from_bbox(fig.bbox)
+
+        # Same crop as savefig(bbox_inches='tight'): artist extent plus 0.1in.
+        tight = fig.get_tightbbox(self.canvas.get_renderer()).padded(0.1)
+        height = int(round(fig.bbox.height))
+        x0 = max(0, int(math.floor(tight.x0 * dpi)))
+        x1 = min(int(round(fig.bbox.width)), int(math.ceil(tight.x1 * dpi)))
+        y0 = max(0, height - int(math.ceil(tight.y1 * dpi)))
+        y1 = min(height, height - int(math.floor(tight.y0 * dpi)))
+        self.crop = (slice(y0, y1), slice(x0, x1))
+        self.lock = threading.Lock()
+
+    def render(self, values: List[float]) -> np.ndarray:
+        closed = list(values) + list(values[:1])
+        angles = ANGLES.tolist() + ANGLES[:1].tolist()
+        with self.lock:
+            self.canvas.restore_region(self.background)
+            self.fill.set_xy(np.column_stack([angles, closed]))
+            self.line.set_data(angles, closed)
+            self.ax.draw_artist(self.fill)
+            self.ax.draw_artist(self.line)
+            pixels = np.asarray(self.canvas.buffer_rgba())
+            return pixels[self.crop][..., :3].copy()
+
+
+_templates: "OrderedDict[Tuple[float, int], _Template]" = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+def _template(size: float, dpi: int) -> _Template:
+    key = (float(size), int(dpi))
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            template = _templates[key] = _Template(size, dpi)
+            if len(_templates) > MAX_TEMPLATES:
+                # Renders already holding the evicted template finish with it
+                _templates.popitem(last=False)
+        else:
+            _templates.move_to_end(key)
+    return template
+
+
+def render_radar_png(values: List[float], size: float = 8, dpi: int = 150) -> bytes:
+    """Render the six competency scores as a PNG and return the raw bytes."""
+    from PIL import Image
+
+    pixels = _template(size, dpi).render(values)
+    buf = BytesIO()
+    Image.fromarray(pixels).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def render_radar_png_batch(charts: List[Tuple[List[float], float, int]]) -> List[bytes]:
+    """Render several (values, size, dpi) charts in one worker call."""
+    return [render_radar_png(values, size, dpi) for values, size, dpi in charts]
+
+
+_svg_backgrounds: "OrderedDict[float, Tuple[str, float, float, float]]" = OrderedDict()
+_svg_backgrounds_lock = threading.Lock()
+
+
+def _svg_point(cx: float, cy: float, radius: float, angle: float, value: float) -> Tuple[float, float]:
+    r = radius * value / MAX_SCORE
+    return cx + r * math.cos(angle), cy - r * math.sin(angle)
+
+
+def _svg_background(size: float) -> Tuple[str, float, float, float]:
+    """Static SVG markup (everything but the data) and the plot geometry."""
+    with _svg_backgrounds_lock:
+        cached = _svg_backgrounds.get(size)
+        if cached is not None:
+            _svg_backgrounds.move_to_end(size)
+            return cached
+
+    width = size * 100
+    cx, cy = width / 2, width / 2 + width * 0.03
+    radius = width * 0.33
+    parts = [
+        f'<rect width="{width:g}" height="{width:g}" fill="white"/>',
+        f'<circle cx="{cx:.2f}" cy="{cy:.2f}" r="{radius:.2f}" fill="{FACE_COLOR}" stroke="{GRID_COLOR}"/>',
+    ]
+    for level in range(1, MAX_SCORE):
+        parts.append(f'<circle cx="{cx:.2f}" cy="{cy:.2f}" r="{radius * level / MAX_SCORE:.2f}" fill="none" '
+                     f'stroke="{GRID_COLOR}" stroke-opacity="0.7" stroke-dasharray="4 3"/>')
+    for angle, label in zip(ANGLES, CATEGORIES):
+        x, y = _svg_point(cx, cy, radius, angle, MAX_SCORE)
+        parts.append(f'<line x1="{cx:.2f}" y1="{cy:.2f}" x2="{x:.2f}" y2="{y:.2f}" '
+                     f'stroke="{GRID_COLOR}" stroke-opacity="0.7" stroke-dasharray="4 3"/>')
+        lx, ly = _svg_point(cx, cy, radius * 1.12, angle, MAX_SCORE)
+        anchor = "middle" if abs(math.cos(angle)) < 0.1 else ("start" if math.cos(angle) > 0 else "end")
+        parts.append(f'<text x="{lx:.2f}" y="{ly:.2f}" text-anchor="{anchor}" dominant-baseline="middle" '
+                     f'font-size="{size * 2:g}" font-weight="bold" fill="{LABEL_COLOR}">{label}</text>')
+    tick_angle = math.radians(22.5)
+    for level in range(1, MAX_SCORE + 1):
+        x, y = _svg_point(cx, cy, radius, tick_angle, level)
+        parts.append(f'<text x="{x:.2f}" y="{y:.2f}" font-size="{size * 1.6:g}" fill="{TICK_COLOR}">{level}</text>')
+    parts.append(f'<text x="{cx:.2f}" y="{width * 0.07:.2f}" text-anchor="middle" font-size="{size * 2.7:g}" '
+                 f'font-weight="bold" fill="{TITLE_COLOR}">{TITLE}</text>')
+
+    cached = ("".join(parts), cx, cy, radius)
+    with _svg_backgrounds_lock:
+        _svg_backgrounds[size] = cached
+        if len(_svg_backgrounds) > MAX_SVG_BACKGROUNDS:
+            _svg_backgrounds.popitem(last=False)
+    return cached
+
+
+def render_radar_svg(values: List[float], size: float = 8) -> bytes:
+    """Render the chart as standalone SVG, building the data path directly."""
+    background, cx, cy, radius = _svg_background(float(size))
+    points = [_svg_point(cx, cy, radius, angle, min(max(v, 0), MAX_SCORE)) for angle, v in zip(ANGLES, values)]
+    path = "M" + " L".join(f"{x:.2f},{y:.2f}" for x, y in points) + " Z"
+    markers = "".join(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{size * 0.6:g}" fill="{LINE_COLOR}"/>' for x, y in points)
+    width = size * 100
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{width:g}" '
+        f'viewBox="0 0 {width:g} {width:g}" font-family="DejaVu Sans, Arial, sans-serif">'
+        f'{background}'
+        f'<path d="{path}" fill="{LINE_COLOR}" fill-opacity="0.25" stroke="{LINE_COLOR}" stroke-width="{size * 0.5:g}"/>'
+        f'{markers}</svg>'
+    ).encode("utf-8")
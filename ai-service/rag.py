@@ -0,0 +1,189 @@
+"""
+Local retrieval over policy documents.
+
+PDFs are read page by page, each page is split into token windows, and the
+windows are embedded in batches into a persistent `VectorStore`. A manifest of
+per-page content hashes lets re-ingestion skip pages that did not change.
+Queries are one encode plus one matrix-vector product over the chunks the
+caller's role may see.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_store import VectorStore
+
+
+def iter_pdf_pages(stream: BinaryIO) -> Iterator[Tuple[int, str]]:
+    """Yield (1-based page number, extracted text), parsing one page at a time."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(stream)
+    for number, page in enumerate(reader.pages, start=1):
+        yield number, page.extract_text() or ""
+
+
+def page_hash(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class DocumentIndex:
+    def __init__(self, directory: Optional[str], encode_fn: Callable[[List[str]], np.ndarray],
+                 chunk_fn: Callable[[Sequence[str]], List[List[Tuple[str, int]]]], page_batch: int = 32):
+        self.directory = directory
+        self.store = VectorStore(os.path.join(directory, "chunks") if directory else None)
+        self.encode_fn = encode_fn
+        self.chunk_fn = chunk_fn
+        self.page_batch = page_batch
+        self._lock = threading.RLock()
+        # doc -> {"roles": [...], "pages": {page number (str): [content hash, chunk count]}}
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self._role_rows: Dict[Tuple[str, Optional[Tuple[str, ...]]], np.ndarray] = {}
+        self.manifest = self._read_manifest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.directory:
+            return dict(self.manifest)
+        if not os.path.exists(self._manifest_path()):
+            return {}
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        if not self.directory:
+            return
+        path = self._manifest_path()
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def _reload_manifest(self):
+        self.manifest = self._read_manifest()
+        self._role_rows.clear()
+
+    def _refresh(self):
+        """Pick up documents another worker ingested; the manifest is saved with the store."""
+        self.store.refresh(on_reload=self._reload_manifest)
+
+    @staticmethod
+    def _chunk_ids(doc: str, page: int, count: int) -> List[str]:
+        return [f"{doc}\x1f{page}\x1f{i}" for i in range(count)]
+
+    def _embed_pages(self, doc: str, roles: List[str], pages: List[Tuple[int, str]]):
+        """Chunk and embed `pages`; returns their chunk ids, vectors, records and the chunk count per page."""
+        chunks = self.chunk_fn([text for _, text in pages])
+        ids, texts, records, counts = [], [], [], []
+        for (number, _), page_chunks in zip(pages, chunks):
+            page_texts = [text for text, _ in page_chunks if text.strip()]
+            ids.extend(self._chunk_ids(doc, number, len(page_texts)))
+            texts.extend(page_texts)
+            records.extend({"doc": doc, "page": number, "text": text, "roles": roles} for text in page_texts)
+            counts.append(len(page_texts))
+        vectors = np.asarray(self.encode_fn(texts), dtype=np.float32) if texts else None
+        return ids, vectors, records, counts
+
+    def ingest(self, doc: str, pages: Iterator[Tuple[int, str]], roles: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Index `pages` of `doc`. Unchanged pages (same content hash and roles)
+        are skipped; chunks of changed or vanished pages are replaced. Pages
+        are embedded without holding the index lock, so queries keep running;
+        the new chunks and the manifest are then written in one store
+        transaction, so readers see the document either before or after the
+        ingest.
+        """
+        roles = sorted(set(roles or []))
+        with self._lock:
+            self._refresh()
+            entry = self.manifest.get(doc)
+            previous = dict(entry["pages"]) if entry else {}
+            roles_changed = entry is not None and entry["roles"] != roles
+        # page number (str) -> [content hash, chunk count]
+        pages_now: Dict[str, List] = {}
+        pending: List[Tuple[int, str]] = []
+        embedded: set = set()
+        ids: List[str] = []
+        vectors: List[np.ndarray] = []
+        records: List[Dict[str, Any]] = []
+        stats = {"pages": 0, "pagesSkipped": 0, "pagesEmbedded": 0, "chunksEmbedded": 0, "pagesRemoved": 0}
+
+        def flush():
+            batch_ids, batch_vectors, batch_records, counts = self._embed_pages(doc, roles, pending)
+            if batch_ids:
+                ids.extend(batch_ids)
+                vectors.append(batch_vectors)
+                records.extend(batch_records)
+            for (number, _), count in zip(pending, counts):
+                pages_now[str(number)][1] = count
+                embedded.add(str(number))
+            stats["chunksEmbedded"] += sum(counts)
+            stats["pagesEmbedded"] += len(pending)
+            pending.clear()
+
+        for number, text in pages:
+            stats["pages"] += 1
+            digest = page_hash(text)
+            old = previous.get(str(number))
+            if old and old[0] == digest and not roles_changed:
+                pages_now[str(number)] = old
+                stats["pagesSkipped"] += 1
+                continue
+            pages_now[str(number)] = [digest, 0]
+            pending.append((number, text))
+            if len(pending) >= self.page_batch:
+                flush()
+        if pending:
+            flush()
+
+        with self._lock, self.store.transaction():
+            # Start from the latest manifest: other ingests may have finished meanwhile
+            self.manifest = self._read_manifest()
+            latest = self.manifest.get(doc, {"pages": {}})["pages"]
+            for number, (_, count) in latest.items():
+                if number not in pages_now or number in embedded:
+                    self.store.delete(self._chunk_ids(doc, int(number), count), persist=False)
+                    stats["pagesRemoved"] += number not in pages_now
+                elif latest[number] != pages_now[number]:
+                    # Skipped page re-embedded by another ingest: keep its chunks and their entry
+                    pages_now[number] = latest[number]
+            for number in [n for n in pages_now if n not in embedded and n not in latest]:
+                # Skipped page whose chunks another ingest removed: re-embedded next time
+                del pages_now[number]
+            if ids:
+                self.store.upsert(ids, np.vstack(vectors), records, persist=False)
+            self.manifest[doc] = {"roles": roles, "pages": pages_now}
+            self._save_manifest()
+            self._role_rows.clear()
+        return stats
+
+    def documents(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return [{"doc": doc, "pages": len(entry["pages"]), "roles": entry["roles"]}
+                    for doc, entry in self.manifest.items()]
+
+    def _visible_rows(self, role: str, docs: Optional[Sequence[str]]) -> np.ndarray:
+        key = (role, tuple(sorted(docs)) if docs else None)
+        rows = self._role_rows.get(key)
+        if rows is None:
+            wanted = set(docs) if docs else None
+            rows = np.array([row for row, record in enumerate(self.store.records)
+                             if (not record["roles"] or role in record["roles"])
+                             and (wanted is None or record["doc"] in wanted)], dtype=np.int64)
+            self._role_rows[key] = rows
+        return rows
+
+    def query(self, query_vector: np.ndarray, top_k: int, role: str,
+              docs: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            rows = self._visible_rows(role, docs)
+            if len(rows) == 0:
+                return []
+            hits = self.store.search(query_vector, top_k, rows=rows)
+        return [{"doc": r["doc"], "page": r["page"], "text": r["text"], "score": score} for _, score, r in hits]
@@ -0,0 +1,241 @@
+"""
+Server-side ranking sessions for iterative re-ranking.
+
+A session keeps what a ranking needs besides the query: the normalized
+candidate vectors (one row per resume, per resume chunk with `owners`, or per
+employee) and the per-candidate data used to build the response. A follow-up
+call with a new ideal profile or new weights is then one matrix-vector
+product over the stored matrix instead of re-embedding every candidate.
+
+Sessions live in the memory of the worker that built them, expire after
+`ttl_s` without use, and the least recently used ones are dropped when the
+store exceeds `max_sessions` or `max_bytes`. With a `directory`, every session
+is also written there, so a follow-up answered by another worker process loads
+it from the file instead of missing; the files obey the same limits, with a
+file's modification time as its last use. A session file is one .npz of
+arrays plus a JSON document (never a pickle), and the directory must be
+owned by the service user and closed to others, or it is not used.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class RankingSession:
+    def __init__(self, kind: str, vectors: np.ndarray, items: Any, payload_bytes: int,
+                 owners: Optional[np.ndarray] = None, info: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.vectors = vectors
+        self.owners = owners
+        self.items = items
+        # Anything else the endpoint wants back on reuse (e.g. chunking stats)
+        self.info = info or {}
+        self.nbytes = vectors.nbytes + (owners.nbytes if owners is not None else 0) + payload_bytes
+        self.expires = 0.0
+
+
+def private_directory(path: str) -> bool:
+    """Create `path` readable by this user only; False if it exists and others own or can open it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.stat(path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return st.st_mode & 0o077 == 0
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# kind -> (items to JSON-able, JSON-able back to items)
+ItemCodecs = Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], Any]]]
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 100, max_bytes: int = 512 * 1024 * 1024, ttl_s: float = 1800.0,
+                 directory: Optional[str] = None, item_codecs: Optional[ItemCodecs] = None):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl_s
+        if directory and not private_directory(directory):
+            print(f"Ranking session directory {directory} is not private to this user; keeping sessions per worker")
+            directory = None
+        self.directory = directory
+        self.item_codecs = item_codecs or {}
+        self._sessions: "OrderedDict[str, RankingSession]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.missed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.loaded = 0
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.npz")
+
+    def _write(self, session: RankingSession):
+        arrays = {"vectors": session.vectors}
+        if session.owners is not None:
+            arrays["owners"] = session.owners
+        info = {}
+        for key, value in session.info.items():
+            if isinstance(value, np.ndarray):
+                arrays["info." + key] = value
+            else:
+                info[key] = value
+        encode = self.item_codecs.get(session.kind, (list, list))[0]
+        meta = {"id": session.id, "kind": session.kind, "nbytes": session.nbytes, "info": info, "items": encode(session.items)}
+        arrays["meta"] = np.array(json.dumps(meta, default=_json_default))
+        path = self._path(session.id)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+        self._sweep()
+
+    def _load(self, path: str) -> RankingSession:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            vectors = data["vectors"]
+            owners = data["owners"] if "owners" in data.files else None
+            info = meta["info"]
+            info.update({name[len("info."):]: data[name] for name in data.files if name.startswith("info.")})
+        decode = self.item_codecs.get(meta["kind"], (list, list))[1]
+        extra = vectors.nbytes + (owners.nbytes if owners is not None else 0)
+        session = RankingSession(meta["kind"], vectors, decode(meta["items"]), meta["nbytes"] - extra, owners, info)
+        session.id = meta["id"]
+        return session
+
+    def _sweep(self):
+        """Remove expired session files, then the least recently used beyond the limits."""
+        now = time.time()
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*.npz")):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for i, (mtime, size, path) in enumerate(files):
+            if mtime + self.ttl > now and len(files) - i <= self.max_sessions and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _read(self, session_id: str) -> Optional[RankingSession]:
+        """The session saved by any worker, with its file's last use pushed back; None if gone or expired."""
+        # Ids are uuid4 hex; anything else cannot name a session file
+        if len(session_id) != 32 or not all(c in "0123456789abcdef" for c in session_id):
+            return None
+        path = self._path(session_id)
+        try:
+            if os.stat(path).st_mtime + self.ttl <= time.time():
+                return None
+            session = self._load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated, foreign or outdated file: the same as an expired session
+            print(f"Ignoring unreadable ranking session file {path}: {e}")
+            return None
+        return session if session.id == session_id else None
+
+    def _drop(self, session_id: str) -> RankingSession:
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.nbytes
+        return session
+
+    def _expire(self, now: float):
+        for session_id in [s.id for s in self._sessions.values() if s.expires <= now]:
+            self._drop(session_id)
+            self.expired += 1
+
+    def put(self, session: RankingSession) -> bool:
+        """Store `session`; returns False when it alone exceeds the byte budget."""
+        if session.nbytes > self.max_bytes or self.max_sessions <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            session.expires = now + self.ttl
+            self._sessions[session.id] = session
+            self._bytes += session.nbytes
+            self.created += 1
+            while len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._sessions)))
+                self.evicted += 1
+        if self.directory:
+            self._write(session)
+        return True
+
+    def get(self, session_id: str, kind: str) -> Optional[RankingSession]:
+        """The live session of `kind`, with its expiry pushed back; None if unknown or expired."""
+        with self._lock:
+            now = time.monotonic()
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires <= now:
+                self._drop(session_id)
+                self.expired += 1
+                session = None
+        if session is None and self.directory:
+            session = self._read(session_id)
+            if session is not None:
+                with self._lock:
+                    if session_id not in self._sessions:
+                        session.expires = now + self.ttl
+                        self._sessions[session_id] = session
+                        self._bytes += session.nbytes
+                        self.loaded += 1
+                    session = self._sessions[session_id]
+        elif session is not None and self.directory:
+            try:
+                # Last use is shared: keeps the file alive for the other workers
+                os.utime(self._path(session_id))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if session is None or session.kind != kind:
+                self.missed += 1
+                return None
+            session.expires = now + self.ttl
+            if session_id in self._sessions:
+                self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._sessions)))
+                self.evicted += 1
+            self.reused += 1
+            return session
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "maxSessions": self.max_sessions,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl,
+                "created": self.created,
+                "reused": self.reused,
+                "missed": self.missed,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "loaded": self.loaded,
+                "directory": self.directory,
+            }
@@ -0,0 +1,93 @@
+"""
+Cache of serialized JSON responses for the deterministic endpoints.
+
+Onboarding, question and ideal-profile generation are pure functions of a few
+request fields, so their bodies are cached as ready-to-send bytes under a hash
+of exactly those fields. Entries expire after a TTL (so template changes roll
+out without a restart) and the least recently used entry goes first when the
+cache is full. Per-request fields such as `requestId` are not part of the key;
+they are spliced in front of the cached body with `with_leading_field`.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize like FastAPI's JSONResponse, so cached and fresh bodies match byte for byte."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def response_key(endpoint: str, *parts: Any) -> str:
+    """Hash of canonical JSON (sorted keys, no whitespace): equal payloads share a key in any field order."""
+    canonical = json.dumps([endpoint, *parts], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def with_leading_field(name: str, value: Any, body: bytes) -> bytes:
+    """Insert `"name": value` as the first field of the serialized object `body`."""
+    field = dumps(name) + b":" + dumps(value)
+    if body == b"{}":
+        return b"{" + field + b"}"
+    return b"{" + field + b"," + body[1:]
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_s
+        # key -> (expiry on the monotonic clock, body)
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= len(entry[1])
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, body: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "ttlSeconds": self.ttl,
+            }
@@ -0,0 +1,101 @@
+"""
+Multi-worker launcher for the AI service.
+
+    python serve.py
+
+Binds HOST:PORT once, loads the embedding model in this process
+(PRELOAD_MODEL=1, the default) and forks WEB_CONCURRENCY uvicorn workers that
+share the listening socket. Because the weights are loaded before the fork,
+workers share those pages copy-on-write instead of each holding a copy. Each
+worker still runs its own warm-up encode after the fork, so no torch thread
+pool exists in the parent when it forks. Dead workers are restarted; SIGTERM
+and SIGINT are forwarded to all workers.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+
+import uvicorn
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket):
+    config = uvicorn.Config(app, log_level=os.getenv("LOG_LEVEL", "info"))
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run():
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+    # main reads it too: state shared between workers (ranking sessions) depends on it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    import main as service
+
+    if os.getenv("PRELOAD_MODEL", "1") == "1":
+        print(f"Preloading {service.EMBEDDING_MODEL_NAME} before forking {workers} workers...")
+        service.preload_model()
+        # Move everything allocated so far out of the collector's reach so GC
+        # passes in the workers do not touch (and un-share) those pages.
+        gc.freeze()
+
+    sock = bind_socket(host, port)
+    if workers <= 1:
+        run_worker(service.app, sock)
+        return
+
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run_worker(service.app, sock)
+            os._exit(0)
+        children[pid] = True
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"Serving on http://{host}:{port} with {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.pop(pid, None)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}; restarting")
+            spawn()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+"""
+Single-pass skill keyword extraction.
+
+All aliases from the skill taxonomy are compiled once into one alternation
+regex with alphanumeric boundaries, longest alias first, so "ts" no longer
+matches inside "requirements" and "node.js" wins over "node". One scan of a
+description yields every match with its character offsets.
+"""
+import json
+import re
+from typing import Dict, List, NamedTuple
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    alias: str
+    start: int
+    end: int
+
+
+def load_taxonomy(path: str) -> Dict[str, List[str]]:
+    with open(path) as f:
+        return json.load(f)
+
+
+class SkillMatcher:
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.skills = list(taxonomy)
+        self._alias_to_skill: Dict[str, str] = {}
+        for skill, aliases in taxonomy.items():
+            for alias in aliases:
+                self._alias_to_skill.setdefault(alias.lower(), skill)
+        aliases = sorted(self._alias_to_skill, key=len, reverse=True)
+        # Multi-word aliases tolerate any run of whitespace; an optional plural
+        # "s" keeps "containers" or "apis" matching their alias.
+        alternation = "|".join(r"\s+".join(map(re.escape, a.split())) for a in aliases)
+        self._pattern = re.compile(rf"(?<![a-z0-9])({alternation})s?(?![a-z0-9])", re.IGNORECASE)
+
+    def canonical(self, skill: str) -> str:
+        """Taxonomy name for a skill string that is exactly an alias, else its normalized form."""
+        normalized = " ".join(skill.lower().split())
+        return self._alias_to_skill.get(normalized, normalized)
+
+    def scan(self, text: str) -> List[SkillMatch]:
+        matches = []
+        for m in self._pattern.finditer(text):
+            alias = " ".join(m.group(1).lower().split())
+            matches.append(SkillMatch(self._alias_to_skill[alias], m.group(1), m.start(), m.end()))
+        return matches
+
+    def detect(self, text: str) -> List[str]:
+        """Distinct skills found in `text`, in taxonomy order."""
+        found = {m.skill for m in self.scan(text)}
+        return [skill for skill in self.skills if skill in found]
@@ -0,0 +1,118 @@
+"""
+Skill vocabulary: one embedding per distinct skill token.
+
+Skill strings are canonicalized (spelling variants such as "ReactJS" map to
+"react") and each canonical skill is embedded once into a row-normalized
+matrix. Skill sets are then vectors without any model call: the normalized
+mean of their skills' rows, so "React, Node" and "Node, React" are the same
+vector. An empty skill set is the zero vector, which scores zero against
+anything. Fuzzy skill matching compares the few rows a request needs.
+
+The matrix holds at most `max_skills` rows; when it is full the least
+recently used skill gives up its row. Callers always get copies of the
+vectors, so a later eviction never changes a result already handed out.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class SkillVocabulary:
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], canonical_fn: Callable[[str], str],
+                 dimension_fn: Callable[[], int], max_skills: int = 50000):
+        self.encode_fn = encode_fn
+        self.canonical = canonical_fn
+        # Width of the model's vectors, known before any skill is embedded
+        self.dimension_fn = dimension_fn
+        self.max_skills = max(max_skills, 1)
+        # canonical skill -> row, least recently used first
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _grow(self, needed: int, dim: int):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity and self._vectors.shape[1] == dim:
+            return
+        capacity = min(max(needed, 2 * capacity, 64), self.max_skills)
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        size = len(self._rows)
+        if size:
+            vectors[:size] = self._vectors[:size]
+        self._vectors = vectors
+
+    def _store(self, skill: str, vector: np.ndarray):
+        if len(self._rows) >= self.max_skills:
+            _, row = self._rows.popitem(last=False)
+            self.evicted += 1
+        else:
+            row = len(self._rows)
+            self._grow(row + 1, vector.shape[0])
+        self._vectors[row] = vector
+        self._rows[skill] = row
+
+    def vectors(self, skills: Iterable[str]) -> np.ndarray:
+        """Normalized vector per skill string (after canonicalization), embedding unknown skills in one call."""
+        canonical = [self.canonical(skill) for skill in skills]
+        distinct = list(dict.fromkeys(canonical))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            known = [skill for skill in distinct if skill in self._rows]
+            if known:
+                rows = [self._rows[skill] for skill in known]
+                for skill in known:
+                    self._rows.move_to_end(skill)
+                found.update(zip(known, self._vectors[rows].copy()))
+        unknown = [skill for skill in distinct if skill not in found]
+        if unknown:
+            encoded = np.asarray(self.encode_fn(unknown), dtype=np.float32)
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            encoded = encoded / norms
+            found.update(zip(unknown, encoded))
+            with self._lock:
+                for skill, vector in zip(unknown, encoded):
+                    if skill not in self._rows:
+                        self._store(skill, vector)
+                        self.encoded += 1
+        if not canonical:
+            return np.zeros((0, self.dimension_fn()), dtype=np.float32)
+        index = {skill: i for i, skill in enumerate(distinct)}
+        table = np.stack([found[skill] for skill in distinct])
+        return table[[index[skill] for skill in canonical]]
+
+    def pooled(self, skill_sets: Sequence[Sequence[str]]) -> np.ndarray:
+        """One normalized vector per skill set: the mean of its distinct skills' vectors."""
+        canonical_sets = [list(dict.fromkeys(self.canonical(skill) for skill in skills)) for skills in skill_sets]
+        distinct = list(dict.fromkeys(skill for skills in canonical_sets for skill in skills))
+        # Canonical names map to themselves, so this only looks them up
+        table = self.vectors(distinct)
+        out = np.zeros((len(skill_sets), self.dimension_fn()), dtype=np.float32)
+        nonempty = [i for i, skills in enumerate(canonical_sets) if skills]
+        if nonempty:
+            index = {skill: i for i, skill in enumerate(distinct)}
+            gathered = table[[index[skill] for i in nonempty for skill in canonical_sets[i]]]
+            starts = np.cumsum([0] + [len(canonical_sets[i]) for i in nonempty[:-1]])
+            out[nonempty] = np.add.reduceat(gathered, starts, axis=0)
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            out /= norms
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "skills": len(self._rows),
+                "maxSkills": self.max_skills,
+                "encoded": self.encoded,
+                "evicted": self.evicted,
+                "capacity": int(self._vectors.shape[0]),
+                "bytes": int(self._vectors.nbytes),
+            }
@@ -0,0 +1,105 @@
+"""
+NDJSON streaming helpers for bulk endpoints.
+
+`NDJSONStreamResponse` hands the raw ASGI `receive` channel to a producer, so
+the request body is parsed line by line while events are already being sent
+back. Neither side ever holds the whole payload in memory.
+"""
+import heapq
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+class NDJSONError(ValueError):
+    pass
+
+
+async def iter_ndjson(receive, max_line_bytes: int = 1024 * 1024) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one parsed object per non-empty line of the request body."""
+    buffer = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        buffer += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise NDJSONError(f"NDJSON line exceeds {max_line_bytes} bytes")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Dict[str, Any]:
+    try:
+        value = json.loads(line)
+    except ValueError as e:
+        raise NDJSONError(f"Invalid NDJSON line: {e}")
+    if not isinstance(value, dict):
+        raise NDJSONError("Each NDJSON line must be a JSON object")
+    return value
+
+
+class NDJSONStreamResponse(Response):
+    media_type = "application/x-ndjson"
+
+    def __init__(self, producer: Callable[[AsyncIterator[Dict[str, Any]]], AsyncIterator[Dict[str, Any]]],
+                 max_line_bytes: int = 1024 * 1024, background: Optional[BackgroundTask] = None):
+        super().__init__(media_type=self.media_type, background=background)
+        self.producer = producer
+        self.max_line_bytes = max_line_bytes
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+            lines = iter_ndjson(receive, self.max_line_bytes)
+            try:
+                async for event in self.producer(lines):
+                    await send({"type": "http.response.body", "body": (json.dumps(event) + "\n").encode(), "more_body": True})
+            except NDJSONError as e:
+                error = {"event": "error", "detail": str(e)}
+                await send({"type": "http.response.body", "body": (json.dumps(error) + "\n").encode(), "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            # Runs even if the client went away mid-stream, so resources are always released.
+            if self.background is not None:
+                await self.background()
+
+
+class TopKHeap:
+    """
+    Bounded min-heap of the best K items by (score, arrival order). Among equal
+    scores the earlier item wins, like a stable descending sort.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = 0
+
+    def admits(self, score: float) -> bool:
+        if len(self._heap) < self.k:
+            return self.k > 0
+        return (score, -self._seq) > self._heap[0][:2]
+
+    def push(self, score: float, item: Any):
+        entry = (score, -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def skip(self):
+        """Account for an item that was not admitted so arrival order stays correct."""
+        self._seq += 1
+
+    def items(self) -> List[Any]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: (e[0], e[1]), reverse=True)]
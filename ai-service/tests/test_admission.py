@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, Lane
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_oversized_request_runs_alone_once_lane_is_empty():
+    async def scenario():
+        lane = Lane("bulk", max_concurrent=2, budget=100, max_queue=4, max_wait_s=1.0)
+        small = await lane.acquire(10)
+        big = asyncio.ensure_future(lane.acquire(500))
+        await asyncio.sleep(0.01)
+        assert not big.done()
+        lane.release(small)
+        charged = await asyncio.wait_for(big, 1.0)
+        assert charged == 100
+        assert lane.cost == 100 and lane.oversized == 1
+        # Nothing else fits next to it
+        other = asyncio.ensure_future(lane.acquire(1))
+        await asyncio.sleep(0.01)
+        assert not other.done()
+        lane.release(charged)
+        assert await asyncio.wait_for(other, 1.0) == 1
+        lane.release(1)
+        assert lane.cost == 0 and lane.active == 0
+
+    run(scenario())
+
+
+def test_controller_releases_the_charged_cost():
+    async def scenario():
+        controller = AdmissionController([Lane("bulk", 1, 100, 4, 1.0)])
+        async with controller.admit("bulk", 10000):
+            assert controller.lanes["bulk"].cost == 100
+        assert controller.lanes["bulk"].cost == 0
+
+    run(scenario())
+
+
+def test_timed_out_head_wakes_the_waiters_behind_it():
+    async def scenario():
+        lane = Lane("bulk", max_concurrent=2, budget=100, max_queue=4, max_wait_s=0.05)
+        held = await lane.acquire(60)
+        # Head needs more than is free; the one behind it would fit but FIFO holds it
+        head = asyncio.ensure_future(lane.acquire(50))
+        await asyncio.sleep(0)
+        lane.max_wait = 5.0
+        behind = asyncio.ensure_future(lane.acquire(30))
+        with pytest.raises(AdmissionRejected):
+            await head
+        assert await asyncio.wait_for(behind, 0.5) == 30
+        lane.release(30)
+        lane.release(held)
+
+    run(scenario())
+
+
+def test_cancelled_head_wakes_the_waiters_behind_it():
+    async def scenario():
+        lane = Lane("bulk", max_concurrent=2, budget=100, max_queue=4, max_wait_s=5.0)
+        held = await lane.acquire(60)
+        head = asyncio.ensure_future(lane.acquire(50))
+        await asyncio.sleep(0)
+        behind = asyncio.ensure_future(lane.acquire(30))
+        await asyncio.sleep(0)
+        head.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await head
+        assert await asyncio.wait_for(behind, 0.5) == 30
+        assert lane.stats()["waiting"] == 0
+        lane.release(30)
+        lane.release(held)
+
+    run(scenario())
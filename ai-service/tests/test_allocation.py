@@ -0,0 +1,19 @@
+import numpy as np
+
+from allocation import assign
+
+
+def test_optimal_beats_greedy_when_the_top_pick_blocks_a_project():
+    # Employee 0 is everyone's best match but has room for one seat only
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    seats = np.array([1, 1])
+    seat_percent = np.array([100, 100])
+    free = np.array([100, 100])
+
+    greedy, greedy_info = assign(scores, seats, seat_percent, free, solver="greedy")
+    optimal, optimal_info = assign(scores, seats, seat_percent, free)
+
+    assert greedy_info["method"] == "greedy"
+    assert sorted(greedy) == [(0, 0), (1, 1)]
+    assert optimal_info["method"] == "milp" and optimal_info["optimal"]
+    assert sorted(optimal) == [(0, 1), (1, 0)]
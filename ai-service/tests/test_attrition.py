@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from attrition import FEATURES, employee_features, parse_date
+
+AS_OF = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def feature(row, name):
+    return row[FEATURES.index(name)]
+
+
+def test_parse_date_formats():
+    assert parse_date("2024-01-02T00:00:00Z") == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert parse_date({"$date": "2024-01-02"}) == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert parse_date(1704153600000) == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert parse_date("") is None
+
+
+@pytest.mark.parametrize("value", ["not a date", "2024-13-45", 1e30, [1, 2]])
+def test_parse_date_rejects_garbage_with_value_error(value):
+    with pytest.raises(ValueError):
+        parse_date(value)
+
+
+def test_allocation_features_come_from_allocations_running_on_as_of():
+    employee = {"hireDate": "2022-01-01", "status": "inactive", "currentAllocationPercent": 0}
+    allocations = [
+        {"startDate": "2023-06-01", "endDate": "2024-06-01", "allocationPercent": 60, "status": "completed"},
+        {"startDate": "2024-01-01", "allocationPercent": 30, "status": "completed", "updatedAt": "2024-02-01"},
+        {"createdAt": "2024-02-01", "allocationPercent": 50, "status": "planned"},
+    ]
+    row = employee_features(employee, [], allocations, AS_OF)
+    assert feature(row, "allocationPercent") == 60
+    assert feature(row, "activeAllocations") == 1
+    # Current-state fields do not change the row
+    same = employee_features({**employee, "status": "active", "currentAllocationPercent": 90}, [], allocations, AS_OF)
+    np.testing.assert_array_equal(row, same)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from chunking import chunk_texts, first_chunk_tokens, pool_scores, select_chunks
+
+
+def long_texts(n_docs, words):
+    return [" ".join(f"w{doc}_{i}" for i in range(words)) for doc in range(n_docs)]
+
+
+def test_token_budget_is_a_hard_cap():
+    chunks = chunk_texts(long_texts(5, 1000), window=200, overlap=50)
+    needed = first_chunk_tokens(chunks)
+    assert needed == 5 * 200
+    for budget in (needed, needed + 150, needed + 1000, 8000):
+        selected, used = select_chunks(chunks, budget)
+        assert used <= budget
+        assert used == sum(chunks[doc][i][1] for doc, i in selected)
+        assert {doc for doc, _ in selected} == set(range(5))
+
+
+def test_budget_below_one_window_per_document_is_refused():
+    chunks = chunk_texts(long_texts(50, 1000), window=200, overlap=50)
+    with pytest.raises(ValueError):
+        select_chunks(chunks, 1000)
+
+
+def test_no_budget_takes_every_chunk():
+    chunks = chunk_texts(long_texts(3, 700), window=200, overlap=50)
+    selected, used = select_chunks(chunks, None)
+    assert len(selected) == sum(len(c) for c in chunks)
+
+
+def test_pool_scores_per_document():
+    similarities = np.array([0.1, 0.5, 0.3, 0.9, 0.2], dtype=np.float32)
+    owners = np.array([0, 0, 1, 1, 1])
+    np.testing.assert_allclose(pool_scores(similarities, owners, 2, "max"), [0.5, 0.9])
+    np.testing.assert_allclose(pool_scores(similarities, owners, 2, "mean"), [0.3, 1.4 / 3], rtol=1e-6)
+    np.testing.assert_allclose(pool_scores(similarities, owners, 2, "topk_mean", 2), [0.3, 0.6], rtol=1e-6)
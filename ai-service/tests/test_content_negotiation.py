@@ -0,0 +1,27 @@
+from content_negotiation import parse_accept, prefers_media
+
+
+def test_explicit_media_type_is_preferred():
+    assert prefers_media("image/png", "image/png")
+    assert prefers_media("image/*", "image/png")
+    assert prefers_media("image/png, */*;q=0.8", "image/png")
+
+
+def test_json_default_is_kept():
+    assert not prefers_media("", "image/png")
+    assert not prefers_media("*/*", "image/png")
+    assert not prefers_media("application/json", "image/png")
+    assert not prefers_media("image/png, application/json", "image/png")
+
+
+def test_q_values_are_honoured():
+    assert not prefers_media("image/png;q=0", "image/png")
+    assert not prefers_media("image/png;q=0.5, application/json", "image/png")
+    assert prefers_media("image/png, application/json;q=0.5", "image/png")
+    assert not prefers_media("image/svg+xml", "image/png")
+    # The specific range wins over the wildcard that would allow it
+    assert not prefers_media("image/*, image/png;q=0", "image/png")
+
+
+def test_parse_accept_skips_malformed_ranges():
+    assert parse_accept("text, Image/PNG ; q=0.7, */*;q=x") == [("image", "png", 0.7), ("*", "*", 0.0)]
@@ -0,0 +1,22 @@
+import numpy as np
+
+from rag import DocumentIndex
+
+
+def encode(texts):
+    return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+
+def chunk(texts):
+    return [[(text, 0)] for text in texts]
+
+
+def test_query_sees_only_documents_open_to_the_role():
+    index = DocumentIndex(None, encode, chunk)
+    index.ingest("handbook", iter([(1, "leave policy")]))
+    index.ingest("payroll", iter([(1, "salary bands")]), ["hr"])
+
+    assert {hit["doc"] for hit in index.query(np.ones(3), 5, "hr")} == {"handbook", "payroll"}
+    assert [hit["doc"] for hit in index.query(np.ones(3), 5, "employee")] == ["handbook"]
+    # Nothing visible is an empty result for the endpoint to report, not an error
+    assert index.query(np.ones(3), 5, "employee", ["payroll"]) == []
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+from ranking_sessions import RankingSession, SessionStore
+
+
+def resume_session(scale=1.0, chunked=False):
+    vectors = np.ones((4, 3), dtype=np.float32) * scale
+    owners = np.array([0, 0, 1, 2]) if chunked else None
+    items = [("r1", "Ann", "a@x", "python"), ("r2", "Bo", "b@x", "go"), ("r3", "Cy", "c@x", "sql")]
+    info = {"totalProcessed": 3, "availability": np.array([0.5, 1.0, 0.2])}
+    return RankingSession("resumes", vectors, items, 100, owners, info)
+
+
+def test_session_written_by_one_worker_loads_in_another(tmp_path):
+    directory = str(tmp_path / "sessions")
+    writer = SessionStore(directory=directory)
+    session = resume_session(2.0, chunked=True)
+    assert writer.put(session)
+
+    reader = SessionStore(directory=directory)
+    loaded = reader.get(session.id, "resumes")
+    assert loaded is not None
+    np.testing.assert_array_equal(loaded.vectors, session.vectors)
+    np.testing.assert_array_equal(loaded.owners, session.owners)
+    np.testing.assert_array_equal(loaded.info["availability"], session.info["availability"])
+    assert loaded.info["totalProcessed"] == 3
+    resume_id, name, email, text = loaded.items[1]
+    assert (resume_id, name, email, text) == ("r2", "Bo", "b@x", "go")
+    assert loaded.nbytes == session.nbytes
+    assert reader.get(session.id, "employees") is None
+    assert reader.stats()["loaded"] == 1
+
+
+def test_item_codecs_round_trip(tmp_path):
+    codecs = {"employees": (lambda items: [{"id": i} for i in items], lambda data: [d["id"] for d in data])}
+    writer = SessionStore(directory=str(tmp_path), item_codecs=codecs)
+    session = RankingSession("employees", np.zeros((2, 3), dtype=np.float32), ["e1", "e2"], 10)
+    writer.put(session)
+    reader = SessionStore(directory=str(tmp_path), item_codecs=codecs)
+    assert reader.get(session.id, "employees").items == ["e1", "e2"]
+
+
+def test_unreadable_session_file_counts_as_expired(tmp_path):
+    store = SessionStore(directory=str(tmp_path))
+    session = resume_session()
+    store.put(session)
+    path = os.path.join(str(tmp_path), f"{session.id}.npz")
+    with open(path, "wb") as f:
+        f.write(b"not a zip")
+    assert SessionStore(directory=str(tmp_path)).get(session.id, "resumes") is None
+
+
+def test_pickled_arrays_are_never_loaded(tmp_path):
+    store = SessionStore(directory=str(tmp_path))
+    session_id = "0" * 32
+    with open(os.path.join(str(tmp_path), f"{session_id}.npz"), "wb") as f:
+        np.savez(f, meta=np.array([{"kind": "resumes"}], dtype=object), vectors=np.zeros((1, 3)))
+    assert store.get(session_id, "resumes") is None
+
+
+def test_ids_that_are_not_session_ids_are_not_paths(tmp_path):
+    store = SessionStore(directory=str(tmp_path))
+    assert store.get("../../etc/passwd", "resumes") is None
+
+
+def test_directory_open_to_other_users_is_not_used(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+    store = SessionStore(directory=str(directory))
+    assert store.directory is None
+    session = resume_session()
+    assert store.put(session)
+    assert store.get(session.id, "resumes") is session
+    assert os.listdir(directory) == []
+    private = SessionStore(directory=str(tmp_path / "private"))
+    assert private.directory is not None
+    assert os.stat(private.directory).st_mode & 0o777 == 0o700
+
+
+def test_expired_files_are_swept(tmp_path):
+    store = SessionStore(directory=str(tmp_path), max_sessions=2)
+    ids = []
+    for _ in range(4):
+        session = resume_session()
+        store.put(session)
+        ids.append(session.id)
+    assert len(os.listdir(str(tmp_path))) == 2
@@ -0,0 +1,19 @@
+from response_cache import ResponseCache, response_key, with_leading_field
+
+
+def test_key_ignores_field_order():
+    first = response_key("generate-questions", {"b": [1, 2], "a": {"y": 1, "x": 2}})
+    second = response_key("generate-questions", {"a": {"x": 2, "y": 1}, "b": [1, 2]})
+    assert first == second
+
+
+def test_key_separates_endpoints_and_values():
+    assert response_key("generate-questions", {"a": 1}) != response_key("generate-onboarding", {"a": 1})
+    assert response_key("generate-questions", [1, 2]) != response_key("generate-questions", [2, 1])
+
+
+def test_cached_body_gets_leading_field():
+    cache = ResponseCache(max_entries=1)
+    key = response_key("generate-questions", "x")
+    cache.put(key, b'{"questions":[]}')
+    assert with_leading_field("requestId", "r1", cache.get(key)) == b'{"requestId":"r1","questions":[]}'
@@ -0,0 +1,45 @@
+import numpy as np
+
+from skill_vocabulary import SkillVocabulary
+
+DIM = 4
+
+
+def encode(skills):
+    return np.array([[len(skill), 1.0, 0.0, 0.0] for skill in skills], dtype=np.float32)
+
+
+def make_vocabulary(max_skills=100):
+    return SkillVocabulary(encode, str.lower, lambda: DIM, max_skills)
+
+
+def test_empty_skill_sets_on_cold_vocabulary_have_model_width():
+    vocabulary = make_vocabulary()
+    assert vocabulary.pooled([[]]).shape == (1, DIM)
+    assert vocabulary.pooled([[], []]).shape == (2, DIM)
+    assert vocabulary.vectors([]).shape == (0, DIM)
+
+
+def test_empty_skill_set_scores_zero():
+    vocabulary = make_vocabulary()
+    project = vocabulary.pooled([[]])[0]
+    employees = vocabulary.pooled([["Python", "SQL"], []])
+    np.testing.assert_array_equal(employees @ project, [0.0, 0.0])
+    project = vocabulary.pooled([["Python"]])[0]
+    assert (employees @ project)[1] == 0.0
+
+
+def test_pooled_ignores_order_and_case():
+    vocabulary = make_vocabulary()
+    a, b = vocabulary.pooled([["React", "Node"], ["node", "react"]])
+    np.testing.assert_allclose(a, b)
+    np.testing.assert_allclose(np.linalg.norm(a), 1.0, rtol=1e-6)
+
+
+def test_eviction_keeps_results_stable():
+    vocabulary = make_vocabulary(max_skills=2)
+    first = vocabulary.vectors(["a", "bb", "ccc"])
+    again = vocabulary.vectors(["a", "bb", "ccc"])
+    np.testing.assert_allclose(first, again)
+    assert len(vocabulary) == 2
+    assert vocabulary.stats()["evicted"] >= 1
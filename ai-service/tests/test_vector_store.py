@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+
+import vector_store
+from vector_store import VectorStore
+
+
+def snapshot_stat(directory):
+    st = os.stat(os.path.join(directory, "records.json"))
+    return st.st_ino, st.st_mtime_ns
+
+
+def test_small_writes_append_to_the_journal_only(tmp_path):
+    directory = str(tmp_path)
+    store = VectorStore(directory)
+    store.upsert(["a"], np.ones((1, 4)))
+    store._save()
+    before = snapshot_stat(directory)
+
+    store.upsert(["b"], np.eye(4)[:1], [{"name": "b"}])
+    store.delete(["a"])
+
+    assert snapshot_stat(directory) == before
+    assert os.path.getsize(os.path.join(directory, "journal.jsonl")) > 0
+    reloaded = VectorStore(directory)
+    assert reloaded.ids == ["b"]
+    assert reloaded.records == [{"name": "b"}]
+
+
+def test_other_instances_replay_journaled_writes(tmp_path):
+    directory = str(tmp_path)
+    first, second = VectorStore(directory), VectorStore(directory)
+    first.upsert(["r1"], np.ones((1, 4)))
+    second.upsert(["r2"], np.eye(4)[:1])
+
+    assert [hit[0] for hit in first.search(np.ones(4), 5)] == ["r1", "r2"]
+    assert first.delete(["r2"]) == 1
+    assert [hit[0] for hit in second.search(np.ones(4), 5)] == ["r1"]
+
+
+def test_journal_is_compacted_into_a_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "JOURNAL_MIN_ROWS", 4)
+    directory = str(tmp_path)
+    store = VectorStore(directory)
+    rng = np.random.default_rng(0)
+    # Re-embedding the same ids grows the journal past the store
+    for _ in range(3):
+        store.upsert(["r0", "r1"], rng.random((2, 4)))
+
+    assert store._journal_rows < 4
+    assert os.path.exists(os.path.join(directory, "records.json"))
+    reloaded = VectorStore(directory)
+    assert reloaded.ids == store.ids
+    np.testing.assert_allclose(reloaded.matrix, store.matrix)
+
+
+def test_replacing_an_id_keeps_one_row(tmp_path):
+    directory = str(tmp_path)
+    store = VectorStore(directory)
+    store.upsert(["a", "b"], np.eye(4)[:2])
+    store.upsert(["a"], np.eye(4)[2:3])
+
+    reloaded = VectorStore(directory)
+    assert len(reloaded) == 2
+    assert reloaded.search(np.eye(4)[2], 1)[0][0] == "a"
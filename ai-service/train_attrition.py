@@ -0,0 +1,102 @@
+"""
+Train the attrition-risk model used by /ai/perf-insight.
+
+Inputs are exported collections (mongoexport JSON lines or a JSON array):
+
+    mongoexport -d hrms -c employees -o employees.json
+    mongoexport -d hrms -c performancereviews -o reviews.json
+    mongoexport -d hrms -c allocations -o allocations.json
+
+    python train_attrition.py --employees employees.json --reviews reviews.json \\
+        --allocations allocations.json --out models/attrition.joblib
+
+An employee counts as having left when `--label-field` is true on the record,
+or, if the field is absent, when its status is "inactive". Leavers' features
+are computed as of their last update, so the months after they left do not
+leak into the label.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+from attrition import FEATURES, AttritionModel, employee_features, group_by_employee, parse_date, record_id, unwrap
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [unwrap(record) for record in records]
+
+
+def build_training_set(employees, reviews, allocations, label_field: str):
+    reviews_by_employee = group_by_employee(reviews)
+    allocations_by_employee = group_by_employee(allocations)
+    now = datetime.now(timezone.utc)
+    rows, labels = [], []
+    for employee in employees:
+        employee_id = record_id(employee)
+        if label_field in employee:
+            left = bool(employee[label_field])
+        else:
+            left = employee.get("status") == "inactive"
+        as_of = (parse_date(employee.get("updatedAt")) or now) if left else now
+        rows.append(employee_features(employee, reviews_by_employee.get(employee_id, []),
+                                      allocations_by_employee.get(employee_id, []), as_of))
+        labels.append(1 if left else 0)
+    return np.vstack(rows), np.array(labels)
+
+
+def fit(X: np.ndarray, y: np.ndarray, C: float):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("classifier", LogisticRegression(C=C, class_weight="balanced", max_iter=1000)),
+    ])
+    return pipeline.fit(X, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", required=True)
+    parser.add_argument("--reviews", required=True)
+    parser.add_argument("--allocations", required=True)
+    parser.add_argument("--out", default=os.path.join("models", "attrition.joblib"))
+    parser.add_argument("--label-field", default="left")
+    parser.add_argument("--C", type=float, default=1.0, help="inverse regularization strength")
+    args = parser.parse_args()
+
+    X, y = build_training_set(load_records(args.employees), load_records(args.reviews),
+                              load_records(args.allocations), args.label_field)
+    positives = int(y.sum())
+    if positives == 0 or positives == len(y):
+        raise SystemExit("Need both leavers and current employees to train")
+
+    metrics: Dict[str, Any] = {"employees": len(y), "leavers": positives}
+    folds = min(5, positives, len(y) - positives)
+    if folds >= 2:
+        from sklearn.model_selection import cross_val_score
+        auc = cross_val_score(fit(X, y, args.C), X, y, cv=folds, scoring="roc_auc")
+        metrics["cvRocAuc"] = float(auc.mean())
+
+    model = AttritionModel(fit(X, y, args.C), FEATURES, {
+        "trainedAt": datetime.now(timezone.utc).isoformat(),
+        **metrics,
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    model.save(args.out)
+    print(json.dumps({"model": args.out, **model.metadata}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
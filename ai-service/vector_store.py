@@ -0,0 +1,349 @@
+"""
+Flat vector store keyed by string ids.
+
+Vectors are L2-normalized on insert and kept in one contiguous float32 matrix,
+so a query is a single matrix-vector product followed by a partial sort. The
+matrix and the per-id records are persisted to a directory and reloaded on
+start: a snapshot (`vectors.npy`, `records.json`) plus a journal of the
+changes since. Each write appends its vectors to `journal.bin` and one JSON
+line to `journal.jsonl`, so its cost follows the change, not the store; the
+snapshot is rewritten only once the journal outgrows the store.
+
+Several worker processes may share one directory. Writes run as a
+transaction under an exclusive lock on a file in the directory: the store is
+reloaded if another process saved since, the change is applied and the
+result saved. Searches reload first when the files on disk have changed, so
+every worker answers from the same data; a worker that is only behind by
+journal lines reads just those.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one process per directory
+    fcntl = None
+
+# Journal rows tolerated before compaction, at least; otherwise the store's size
+JOURNAL_MIN_ROWS = 1024
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, best first, without a full sort. Ties are
+    broken by position, matching a stable descending sort of the whole array.
+    """
+    if k <= 0 or scores.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < scores.size:
+        kth = np.partition(scores, scores.size - k)[scores.size - k]
+        part = np.flatnonzero(scores >= kth)
+    else:
+        part = np.arange(scores.size)
+    return part[np.argsort(-scores[part], kind="stable")][:k]
+
+
+class VectorStore:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self.ids: List[str] = []
+        self.records: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        # (stat of records.json, journal.jsonl size) as last loaded or saved by this process
+        self._disk_state = None
+        # Journal read or written so far: bytes of journal.jsonl, rows of journal.bin
+        self._journal_offset = 0
+        self._journal_rows = 0
+        # Changes of the open transaction, appended to the journal on commit
+        self._ops: Optional[List[Dict[str, Any]]] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            with self._file_lock(exclusive=False):
+                self._load()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, item_id: str):
+        return item_id in self._rows
+
+    def _paths(self):
+        return os.path.join(self.directory, "vectors.npy"), os.path.join(self.directory, "records.json")
+
+    def _journal_paths(self):
+        return os.path.join(self.directory, "journal.bin"), os.path.join(self.directory, "journal.jsonl")
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        if not self.directory or fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _current_disk_state(self):
+        try:
+            st = os.stat(self._paths()[1])
+            snapshot = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            snapshot = None
+        try:
+            journal = os.path.getsize(self._journal_paths()[1])
+        except FileNotFoundError:
+            journal = 0
+        return snapshot, journal
+
+    def _load(self):
+        """Reload the snapshot and replay the whole journal."""
+        vectors_path, records_path = self._paths()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self.ids, self.records, self._rows = [], [], {}
+        self._journal_offset = self._journal_rows = 0
+        if os.path.exists(vectors_path) and os.path.exists(records_path):
+            with open(records_path) as f:
+                stored = json.load(f)
+            matrix = np.load(vectors_path)
+            count = min(len(stored["ids"]), matrix.shape[0])
+            self._matrix = np.ascontiguousarray(matrix[:count], dtype=np.float32)
+            self._size = count
+            self.ids = stored["ids"][:count]
+            self.records = stored["records"][:count]
+            self._rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        self._replay()
+
+    def _replay(self):
+        """Apply the complete journal lines past `_journal_offset`."""
+        bin_path, jsonl_path = self._journal_paths()
+        try:
+            with open(jsonl_path, "rb") as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        # A line still being written has no newline yet; the writer holds the lock
+        data = data[:data.rfind(b"\n") + 1]
+        for line in data.split(b"\n")[:-1]:
+            op = json.loads(line)
+            if op["op"] == "upsert":
+                count = len(op["ids"])
+                vectors = np.fromfile(bin_path, dtype=np.float32, count=count * op["dim"],
+                                      offset=op["start"] * op["dim"] * 4).reshape(count, op["dim"])
+                self._apply_upsert(op["ids"], vectors, op["records"])
+                self._journal_rows = op["start"] + count
+            else:
+                self._apply_delete(op["ids"])
+            self._journal_offset += len(line) + 1
+        self._disk_state = self._current_disk_state()
+
+    def _sync(self):
+        """Catch up with other processes: replay new journal lines, or reload after a compaction."""
+        state = self._current_disk_state()
+        if state == self._disk_state:
+            return
+        if self._disk_state is None or state[0] != self._disk_state[0] or state[1] < self._journal_offset:
+            self._load()
+        else:
+            self._replay()
+
+    def refresh(self, on_reload: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Catch up if another process saved since this one last loaded or saved;
+        True if it did. `on_reload` runs under the same file lock, for files
+        saved together with the store.
+        """
+        if not self.directory:
+            return False
+        with self._lock:
+            if self._current_disk_state() == self._disk_state:
+                return False
+            with self._file_lock(exclusive=False):
+                self._sync()
+                if on_reload is not None:
+                    on_reload()
+            return True
+
+    @contextmanager
+    def transaction(self):
+        """
+        Hold the store exclusively across processes, starting from the latest
+        saved state; the changes are journaled on exit. Changes inside use
+        `persist=False`.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            if self.directory:
+                self._sync()
+            self._ops = []
+            try:
+                yield self
+            except BaseException:
+                # Drop half-applied changes: the next refresh reloads from disk
+                self._ops = None
+                self._disk_state = None
+                raise
+            ops, self._ops = self._ops, None
+            self._commit(ops)
+
+    def _commit(self, ops: List[Dict[str, Any]]):
+        if not self.directory or not ops:
+            return
+        new_rows = sum(len(op["ids"]) for op in ops if op["op"] == "upsert")
+        if self._journal_rows + new_rows > max(JOURNAL_MIN_ROWS, self._size):
+            self._save()
+            return
+        bin_path, jsonl_path = self._journal_paths()
+        lines = []
+        with open(bin_path, "ab") as f:
+            # Anything past the last journaled row was left by a failed write
+            f.truncate(self._journal_rows * self._matrix.shape[1] * 4)
+            for op in ops:
+                if op["op"] == "upsert":
+                    vectors = op.pop("vectors")
+                    f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                    op.update(start=self._journal_rows, dim=int(vectors.shape[1]))
+                    self._journal_rows += len(op["ids"])
+                lines.append(json.dumps(op))
+        payload = "".join(line + "\n" for line in lines).encode("utf-8")
+        with open(jsonl_path, "ab") as f:
+            f.truncate(self._journal_offset)
+            f.write(payload)
+        self._journal_offset += len(payload)
+        self._disk_state = self._current_disk_state()
+
+    def _save(self):
+        """Write a snapshot of the whole store and start an empty journal."""
+        if not self.directory:
+            return
+        vectors_path, records_path = self._paths()
+        # np.save appends .npy to names without it, so keep the suffix on the temp file.
+        tmp_vectors = vectors_path[:-4] + ".tmp.npy"
+        np.save(tmp_vectors, self.matrix)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump({"ids": self.ids, "records": self.records}, f)
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(records_path + ".tmp", records_path)
+        # Replaying a journal the snapshot already holds is harmless: every
+        # entry sets or removes an id
+        for path in self._journal_paths():
+            if os.path.exists(path):
+                os.remove(path)
+        self._journal_offset = self._journal_rows = 0
+        self._disk_state = self._current_disk_state()
+
+    def _reserve(self, rows: int, dim: int):
+        if self._matrix.shape[1] not in (0, dim):
+            raise ValueError(f"Vector dimension {dim} does not match store dimension {self._matrix.shape[1]}")
+        if rows <= self._matrix.shape[0] and self._matrix.shape[1] == dim:
+            return
+        capacity = max(rows, 2 * self._matrix.shape[0], 64)
+        grown = np.zeros((capacity, dim), dtype=np.float32)
+        if self._size:
+            grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, records: Optional[List[Dict[str, Any]]] = None, persist: bool = True):
+        if not ids:
+            return
+        if persist:
+            with self.transaction():
+                self.upsert(ids, vectors, records, persist=False)
+            return
+        vectors = normalize_rows(vectors)
+        records = records or [{} for _ in ids]
+        with self._lock:
+            self._apply_upsert(ids, vectors, records)
+            if self._ops is not None:
+                self._ops.append({"op": "upsert", "ids": list(ids), "records": list(records), "vectors": vectors})
+
+    def _apply_upsert(self, ids: List[str], vectors: np.ndarray, records: List[Dict[str, Any]]):
+        self._reserve(self._size + len(ids), vectors.shape[1])
+        for item_id, vector, record in zip(ids, vectors, records):
+            row = self._rows.get(item_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                self._rows[item_id] = row
+                self.ids.append(item_id)
+                self.records.append(record)
+            else:
+                self.records[row] = record
+            self._matrix[row] = vector
+
+    def delete(self, ids: Iterable[str], persist: bool = True) -> int:
+        """Remove ids by moving the last row into each freed slot."""
+        if persist:
+            with self.transaction():
+                return self.delete(ids, persist=False)
+        with self._lock:
+            deleted = self._apply_delete(ids)
+            if deleted and self._ops is not None:
+                self._ops.append({"op": "delete", "ids": deleted})
+        return len(deleted)
+
+    def _apply_delete(self, ids: Iterable[str]) -> List[str]:
+        deleted = []
+        for item_id in ids:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self._matrix[row] = self._matrix[last]
+                self.ids[row] = moved_id
+                self.records[row] = self.records[last]
+                self._rows[moved_id] = row
+            self.ids.pop()
+            self.records.pop()
+            self._size -= 1
+            deleted.append(item_id)
+        return deleted
+
+    def rows_for(self, ids: Iterable[str]) -> np.ndarray:
+        return np.array([self._rows[i] for i in ids if i in self._rows], dtype=np.int64)
+
+    def search(self, query: np.ndarray, top_k: int, ids: Optional[List[str]] = None,
+               rows: Optional[np.ndarray] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Cosine top-K over the whole store, only over `ids`, or only over `rows`."""
+        query = normalize_rows(np.asarray(query).reshape(1, -1))[0]
+        with self._lock:
+            if rows is None:
+                # Explicit rows belong to a caller that refreshes the store itself
+                self.refresh()
+            if self._size == 0:
+                return []
+            if ids is not None:
+                rows = self.rows_for(ids)
+            if rows is None:
+                scores = self.matrix @ query
+            else:
+                scores = self._matrix[rows] @ query
+            best = top_k_indices(scores, top_k)
+            if rows is not None:
+                best_rows = rows[best]
+            else:
+                best_rows = best
+            return [(self.ids[r], float(scores[b]), self.records[r]) for r, b in zip(best_rows, best)]